@@ -3,19 +3,22 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from bs4 import BeautifulSoup
-import json
-import time
 import re
 import shutil
 import os
-import urllib.request
 from datetime import datetime
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+import chrome_startup
+import fetch_backend
+import html_parser
+import instrumentation
+import jsonio
+import lean_browser
+import team_registry
 
-TEAMS_JSON_URL = "https://raw.githubusercontent.com/PariALLIANCE/Data-Sports/main/data/football/teams/football_teams.json"
 TARGET_COUNTRY = "England"
 TARGET_LEAGUE = "England_Premier_League"
 # ← toutes les équipes de la ligue sont désormais traitées (plus de limite NB_TEAMS)
@@ -60,8 +63,7 @@ def load_existing_data():
         print(f"ℹ️ Aucun fichier existant ({OUTPUT_JSON_PATH}) — toutes les équipes seront traitées comme non trackées")
         return {}
     try:
-        with open(OUTPUT_JSON_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = jsonio.load(OUTPUT_JSON_PATH)
     except Exception as e:
         print(f"⚠️ Erreur lecture JSON existant : {e} — traité comme absent")
         return {}
@@ -115,7 +117,7 @@ def merge_matches(existing_matches, new_matches):
     return merged, new_match_ids
 
 
-def setup_driver():
+def _start_chrome():
     chrome_options = Options()
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
@@ -134,7 +136,9 @@ def setup_driver():
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
     chrome_options.add_experimental_option("useAutomationExtension", False)
 
-    service = Service(ChromeDriverManager().install())
+    lean_browser.apply_options(chrome_options)
+    chrome_startup.apply_options(chrome_options, "scrape_espn_schedule")
+    service = chrome_startup.service(chrome_options)
     driver = webdriver.Chrome(service=service, options=chrome_options)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     driver.set_page_load_timeout(60)
@@ -142,6 +146,11 @@ def setup_driver():
     return driver
 
 
+def setup_driver():
+    """Driver Chrome réel (live / record) ou driver de rejeu (FETCH_MODE=replay)."""
+    return fetch_backend.open_driver(_start_chrome)
+
+
 def fix_url(url, base="https://www.espn.com"):
     """Normalise une URL relative en URL absolue."""
     if not url:
@@ -210,16 +219,10 @@ def simplify_competition_label(competition):
 
 def fetch_target_teams():
     """
-    Récupère football_teams.json depuis GitHub, retourne TOUTES les
-    équipes de TARGET_COUNTRY / TARGET_LEAGUE (plus de limite NB_TEAMS).
+    Retourne TOUTES les équipes de TARGET_COUNTRY / TARGET_LEAGUE depuis
+    le registre des équipes (plus de limite NB_TEAMS).
     """
-    print(f"🌐 Téléchargement de {TEAMS_JSON_URL}")
-    req = urllib.request.Request(TEAMS_JSON_URL, headers={"User-Agent": "Mozilla/5.0"})
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        data = json.loads(resp.read().decode("utf-8"))
-
-    country_teams = data.get(TARGET_COUNTRY, [])
-    league_teams = [t for t in country_teams if t.get("league_name") == TARGET_LEAGUE]
+    league_teams = team_registry.teams_for_league(TARGET_LEAGUE, TARGET_COUNTRY)
 
     selected = league_teams  # ← toutes les équipes de la ligue
 
@@ -378,6 +381,10 @@ def extract_match_info(match_row, month, season):
         return None
 
 
+# Lignes de match des tableaux mensuels de la page résultats (rendues côté client)
+RESULTS_ROW_SELECTOR = "div.ResponsiveTable tr.Table__TR--sm"
+
+
 def scrape_team_results_for_seasons(driver, team_name, team_id, seasons):
     """
     Scrape les résultats d'une équipe ESPN pour la liste de saisons
@@ -392,13 +399,13 @@ def scrape_team_results_for_seasons(driver, team_name, team_id, seasons):
         print(f"🌐 Accès: {url}")
         try:
             driver.get(url)
-            print("⏳ Attente du chargement initial (5s)...")
-            time.sleep(5)
+            print("⏳ Attente des tableaux de résultats (5s max)...")
+            fetch_backend.settle(driver, 5, selector=RESULTS_ROW_SELECTOR)
 
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            fetch_backend.settle(driver, 2, min_seconds=0.5, selector=RESULTS_ROW_SELECTOR)
             driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)
+            fetch_backend.settle(driver, 1, selector=RESULTS_ROW_SELECTOR)
 
             try:
                 WebDriverWait(driver, 30).until(
@@ -878,7 +885,7 @@ def get_match_details_selenium(driver, game_id, home_team_id=None, away_team_id=
         print(f"    ⚠️  WebDriver erreur ({game_id}) : {e}")
         return {}, {"home": None, "away": None, "draw": None}, None, None, False
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    soup = html_parser.parse(driver.page_source)
 
     ml = extract_ml_odds(soup)
     odds = {
@@ -911,7 +918,6 @@ def get_match_details_selenium(driver, game_id, home_team_id=None, away_team_id=
                         }
                 except NoSuchElementException:
                     continue
-            time.sleep(0.6)
         except NoSuchElementException:
             pass
         except Exception as e:
@@ -997,7 +1003,6 @@ def enrich_matches_with_stats_and_odds(driver, all_matches_by_team, only_match_i
         pens_str = f"🥅 pens: {penalty_winner}" if meta["decided_by_penalties"] else ""
         full_str = "✅ stats complètes" if has_full_stats else "⚠️ stats partielles"
         print(f"    📊 {len(stats)} statistique(s)  |  {full_str}  |  {odds_str}  |  {round_str}  {pens_str}")
-        time.sleep(0.8)
 
     for matches in all_matches_by_team.values():
         for m in matches:
@@ -1132,7 +1137,7 @@ def fetch_next_game_from_fixtures(driver, team_id, team_name, league_label):
 
     try:
         driver.get(url)
-        time.sleep(3)
+        fetch_backend.settle(driver, 3, selector="div.ResponsiveTable tr.Table__TR")
         WebDriverWait(driver, 20).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "div.ResponsiveTable"))
         )
@@ -1142,7 +1147,7 @@ def fetch_next_game_from_fixtures(driver, team_id, team_name, league_label):
         print(f"    ⚠️ Erreur accès fixtures {team_name}: {e}")
         return None
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    soup = html_parser.parse(driver.page_source)
 
     tables = soup.select("div.ResponsiveTable")
     if not tables:
@@ -1176,8 +1181,8 @@ def fetch_next_game_from_fixtures(driver, team_id, team_name, league_label):
             WebDriverWait(driver, 12).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
-            time.sleep(1)
-            match_soup = BeautifulSoup(driver.page_source, "html.parser")
+            fetch_backend.settle(driver, 3, selector="section[data-testid='prism-LayoutCard']")
+            match_soup = html_parser.parse(driver.page_source)
 
             if is_league_match:
                 matchday = compute_upcoming_matchday(
@@ -1368,14 +1373,7 @@ def scrape_with_selenium():
             "teams": output_data,
         }
 
-        with open(OUTPUT_JSON_PATH, "w", encoding="utf-8") as f:
-            json.dump(
-                final_output,
-                f,
-                ensure_ascii=False,
-                indent=2,
-                separators=(",", ": "),
-            )
+        jsonio.dump(OUTPUT_JSON_PATH, final_output)
 
         print(f"\n💾 {OUTPUT_JSON_PATH} sauvegardé ({len(output_data)} équipe(s) au total)")
 
@@ -1393,6 +1391,7 @@ def scrape_with_selenium():
 
 
 def main():
+    instrumentation.start_run()
     print("=" * 60)
     print("⚽ ESPN SCRAPER — TRACKING INCRÉMENTAL (TOUTES LES ÉQUIPES)")
     print("📆 Scraping complet si jamais trackée, sinon mise à jour saison en cours + next_game chaîné par match")
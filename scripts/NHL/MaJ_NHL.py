@@ -1,13 +1,18 @@
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-import json
 import os
 import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import html_parser
+import instrumentation
+import nhl_store
+import rate_limiter
 
 # ================= CONFIG =================
 BASE_URL = "https://www.espn.com/nhl/schedule/_/date/"
-OUTPUT_FILE = "data/hockey/leagues/NHL.json"
 HEADERS = {"User-Agent": "Mozilla/5.0"}
 
 # ================= UTILS =================
@@ -42,31 +47,15 @@ def is_played_match(text):
     return bool(re.search(r"\d+\s*,\s*\w+\s*\d+", text))
 
 
-def load_existing_games():
-    """
-    Charge les matchs existants depuis le fichier JSON
-    Retourne un set de game_ids déjà présents et la liste complète
-    """
-    if os.path.exists(OUTPUT_FILE):
-        try:
-            with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return {game["game_id"] for game in data if "game_id" in game}, data
-        except:
-            return set(), []
-    return set(), []
-
-
 # ================= MAIN =================
 def get_recent_played_games():
     """
     Récupère les matchs d'avant-hier et hier uniquement
     """
-    # Charger les game_ids existants
-    existing_ids, existing_games = load_existing_games()
-    print(f"📂 {len(existing_ids)} matchs déjà en base")
-    
-    results = list(existing_games)  # Garder les matchs existants
+    # Seul l'index du store est chargé ; les partitions le sont à la demande
+    nhl_store.load_index()
+    print(f"📂 {nhl_store.count_games()} matchs déjà en base")
+
     new_games = 0
     today = datetime.utcnow().date()
     
@@ -79,19 +68,31 @@ def get_recent_played_games():
     print(f"🔍 Vérification des matchs pour : {[d.isoformat() for d in dates_to_check]}")
 
     for current_date in dates_to_check:
+        if nhl_store.is_complete(current_date):
+            print(f"⏭️  {current_date} déjà complet, aucune requête")
+            continue
+
+        # game_ids déjà présents autour de cette date (partition du mois et voisines)
+        existing_ids = nhl_store.game_ids_for(current_date)
         date_str = current_date.strftime("%Y%m%d")
         url = BASE_URL + date_str
 
         try:
-            response = requests.get(url, headers=HEADERS, timeout=10)
+            rate_limiter.acquire(url)
+            t0 = time.perf_counter()
+            with instrumentation.timer("http_get"):
+                response = requests.get(url, headers=HEADERS, timeout=10)
+            rate_limiter.report(url, latency=time.perf_counter() - t0, status=response.status_code,
+                                retry_after=rate_limiter.parse_retry_after(response.headers.get("Retry-After")))
             if response.status_code != 200:
                 print(f"❌ Erreur HTTP {response.status_code} pour {current_date}")
                 continue
 
-            soup = BeautifulSoup(response.text, "html.parser")
+            soup = html_parser.parse(response.text)
             rows = soup.select("tbody tr")
 
             games_found = 0
+            pending = 0
             for row in rows:
                 score_link = row.select_one("td a[href*='/nhl/game/_/gameId']")
                 if not score_link:
@@ -100,6 +101,7 @@ def get_recent_played_games():
                 score_text = score_link.get_text(strip=True)
 
                 if not is_played_match(score_text):
+                    pending += 1
                     continue  # pas encore joué
 
                 # Extraire le game_id
@@ -146,7 +148,7 @@ def get_recent_played_games():
                     }
                 }
                 
-                results.append(new_game)
+                nhl_store.add_games([new_game])
                 existing_ids.add(game_id)  # Ajouter au set pour éviter les doublons
                 games_found += 1
                 new_games += 1
@@ -157,23 +159,29 @@ def get_recent_played_games():
             else:
                 print(f"📅 {current_date}: Aucun nouveau match")
 
+            # Date close : tous les matchs sont joués (ou la date est trop ancienne
+            # pour qu'un résultat arrive encore) → plus jamais redemandée
+            if pending == 0 or nhl_store.is_settled(current_date, today):
+                nhl_store.mark_complete(current_date)
+
         except Exception as e:
             print(f"❌ Erreur pour {current_date}: {e}")
 
     print(f"\n✨ {new_games} nouveau(x) match(s) ajouté(s)")
-    print(f"📊 Total : {len(results)} matchs dans la base")
-    return results
+    return new_games
 
 
 # ================= SAVE =================
-def save_json(data):
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    print(f"💾 Fichier sauvegardé : {OUTPUT_FILE}")
+def save_store():
+    with instrumentation.timer("json_dump"):
+        written = nhl_store.flush()
+    for key in written:
+        print(f"💾 Partition sauvegardée : {key}")
+    print(f"📊 Total : {nhl_store.count_games()} matchs dans la base")
 
 
 if __name__ == "__main__":
-    games = get_recent_played_games()
-    save_json(games)
+    instrumentation.start_run()
+    get_recent_played_games()
+    save_store()
     print(f"✅ Terminé !")
\ No newline at end of file
@@ -1,9 +1,15 @@
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime
-import json
 import os
 import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import html_parser
+import instrumentation
+import jsonio
+import rate_limiter
 
 
 def extract_team_full_name(href):
@@ -82,13 +88,18 @@ def scrape_nhl_games_today():
     try:
         # Requête HTTP
         print("📡 Envoi de la requête HTTP...")
-        response = requests.get(url, headers=headers, timeout=10)
+        rate_limiter.acquire(url)
+        t0 = time.perf_counter()
+        with instrumentation.timer("http_get"):
+            response = requests.get(url, headers=headers, timeout=10)
+        rate_limiter.report(url, latency=time.perf_counter() - t0, status=response.status_code,
+                            retry_after=rate_limiter.parse_retry_after(response.headers.get("Retry-After")))
         response.raise_for_status()
 
         print(f"✅ Réponse reçue: {response.status_code}")
 
         # Parser le HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
+        soup = html_parser.parse(response.content)
 
         # Trouver tous les blocs de tables avec leur titre de date
         schedule_blocks = soup.find_all('div', class_='ScheduleTables')
@@ -286,8 +297,7 @@ def scrape_nhl_games_today():
             print(f"⚠️  Le dossier n'existe pas, recréation...")
             os.makedirs(output_dir, exist_ok=True)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        jsonio.dump(output_file, result)
         
         # Vérifier que le fichier a bien été créé
         if os.path.exists(output_file):
@@ -312,6 +322,7 @@ def scrape_nhl_games_today():
 
 
 if __name__ == "__main__":
+    instrumentation.start_run()
     output_file = scrape_nhl_games_today()
 
     if output_file:
@@ -320,8 +331,7 @@ if __name__ == "__main__":
 
         # Afficher le contenu du fichier pour vérification
         try:
-            with open(output_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = jsonio.load(output_file)
             print(f"\n📊 Résumé du fichier JSON:")
             print(f"   - Date: {data.get('date', 'N/A')}")
             print(f"   - Nombre de matchs: {data.get('total_games', 0)}")
@@ -1,13 +1,19 @@
 import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
-import json
 import os
+import random
 import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import html_parser
+import instrumentation
+import nhl_store
+import rate_limiter
 
 # ================= CONFIG =================
 BASE_URL = "https://www.espn.com/nhl/schedule/_/date/"
-OUTPUT_FILE = "data/hockey/leagues/NHL.json"
 HEADERS = {"User-Agent": "Mozilla/5.0"}
 
 # ================= UTILS =================
@@ -42,28 +48,95 @@ def is_played_match(text):
     return bool(re.search(r"\d+\s*,\s*\w+\s*\d+", text))
 
 
-def load_existing_games():
+# ================= PARSING D'UNE JOURNÉE =================
+def parse_schedule_page(html, current_date, existing_ids):
     """
-    Charge les matchs existants depuis le fichier JSON
-    Retourne un set de game_ids déjà présents
+    Extrait les matchs joués (et absents de existing_ids) d'une page
+    calendrier ESPN. Met à jour existing_ids au fil de l'eau.
+    Retourne (matchs, nombre de matchs de la page pas encore joués).
     """
-    if os.path.exists(OUTPUT_FILE):
-        try:
-            with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return {game["game_id"] for game in data if "game_id" in game}, data
-        except:
-            return set(), []
-    return set(), []
+    games = []
+    pending = 0
+    soup = html_parser.parse(html)
+    rows = soup.select("tbody tr")
+
+    for row in rows:
+        score_link = row.select_one("td a[href*='/nhl/game/_/gameId']")
+        if not score_link:
+            continue
+
+        score_text = score_link.get_text(strip=True)
+
+        if not is_played_match(score_text):
+            pending += 1
+            continue  # pas encore joué
+
+        # Extraire le game_id
+        game_id = extract_game_id(score_link["href"])
+        if not game_id:
+            continue
+
+        # Vérifier si le match existe déjà
+        if game_id in existing_ids:
+            continue  # Match déjà enregistré, on skip
+
+        # Récupérer toutes les cellules <td> de la ligne
+        cells = row.select("td")
+
+        # La première cellule contient l'équipe à l'extérieur
+        # La deuxième cellule contient l'équipe à domicile
+        away_team_link = None
+        home_team_link = None
+
+        if len(cells) >= 2:
+            # Équipe extérieure dans la première cellule
+            away_team_link = cells[0].select_one("a[href*='/nhl/team/_/name/']")
+            # Équipe domicile dans la deuxième cellule
+            home_team_link = cells[1].select_one("a[href*='/nhl/team/_/name/']")
+
+        if not away_team_link or not home_team_link:
+            continue
+
+        away_name, away_short = extract_team_from_href(away_team_link["href"])
+        home_name, home_short = extract_team_from_href(home_team_link["href"])
+
+        games.append({
+            "game_id": game_id,
+            "date": current_date.isoformat(),
+            "score": score_text,
+            "away_team": {
+                "name": away_name,
+                "short": away_short,
+                "logo": build_logo_url(away_short)
+            },
+            "home_team": {
+                "name": home_name,
+                "short": home_short,
+                "logo": build_logo_url(home_short)
+            }
+        })
+        existing_ids.add(game_id)  # Ajouter au set pour éviter les doublons
+
+    return games, pending
 
 
-# ================= MAIN =================
+def ingest_day(html, current_date):
+    """
+    Ajoute les matchs joués d'une journée dans le store partitionné et marque
+    la date complète si plus aucun match n'y est attendu.
+    """
+    found, pending = parse_schedule_page(html, current_date, nhl_store.game_ids_for(current_date))
+    nhl_store.add_games(found)
+    if pending == 0 or nhl_store.is_settled(current_date):
+        nhl_store.mark_complete(current_date)
+    return found
+
+
+# ================= MAIN (SÉRIE) =================
 def get_played_games_since_date(start_date):
-    # Charger les game_ids existants
-    existing_ids, existing_games = load_existing_games()
-    print(f"📂 {len(existing_ids)} matchs déjà en base")
-    
-    results = list(existing_games)  # Garder les matchs existants
+    nhl_store.load_index()
+    print(f"📂 {nhl_store.count_games()} matchs déjà en base")
+
     new_games = 0
     current_date = start_date
     end_date = datetime.utcnow().date()
@@ -72,100 +145,175 @@ def get_played_games_since_date(start_date):
     print(f"Récupération des matchs du {start_date} au {end_date} ({total_days} jours)...")
 
     while current_date <= end_date:
+        if nhl_store.is_complete(current_date):
+            current_date += timedelta(days=1)
+            continue
+
         date_str = current_date.strftime("%Y%m%d")
         url = BASE_URL + date_str
 
         try:
-            response = requests.get(url, headers=HEADERS, timeout=10)
+            rate_limiter.acquire(url)
+            t0 = time.perf_counter()
+            with instrumentation.timer("http_get"):
+                response = requests.get(url, headers=HEADERS, timeout=10)
+            rate_limiter.report(url, latency=time.perf_counter() - t0, status=response.status_code,
+                                retry_after=rate_limiter.parse_retry_after(response.headers.get("Retry-After")))
             if response.status_code != 200:
                 current_date += timedelta(days=1)
                 continue
 
-            soup = BeautifulSoup(response.text, "html.parser")
-            rows = soup.select("tbody tr")
+            found = ingest_day(response.text, current_date)
+            new_games += len(found)
 
-            games_found = 0
-            for row in rows:
-                score_link = row.select_one("td a[href*='/nhl/game/_/gameId']")
-                if not score_link:
-                    continue
+            if found:
+                print(f"{current_date}: {len(found)} nouveaux matchs trouvés")
 
-                score_text = score_link.get_text(strip=True)
+        except Exception as e:
+            print(f"Erreur pour {current_date}: {e}")
 
-                if not is_played_match(score_text):
-                    continue  # pas encore joué
+        current_date += timedelta(days=1)
 
-                # Extraire le game_id
-                game_id = extract_game_id(score_link["href"])
-                if not game_id:
-                    continue
-                
-                # Vérifier si le match existe déjà
-                if game_id in existing_ids:
-                    continue  # Match déjà enregistré, on skip
-
-                # Récupérer toutes les cellules <td> de la ligne
-                cells = row.select("td")
-                
-                # La première cellule contient l'équipe à l'extérieur
-                # La deuxième cellule contient l'équipe à domicile
-                away_team_link = None
-                home_team_link = None
-                
-                if len(cells) >= 2:
-                    # Équipe extérieure dans la première cellule
-                    away_team_link = cells[0].select_one("a[href*='/nhl/team/_/name/']")
-                    # Équipe domicile dans la deuxième cellule
-                    home_team_link = cells[1].select_one("a[href*='/nhl/team/_/name/']")
-                
-                if not away_team_link or not home_team_link:
+    print(f"\n✨ {new_games} nouveaux matchs ajoutés")
+    return new_games
+
+
+# ================= BACKFILL ASYNCHRONE =================
+# Requêtes concurrentes bornées sur une seule session HTTP (keep-alive),
+# retry avec backoff exponentiel, fusion dans l'ordre des dates. La reprise
+# après interruption s'appuie sur l'index des dates complètes du store :
+# les dates déjà ingérées ne sont pas redemandées.
+
+CONCURRENCY = int(os.environ.get("NHL_CONCURRENCY", "6"))
+MAX_RETRIES = int(os.environ.get("NHL_MAX_RETRIES", "4"))
+WINDOW_DAYS = int(os.environ.get("NHL_WINDOW_DAYS", "30"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+async def _fetch_day(session, semaphore, current_date):
+    """
+    Retourne (date, html) ; html = "" si ESPN répond sans page exploitable
+    (404…), None si la date a échoué malgré les retries.
+    """
+    import asyncio
+    import aiohttp
+
+    url = BASE_URL + current_date.strftime("%Y%m%d")
+    for attempt in range(MAX_RETRIES + 1):
+        async with semaphore:
+            await asyncio.sleep(rate_limiter.reserve(url))
+            t0 = time.perf_counter()
+            try:
+                with instrumentation.timer("http_get"):
+                    async with session.get(url) as response:
+                        instrumentation.incr("http_requests")
+                        rate_limiter.report(url, latency=time.perf_counter() - t0, status=response.status,
+                                            retry_after=rate_limiter.parse_retry_after(response.headers.get("Retry-After")))
+                        if response.status == 200:
+                            html = await response.text()
+                            instrumentation.incr("http_bytes", len(html))
+                            return current_date, html
+                        if response.status not in RETRY_STATUSES:
+                            return current_date, ""
+                        retry_after = response.headers.get("Retry-After")
+                        error = f"HTTP {response.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                rate_limiter.report(url, error=True)
+                retry_after = None
+                error = f"{type(e).__name__}: {e}"
+
+        if attempt == MAX_RETRIES:
+            break
+        delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+        delay += random.uniform(0, 0.5)
+        instrumentation.incr("retries")
+        print(f"🔁 {current_date} : {error} — nouvel essai dans {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+    print(f"❌ {current_date} : abandon après {MAX_RETRIES + 1} tentatives ({error})")
+    return current_date, None
+
+
+async def _backfill(start_date, end_date):
+    import asyncio
+    import aiohttp
+
+    todo = []
+    current = start_date
+    while current <= end_date:
+        if not nhl_store.is_complete(current):
+            todo.append(current)
+        current += timedelta(days=1)
+    skipped = (end_date - start_date).days + 1 - len(todo)
+    if skipped:
+        print(f"⏭️  {skipped} date(s) déjà complètes ignorées, {len(todo)} à récupérer")
+
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    connector = aiohttp.TCPConnector(limit=CONCURRENCY, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=20)
+    new_games = 0
+
+    async with aiohttp.ClientSession(headers=HEADERS, connector=connector, timeout=timeout) as session:
+        for offset in range(0, len(todo), WINDOW_DAYS):
+            days = todo[offset:offset + WINDOW_DAYS]
+
+            pages = await asyncio.gather(*(_fetch_day(session, semaphore, d) for d in days))
+
+            # Fusion dans l'ordre des dates ; une date en échec n'est pas
+            # marquée complète et sera redemandée au prochain run.
+            failed = 0
+            for current_date, html in sorted(pages, key=lambda p: p[0]):
+                if html is None:
+                    failed += 1
                     continue
+                found = ingest_day(html, current_date) if html else []
+                new_games += len(found)
+                if found:
+                    print(f"{current_date}: {len(found)} nouveaux matchs trouvés")
 
-                away_name, away_short = extract_team_from_href(away_team_link["href"])
-                home_name, home_short = extract_team_from_href(home_team_link["href"])
-
-                results.append({
-                    "game_id": game_id,
-                    "date": current_date.isoformat(),
-                    "score": score_text,
-                    "away_team": {
-                        "name": away_name,
-                        "short": away_short,
-                        "logo": build_logo_url(away_short)
-                    },
-                    "home_team": {
-                        "name": home_name,
-                        "short": home_short,
-                        "logo": build_logo_url(home_short)
-                    }
-                })
-                existing_ids.add(game_id)  # Ajouter au set pour éviter les doublons
-                games_found += 1
-                new_games += 1
-
-            if games_found > 0:
-                print(f"{current_date}: {games_found} nouveaux matchs trouvés")
+            nhl_store.flush()
+            if failed:
+                print(f"⏸️  {failed} date(s) en échec — relancer pour les reprendre")
+                return new_games
 
-        except Exception as e:
-            print(f"Erreur pour {current_date}: {e}")
+    return new_games
 
-        current_date += timedelta(days=1)
 
-    print(f"\n✨ {new_games} nouveaux matchs ajoutés")
-    return results
+def backfill_since_date(start_date):
+    """
+    Backfill asynchrone (aiohttp) du start_date à aujourd'hui. Repli sur la
+    boucle série si aiohttp n'est pas installé.
+    """
+    try:
+        import aiohttp  # noqa: F401
+    except ImportError:
+        print("⚠️ aiohttp non installé — backfill en série")
+        return get_played_games_since_date(start_date)
+
+    import asyncio
 
+    nhl_store.load_index()
+    print(f"📂 {nhl_store.count_games()} matchs déjà en base")
+    end_date = datetime.utcnow().date()
+    print(f"Backfill asynchrone du {start_date} au {end_date} "
+          f"({CONCURRENCY} requêtes simultanées, fenêtres de {WINDOW_DAYS} jours)...")
+
+    with instrumentation.timer("backfill"):
+        new_games = asyncio.run(_backfill(start_date, end_date))
 
-# ================= SAVE =================
-def save_json(data):
-    os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    print(f"\n✨ {new_games} nouveaux matchs ajoutés")
+    return new_games
 
 
 if __name__ == "__main__":
+    instrumentation.start_run()
     # Date de départ : 1er janvier 2023
     start_date = datetime(2023, 1, 1).date()
     
-    games = get_played_games_since_date(start_date)
-    save_json(games)
-    print(f"✅ {len(games)} matchs totaux sauvegardés dans {OUTPUT_FILE}")
+    # NHL_BACKFILL_MODE=serial pour forcer l'ancienne boucle jour par jour
+    if os.environ.get("NHL_BACKFILL_MODE", "async").lower() == "serial":
+        get_played_games_since_date(start_date)
+    else:
+        backfill_since_date(start_date)
+    nhl_store.flush()
+    print(f"✅ {nhl_store.count_games()} matchs totaux dans {nhl_store.STORE_DIR}")
@@ -0,0 +1,261 @@
+"""
+Stockage NHL partitionné par saison et par mois.
+
+    data/hockey/leagues/NHL/
+        index.json                  → dates entièrement ingérées + taille des partitions
+        2023-2024/2023-10.json      → matchs d'octobre 2023 (saison 2023-2024)
+        2023-2024/2023-11.json
+        ...
+
+Une mise à jour quotidienne ne charge et ne réécrit que la partition du mois
+concerné ; une date présente dans `completed_dates` est ignorée sans requête
+réseau. Une page de calendrier ESPN liste plusieurs jours : un même match peut
+être revu à une date voisine, y compris dans le mois précédent ou suivant. Le
+dédoublonnage porte donc sur les partitions à moins de SCHEDULE_SPAN_DAYS de
+la date (au plus trois mois chargés), pas seulement sur celle du mois.
+
+Migration : au premier chargement, si l'index n'existe pas et que l'ancien
+fichier unique NHL.json est présent, il est découpé automatiquement.
+
+L'export de l'ancien format (NHL.json, liste triée par date) est optionnel :
+NHL_LEGACY_EXPORT=1 ou `python scripts/NHL/nhl_store.py export`.
+
+CLI :
+    python scripts/NHL/nhl_store.py migrate   # découpe NHL.json
+    python scripts/NHL/nhl_store.py export    # régénère NHL.json
+    python scripts/NHL/nhl_store.py stats
+"""
+
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import jsonio
+
+STORE_DIR = "data/hockey/leagues/NHL"
+INDEX_FILE = os.path.join(STORE_DIR, "index.json")
+LEGACY_FILE = "data/hockey/leagues/NHL.json"
+LEGACY_EXPORT = os.environ.get("NHL_LEGACY_EXPORT", "0") == "1"
+
+# Au-delà de ce délai, une date est considérée close même si un match y est
+# resté "non joué" (report : il réapparaît à sa nouvelle date).
+SETTLE_DAYS = 3
+
+# Écart max entre la date d'une page de calendrier et celle des matchs qu'elle liste
+SCHEDULE_SPAN_DAYS = 7
+
+_index = {"loaded": False, "completed": set(), "partitions": {}}
+_partitions = {}      # clé "2023-2024/2023-10" → liste de matchs
+_partition_ids = {}   # clé → set des game_id de la partition
+_dirty = set()
+
+
+# ================= PARTITIONS =================
+def _as_date(d):
+    if isinstance(d, datetime):
+        return d.date()
+    if isinstance(d, date):
+        return d
+    return datetime.strptime(d, "%Y-%m-%d").date()
+
+
+def season_of(d):
+    """Saison NHL d'une date : octobre 2023 → juin 2024 = '2023-2024'."""
+    d = _as_date(d)
+    start = d.year if d.month >= 9 else d.year - 1
+    return f"{start}-{start + 1}"
+
+
+def partition_key(d):
+    d = _as_date(d)
+    return f"{season_of(d)}/{d.strftime('%Y-%m')}"
+
+
+def _partition_path(key):
+    return os.path.join(STORE_DIR, *key.split("/")) + ".json"
+
+
+def _load_partition(key):
+    if key not in _partitions:
+        path = _partition_path(key)
+        if os.path.exists(path):
+            _partitions[key] = jsonio.load(path)
+        else:
+            _partitions[key] = []
+        _partition_ids[key] = {g.get("game_id") for g in _partitions[key]}
+    return _partitions[key]
+
+
+# ================= INDEX =================
+def load_index():
+    if _index["loaded"]:
+        return
+    _index["loaded"] = True
+    if not os.path.exists(INDEX_FILE):
+        if os.path.exists(LEGACY_FILE):
+            migrate_legacy()
+        return
+    data = jsonio.load(INDEX_FILE)
+    _index["completed"] = set(data.get("completed_dates", []))
+    _index["partitions"] = data.get("partitions", {})
+
+
+def _write_index():
+    jsonio.dump(INDEX_FILE, {
+        "updated_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "total_games": sum(p["games"] for p in _index["partitions"].values()),
+        "partitions": dict(sorted(_index["partitions"].items())),
+        "completed_dates": sorted(_index["completed"]),
+    })
+
+
+def is_complete(d):
+    """True si la date a déjà été entièrement ingérée (aucun appel réseau à faire)."""
+    load_index()
+    return _as_date(d).isoformat() in _index["completed"]
+
+
+def mark_complete(d):
+    load_index()
+    iso = _as_date(d).isoformat()
+    if iso not in _index["completed"]:
+        _index["completed"].add(iso)
+        _dirty.add(None)   # seul l'index est à réécrire
+
+
+def is_settled(d, today=None):
+    """Une date plus vieille que SETTLE_DAYS ne peut plus recevoir de résultat."""
+    today = today or datetime.utcnow().date()
+    return _as_date(d) <= today - timedelta(days=SETTLE_DAYS)
+
+
+# ================= LECTURE / ÉCRITURE =================
+def _nearby_keys(d):
+    """Partitions pouvant contenir un match listé sur la page du jour `d`."""
+    d = _as_date(d)
+    span = timedelta(days=SCHEDULE_SPAN_DAYS)
+    return {partition_key(d - span), partition_key(d), partition_key(d + span)}
+
+
+def _nearby_ids(d):
+    ids = set()
+    for key in _nearby_keys(d):
+        _load_partition(key)
+        ids |= _partition_ids[key]
+    return ids
+
+
+def game_ids_for(d):
+    """
+    game_ids déjà stockés dans la partition de la date `d` et ses voisines
+    (la page du jour peut lister des matchs enregistrés à une date proche).
+    """
+    load_index()
+    return _nearby_ids(d)
+
+
+def add_games(games):
+    """
+    Ajoute des matchs (chacun porte son champ "date") dans leur partition.
+    Les game_id déjà présents (partition du match ou voisines) sont ignorés.
+    Retourne le nombre de matchs ajoutés.
+    """
+    load_index()
+    added = 0
+    for game in games:
+        key = partition_key(game["date"])
+        part = _load_partition(key)
+        if game["game_id"] in _nearby_ids(game["date"]):
+            continue
+        part.append(game)
+        _partition_ids[key].add(game["game_id"])
+        _dirty.add(key)
+        added += 1
+    return added
+
+
+def flush(legacy_export=None):
+    """
+    Écrit les partitions modifiées et l'index (écritures atomiques). L'export
+    legacy n'est régénéré que si une partition a changé.
+    """
+    load_index()
+    written = []
+    for key in sorted(k for k in _dirty if k):
+        part = _partitions[key]
+        part.sort(key=lambda g: g.get("date") or "")
+        jsonio.dump(_partition_path(key), part)
+        _index["partitions"][key] = {"games": len(part)}
+        written.append(key)
+    if _dirty:
+        _write_index()
+    _dirty.clear()
+
+    if written and (legacy_export if legacy_export is not None else LEGACY_EXPORT):
+        export_legacy()
+    return written
+
+
+def iter_games():
+    """Tous les matchs, dans l'ordre des dates."""
+    load_index()
+    for key in sorted(_index["partitions"]):
+        yield from _load_partition(key)
+
+
+def count_games():
+    load_index()
+    return sum(p["games"] for p in _index["partitions"].values())
+
+
+def export_legacy(path=LEGACY_FILE):
+    """Régénère l'ancien fichier unique (liste triée par date)."""
+    jsonio.dump(path, list(iter_games()))
+    print(f"💾 Export legacy : {path}")
+
+
+# ================= MIGRATION =================
+def migrate_legacy(path=LEGACY_FILE):
+    """
+    Découpe l'ancien NHL.json en partitions. Toutes les dates entre le premier
+    et le dernier match sont marquées complètes, sauf le dernier jour (re-vérifié
+    au prochain run).
+    """
+    games = jsonio.load(path)
+    print(f"📦 Migration de {path} ({len(games)} matchs) vers {STORE_DIR}/")
+
+    _index["loaded"] = True
+    _partitions.clear()
+    _partition_ids.clear()
+    by_key = {}
+    for game in games:
+        if game.get("date") and game.get("game_id"):
+            by_key.setdefault(partition_key(game["date"]), []).append(game)
+    for key, part in by_key.items():
+        _partitions[key] = part
+        _partition_ids[key] = {g["game_id"] for g in part}
+        _dirty.add(key)
+
+    dates = sorted(g["date"] for g in games if g.get("date"))
+    if dates:
+        current, last = _as_date(dates[0]), _as_date(dates[-1])
+        while current < last:
+            _index["completed"].add(current.isoformat())
+            current += timedelta(days=1)
+    _dirty.add(None)
+    flush(legacy_export=False)
+    print(f"✅ {len(by_key)} partitions, {len(_index['completed'])} dates complètes")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    if command == "migrate":
+        _index["loaded"] = True
+        migrate_legacy()
+    elif command == "export":
+        export_legacy()
+    else:
+        load_index()
+        print(f"📊 {count_games()} matchs, {len(_index['partitions'])} partitions, "
+              f"{len(_index['completed'])} dates complètes")
@@ -3,19 +3,25 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from bs4 import BeautifulSoup
-import json
-import time
+import copy
 import re
 import shutil
 import os
-import urllib.request
 from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import checkpoint
+import chrome_startup
+import fetch_backend
+import html_parser
+import instrumentation
+import jsonio
+import lean_browser
+import team_registry
+import update_planner
+import views
 
-TEAMS_JSON_URL = "https://raw.githubusercontent.com/PariALLIANCE/Data-Sports/main/data/football/teams/football_teams.json"
 
 # ── Sélection des ligues par plage d'index (1-based, inclusif) ──
 # Exemple : LEAGUE_INDEX_START=1, LEAGUE_INDEX_END=1  → uniquement la 1ère ligue
@@ -23,11 +29,19 @@ TEAMS_JSON_URL = "https://raw.githubusercontent.com/PariALLIANCE/Data-Sports/mai
 # Exemple : LEAGUE_INDEX_START=3, LEAGUE_INDEX_END=8  → de la 3ème à la 8ème ligue
 # L'ordre des ligues est celui d'apparition dans football_teams.json (liste
 # affichée en console au démarrage pour connaître les index disponibles).
-LEAGUE_INDEX_START =1 
-LEAGUE_INDEX_END = 4
+LEAGUE_INDEX_START = int(os.environ.get("LEAGUE_INDEX_START", "1"))
+LEAGUE_INDEX_END = int(os.environ.get("LEAGUE_INDEX_END", "4"))
+
+# ── Exécution en shards parallèles (voir scripts/shard_planner.py) ──
+# LEAGUE_INDEXES="2,7,11" : liste explicite d'index (remplace la plage)
+# SHARD_OUTPUT=chemin     : n'écrit que les équipes traitées par ce worker
+#                           dans ce fichier ; data_teams.json est reconstruit
+#                           par `shard_planner.py merge`
+LEAGUE_INDEXES = [int(i) for i in os.environ.get("LEAGUE_INDEXES", "").replace(" ", "").split(",") if i]
+SHARD_OUTPUT = os.environ.get("SHARD_OUTPUT", "").strip()
 
 START_SEASON = 2024
-END_SEASON = datetime.now().year  # saison actuelle incluse
+END_SEASON = fetch_backend.run_datetime().year  # saison actuelle incluse
 
 # ── Chemins de sortie / nettoyage ───────────────────────────────
 LEAGUES_DIR = os.path.join("data", "football", "leagues")
@@ -66,8 +80,7 @@ def load_existing_data():
         print(f"ℹ️ Aucun fichier existant ({OUTPUT_JSON_PATH}) — toutes les équipes seront traitées comme non trackées")
         return {}
     try:
-        with open(OUTPUT_JSON_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = jsonio.load(OUTPUT_JSON_PATH)
     except Exception as e:
         print(f"⚠️ Erreur lecture JSON existant : {e} — traité comme absent")
         return {}
@@ -121,7 +134,7 @@ def merge_matches(existing_matches, new_matches):
     return merged, new_match_ids
 
 
-def setup_driver():
+def _start_chrome():
     chrome_options = Options()
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
@@ -140,7 +153,9 @@ def setup_driver():
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
     chrome_options.add_experimental_option("useAutomationExtension", False)
 
-    service = Service(ChromeDriverManager().install())
+    lean_browser.apply_options(chrome_options)
+    chrome_startup.apply_options(chrome_options, "Teams_tracker")
+    service = chrome_startup.service(chrome_options)
     driver = webdriver.Chrome(service=service, options=chrome_options)
     driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
     driver.set_page_load_timeout(60)
@@ -148,6 +163,11 @@ def setup_driver():
     return driver
 
 
+def setup_driver():
+    """Driver Chrome réel (live / record) ou driver de rejeu (FETCH_MODE=replay)."""
+    return fetch_backend.open_driver(_start_chrome)
+
+
 def fix_url(url, base="https://www.espn.com"):
     """Normalise une URL relative en URL absolue."""
     if not url:
@@ -218,33 +238,6 @@ def simplify_competition_label(competition):
 # DÉCOUVERTE DES LIGUES DISPONIBLES ET SÉLECTION PAR PLAGE D'INDEX
 # ===============================================================
 
-def fetch_teams_json():
-    """Télécharge et retourne le contenu complet de football_teams.json."""
-    print(f"🌐 Téléchargement de {TEAMS_JSON_URL}")
-    req = urllib.request.Request(TEAMS_JSON_URL, headers={"User-Agent": "Mozilla/5.0"})
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        return json.loads(resp.read().decode("utf-8"))
-
-
-def list_all_leagues(data):
-    """
-    Construit la liste ordonnée (et dédupliquée) de toutes les ligues
-    présentes dans football_teams.json, dans leur ordre d'apparition
-    (pays par pays, puis équipe par équipe). Chaque entrée est un dict
-    {"country": ..., "league_name": ...}. C'est cette liste, numérotée
-    à partir de 1, qui sert de référence pour LEAGUE_INDEX_START/END.
-    """
-    leagues = []
-    seen = set()
-    for country, teams_list in data.items():
-        for t in teams_list:
-            league_name = t.get("league_name")
-            if league_name and league_name not in seen:
-                seen.add(league_name)
-                leagues.append({"country": country, "league_name": league_name})
-    return leagues
-
-
 def select_leagues_by_range(all_leagues, index_start, index_end):
     """
     Sélectionne une plage de ligues (1-based, inclusive) parmi
@@ -264,6 +257,21 @@ def select_leagues_by_range(all_leagues, index_start, index_end):
     return all_leagues[start - 1:end]
 
 
+def select_leagues_by_indexes(all_leagues, indexes):
+    """Sélectionne les ligues d'une liste d'index 1-based (ordre conservé)."""
+    n = len(all_leagues)
+    invalid = [i for i in indexes if not 1 <= i <= n]
+    if invalid:
+        print(f"⚠️ Index hors plage ignorés : {invalid}")
+    return [all_leagues[i - 1] for i in indexes if 1 <= i <= n]
+
+
+def selection_label():
+    if LEAGUE_INDEXES:
+        return f"index {','.join(map(str, LEAGUE_INDEXES))}"
+    return f"[{LEAGUE_INDEX_START}, {LEAGUE_INDEX_END}]"
+
+
 def target_league_label(league_name, country):
     """
     Dérive le libellé ESPN correspondant à un league_name composite
@@ -275,13 +283,12 @@ def target_league_label(league_name, country):
     return " ".join(parts)
 
 
-def fetch_teams_for_league(data, country, league_name):
+def fetch_teams_for_league(country, league_name):
     """
     Retourne TOUTES les équipes d'une ligue donnée (country +
-    league_name) à partir du JSON déjà téléchargé.
+    league_name) depuis le registre des équipes (index par ligue).
     """
-    country_teams = data.get(country, [])
-    league_teams = [t for t in country_teams if t.get("league_name") == league_name]
+    league_teams = team_registry.teams_for_league(league_name, country)
 
     print(f"📋 {len(league_teams)} équipe(s) trouvée(s) pour {league_name}")
     for t in league_teams:
@@ -429,6 +436,10 @@ def extract_match_info(match_row, month, season):
         return None
 
 
+# Lignes de match des tableaux mensuels de la page résultats (rendues côté client)
+RESULTS_ROW_SELECTOR = "div.ResponsiveTable tr.Table__TR--sm"
+
+
 def scrape_team_results_for_seasons(driver, team_name, team_id, seasons):
     """
     Scrape les résultats d'une équipe ESPN pour la liste de saisons
@@ -443,13 +454,13 @@ def scrape_team_results_for_seasons(driver, team_name, team_id, seasons):
         print(f"🌐 Accès: {url}")
         try:
             driver.get(url)
-            print("⏳ Attente du chargement initial (5s)...")
-            time.sleep(5)
+            print("⏳ Attente des tableaux de résultats (5s max)...")
+            fetch_backend.settle(driver, 5, selector=RESULTS_ROW_SELECTOR)
 
             driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
+            fetch_backend.settle(driver, 2, min_seconds=0.5, selector=RESULTS_ROW_SELECTOR)
             driver.execute_script("window.scrollTo(0, 0);")
-            time.sleep(1)
+            fetch_backend.settle(driver, 1, selector=RESULTS_ROW_SELECTOR)
 
             try:
                 WebDriverWait(driver, 30).until(
@@ -513,6 +524,225 @@ def scrape_team_results_for_seasons(driver, team_name, team_id, seasons):
     return unique_matches
 
 
+# ===============================================================
+# CRAWL PAR LIGUE (API scoreboard ESPN)
+# ===============================================================
+# Un match de championnat apparaît sur la page résultats des DEUX équipes :
+# en mode "league" (défaut), les matchs de championnat de la saison sont lus
+# en une requête sur l'API scoreboard, puis découpés en vues par équipe. Les
+# autres compétitions (coupes, super coupes, compétitions continentales…)
+# viennent du calendrier JSON de chaque équipe (toutes compétitions, une
+# requête HTTP par saison, sans navigateur) : seuls ses matchs absents du
+# crawl ligue sont gardés. La page résultats de l'équipe n'est chargée que
+# si ce calendrier est illisible ; si l'API n'a rien rendu pour la ligue,
+# les pages équipes sont utilisées telles quelles.
+# Mode "team" : pages équipes seules, comportement historique.
+
+RESULTS_CRAWL = os.environ.get("RESULTS_CRAWL", "league").strip().lower()   # league | team
+SCOREBOARD_URL = "https://site.api.espn.com/apis/site/v2/sports/soccer/{league_id}/scoreboard"
+TEAM_SCHEDULE_URL = "https://site.api.espn.com/apis/site/v2/sports/soccer/all/teams/{team_id}/schedule?season={season}"
+# Les pages ESPN affichent les dates à l'heure de l'Est américain ; l'API
+# donne des heures UTC (un match tardif aux Amériques y passe au lendemain)
+ESPN_TIMEZONE = ZoneInfo("America/New_York")
+
+_scoreboards = {}   # (competition_id, saison) → liste de matchs, ou None si échec
+
+
+def _scoreboard_json(url):
+    resp = fetch_backend.http_get(url, timeout=30)
+    instrumentation.incr("scoreboard_requests")
+    if resp.status_code != 200:
+        print(f"   ⚠️ HTTP {resp.status_code} — {url}")
+        return None
+    try:
+        return resp.json()
+    except ValueError:
+        print(f"   ⚠️ Réponse non JSON — {url}")
+        return None
+
+
+def season_date_range(competition_id, season):
+    """
+    Bornes (YYYYMMDD, YYYYMMDD) de la saison ESPN `season` d'une compétition.
+    Lues dans leagues[0].season de l'API ; à défaut juillet → juin.
+    """
+    data = _scoreboard_json(f"{SCOREBOARD_URL.format(league_id=competition_id)}?dates={season}&limit=1")
+    try:
+        season_info = data["leagues"][0]["season"]
+        start = season_info["startDate"][:10].replace("-", "")
+        end = season_info["endDate"][:10].replace("-", "")
+        if start and end:
+            return start, end
+    except (TypeError, KeyError, IndexError):
+        pass
+    return f"{season}0701", f"{season + 1}0630"
+
+
+def _competitor_side(competitor):
+    team = competitor.get("team") or {}
+    team_id = str(team.get("id") or "")
+    href = next(
+        (link.get("href") for link in team.get("links", []) if "/id/" in (link.get("href") or "")),
+        "",
+    )
+    name = team_name_from_href(href) if href else normalize_team_name(team.get("displayName", ""))
+    score = str(competitor.get("score", ""))
+    return team_id, name, int(score) if score.isdigit() else None
+
+
+def local_event_date(utc_text):
+    """"2025-10-19T00:30Z" (API, UTC) → "2025-10-18" (date affichée par ESPN)."""
+    if not utc_text:
+        return None
+    try:
+        dt = datetime.strptime(utc_text.replace("Z", "+0000"), "%Y-%m-%dT%H:%M%z")
+    except ValueError:
+        return utc_text[:10] or None
+    return dt.astimezone(ESPN_TIMEZONE).strftime("%Y-%m-%d")
+
+
+def scoreboard_event_to_match(event, season, competition):
+    """Convertit un événement terminé de l'API au format de extract_match_info."""
+    comp = (event.get("competitions") or [{}])[0]
+    status = ((comp.get("status") or event.get("status") or {}).get("type") or {})
+    if not status.get("completed"):
+        return None
+
+    sides = {c.get("homeAway"): c for c in comp.get("competitors", [])}
+    if "home" not in sides or "away" not in sides:
+        return None
+    home_id, home_name, home_score = _competitor_side(sides["home"])
+    away_id, away_name, away_score = _competitor_side(sides["away"])
+
+    match_id = str(event.get("id") or "")
+    match_url = next(
+        (link.get("href") for link in event.get("links", []) if "/gameId/" in (link.get("href") or "")),
+        f"https://www.espn.com/soccer/match/_/gameId/{match_id}" if match_id else "",
+    )
+    result_raw = status.get("shortDetail") or "FT"
+    decided_by_penalties = bool(re.search(r"pen", f"{status.get('name', '')} {result_raw}", re.IGNORECASE))
+
+    return {
+        "date": local_event_date(event.get("date")),
+        "home_team": home_name,
+        "home_team_id": home_id,
+        "home_logo_url": build_logo_url(home_id),
+        "home_score": home_score,
+        "away_score": away_score,
+        "away_team": away_name,
+        "away_team_id": away_id,
+        "away_logo_url": build_logo_url(away_id),
+        "match_url": fix_url(match_url),
+        "match_id": match_id,
+        "result": result_raw,
+        "decided_by_penalties": decided_by_penalties,
+        "penalty_winner": None,
+        "team_result": None,
+        "competition": competition,
+        "season": format_season(season),
+        "matchday": None,
+        "round": None,
+        "odds": {"home": None, "away": None, "draw": None},
+        "has_full_stats": False,
+        "stats": {},
+        "next_game": None,
+    }
+
+
+def fetch_competition_season(competition_id, season):
+    """Matchs terminés d'une compétition pour une saison (mis en cache par run)."""
+    key = (competition_id, season)
+    if key in _scoreboards:
+        return _scoreboards[key]
+
+    start, end = season_date_range(competition_id, season)
+    url = f"{SCOREBOARD_URL.format(league_id=competition_id)}?dates={start}-{end}&limit=1000"
+    print(f"   🌐 Scoreboard {competition_id} {format_season(season)} : {url}")
+    data = _scoreboard_json(url)
+    if data is None:
+        _scoreboards[key] = None
+        return None
+
+    leagues_info = data.get("leagues") or [{}]
+    competition = leagues_info[0].get("name") or competition_id
+    matches = []
+    for event in data.get("events", []):
+        m = scoreboard_event_to_match(event, season, competition)
+        if m:
+            matches.append(m)
+    print(f"   ✅ {len(matches)} match(s) terminé(s) — {competition}")
+    _scoreboards[key] = matches
+    return matches
+
+
+def crawl_league_results(league_id, seasons):
+    """
+    Matchs de championnat terminés des saisons demandées.
+    Retourne None si le championnat n'a pu être lu (repli sur les pages équipes).
+    """
+    if not league_id:
+        return None
+    matches = []
+    for season in seasons:
+        domestic = fetch_competition_season(league_id, season)
+        if not domestic:
+            print(f"⚠️ Scoreboard {league_id} vide pour {format_season(season)} — repli pages équipes")
+            return None
+        matches.extend(domestic)
+    return matches
+
+
+def fetch_team_other_games(team_id, seasons, league_match_ids):
+    """
+    Matchs terminés de l'équipe absents du crawl ligue (coupes, super coupes,
+    compétitions continentales…), lus dans son calendrier JSON ESPN.
+    Retourne None si le calendrier d'une saison est illisible (repli page résultats).
+    """
+    matches = []
+    for season in seasons:
+        data = _scoreboard_json(TEAM_SCHEDULE_URL.format(team_id=team_id, season=season))
+        instrumentation.incr("team_schedule_requests")
+        if data is None:
+            return None
+        for event in data.get("events", []):
+            if str(event.get("id") or "") in league_match_ids:
+                continue
+            competition = (event.get("league") or {}).get("name") or (event.get("seasonType") or {}).get("name") or ""
+            m = scoreboard_event_to_match(event, season, competition)
+            if m:
+                matches.append(m)
+    return matches
+
+
+def team_view_from_league(league_matches, other_matches, team_id, seasons):
+    """
+    Vue d'une équipe (copie indépendante de chaque match, récents en premier) :
+    championnat depuis le crawl ligue, autres compétitions depuis
+    `other_matches` (calendrier JSON de l'équipe, ou sa page résultats en
+    repli ; tout match absent du crawl ligue y est conservé).
+    """
+    wanted = {format_season(s) for s in seasons}
+    seen = set()
+    view = []
+    for m in league_matches:
+        if team_id not in (m["home_team_id"], m["away_team_id"]) or m["season"] not in wanted:
+            continue
+        if m["match_id"] in seen:
+            continue
+        seen.add(m["match_id"])
+        view.append(copy.deepcopy(m))
+    from_league = len(view)
+    for m in other_matches:
+        if m["match_id"] and m["match_id"] in seen:
+            continue
+        seen.add(m["match_id"])
+        view.append(m)
+    view.sort(key=date_sort_key, reverse=True)
+    print(f"\n✅ {len(view)} match(s) pour l'équipe {team_id} : {from_league} championnat (crawl ligue), "
+          f"{len(view) - from_league} autre(s) compétition(s) (saisons: {seasons})")
+    return view
+
+
 def compute_matchdays_for_team(matches, league_label):
     """
     Calcule la journée (matchday) de championnat pour chaque match,
@@ -929,7 +1159,7 @@ def get_match_details_selenium(driver, game_id, home_team_id=None, away_team_id=
         print(f"    ⚠️  WebDriver erreur ({game_id}) : {e}")
         return {}, {"home": None, "away": None, "draw": None}, None, None, False
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    soup = html_parser.parse(driver.page_source)
 
     ml = extract_ml_odds(soup)
     odds = {
@@ -962,7 +1192,6 @@ def get_match_details_selenium(driver, game_id, home_team_id=None, away_team_id=
                         }
                 except NoSuchElementException:
                     continue
-            time.sleep(0.6)
         except NoSuchElementException:
             pass
         except Exception as e:
@@ -1018,6 +1247,17 @@ def enrich_matches_with_stats_and_odds(driver, all_matches_by_team, only_match_i
     for idx, gid in enumerate(unique_game_ids, 1):
         meta = game_meta[gid]
         print(f"\n  [{idx}/{total}] gameId={gid}")
+
+        done = checkpoint.get("game", gid)
+        if done is not None:
+            stats_by_game_id[gid] = done["stats"]
+            odds_by_game_id[gid] = done["odds"]
+            round_by_game_id[gid] = done["round"]
+            penalty_winner_by_game_id[gid] = done["penalty_winner"]
+            has_full_stats_by_game_id[gid] = done["has_full_stats"]
+            print("    ⏯️ déjà enrichi (checkpoint)")
+            continue
+
         try:
             stats, odds, round_label, penalty_winner, has_full_stats = get_match_details_selenium(
                 driver, gid,
@@ -1025,6 +1265,12 @@ def enrich_matches_with_stats_and_odds(driver, all_matches_by_team, only_match_i
                 away_team_id=meta["away_team_id"],
                 decided_by_penalties=meta["decided_by_penalties"],
             )
+            # Seuls les enrichissements réussis sont journalisés : un échec
+            # sera retenté à la reprise.
+            checkpoint.record("game", gid, {
+                "stats": stats, "odds": odds, "round": round_label,
+                "penalty_winner": penalty_winner, "has_full_stats": has_full_stats,
+            })
         except Exception as e:
             print(f"    ⚠️ Erreur stats/cotes/round/pens gameId={gid}: {e}")
             stats = {}
@@ -1048,7 +1294,6 @@ def enrich_matches_with_stats_and_odds(driver, all_matches_by_team, only_match_i
         pens_str = f"🥅 pens: {penalty_winner}" if meta["decided_by_penalties"] else ""
         full_str = "✅ stats complètes" if has_full_stats else "⚠️ stats partielles"
         print(f"    📊 {len(stats)} statistique(s)  |  {full_str}  |  {odds_str}  |  {round_str}  {pens_str}")
-        time.sleep(0.8)
 
     for matches in all_matches_by_team.values():
         for m in matches:
@@ -1183,7 +1428,7 @@ def fetch_next_game_from_fixtures(driver, team_id, team_name, league_label):
 
     try:
         driver.get(url)
-        time.sleep(3)
+        fetch_backend.settle(driver, 3, selector="div.ResponsiveTable tr.Table__TR")
         WebDriverWait(driver, 20).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, "div.ResponsiveTable"))
         )
@@ -1193,7 +1438,7 @@ def fetch_next_game_from_fixtures(driver, team_id, team_name, league_label):
         print(f"    ⚠️ Erreur accès fixtures {team_name}: {e}")
         return None
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    soup = html_parser.parse(driver.page_source)
 
     tables = soup.select("div.ResponsiveTable")
     if not tables:
@@ -1227,8 +1472,8 @@ def fetch_next_game_from_fixtures(driver, team_id, team_name, league_label):
             WebDriverWait(driver, 12).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
-            time.sleep(1)
-            match_soup = BeautifulSoup(driver.page_source, "html.parser")
+            fetch_backend.settle(driver, 3, selector="section[data-testid='prism-LayoutCard']")
+            match_soup = html_parser.parse(driver.page_source)
 
             if is_league_match:
                 matchday = compute_upcoming_matchday(
@@ -1345,24 +1590,35 @@ def scrape_with_selenium():
     driver = None
 
     try:
-        data = fetch_teams_json()
-
-        all_leagues = list_all_leagues(data)
+        # Ordre des ligues = ordre d'apparition dans football_teams.json :
+        # c'est cette liste, numérotée à partir de 1, qui sert de référence
+        # pour LEAGUE_INDEX_START/END.
+        all_leagues = team_registry.leagues()
         print(f"\n📚 {len(all_leagues)} ligue(s) disponible(s) au total :")
         for i, lg in enumerate(all_leagues, 1):
             print(f"   [{i}] {lg['country']} — {lg['league_name']}")
 
-        selected_leagues = select_leagues_by_range(all_leagues, LEAGUE_INDEX_START, LEAGUE_INDEX_END)
+        if LEAGUE_INDEXES:
+            selected_leagues = select_leagues_by_indexes(all_leagues, LEAGUE_INDEXES)
+        else:
+            selected_leagues = select_leagues_by_range(all_leagues, LEAGUE_INDEX_START, LEAGUE_INDEX_END)
         if not selected_leagues:
-            print(f"❌ Aucune ligue sélectionnée pour la plage [{LEAGUE_INDEX_START}, {LEAGUE_INDEX_END}].")
+            print(f"❌ Aucune ligue sélectionnée pour la sélection {selection_label()}.")
             return []
 
-        print(f"\n✅ Plage sélectionnée [{LEAGUE_INDEX_START}, {LEAGUE_INDEX_END}] → {len(selected_leagues)} ligue(s) :")
+        print(f"\n✅ Sélection {selection_label()} → {len(selected_leagues)} ligue(s) :")
         for lg in selected_leagues:
             print(f"   - {lg['country']} — {lg['league_name']}")
 
         existing_teams_by_id = load_existing_data()
 
+        # Journal de reprise : une exécution interrompue (crash, timeout CI)
+        # reprend là où elle s'était arrêtée pour la même plage de ligues.
+        checkpoint.open_journal(
+            "Teams_tracker",
+            f"leagues {selection_label()} | seasons {START_SEASON}-{END_SEASON}",
+        )
+
         print("\n🚀 Démarrage du navigateur (headless)...")
         driver = setup_driver()
         print("✅ Navigateur démarré")
@@ -1381,29 +1637,76 @@ def scrape_with_selenium():
             print(f"🏆 LIGUE: {league_country} — {league_name} (libellé ESPN: {league_label})")
             print("#" * 60)
 
-            teams = fetch_teams_for_league(data, league_country, league_name)
+            teams = fetch_teams_for_league(league_country, league_name)
             if not teams:
                 print(f"⚠️ Aucune équipe trouvée pour {league_name}, ligue ignorée.")
                 continue
 
+            # Équipes trackées sans match joué depuis leur dernier scraping :
+            # ignorées (voir update_planner), leur entrée est conservée.
+            plan = {
+                t.get("team_id", ""): update_planner.decide(existing_teams_by_id.get(t.get("team_id")))
+                for t in teams
+            }
+            pending = [
+                t for t in teams
+                if checkpoint.get("team", t.get("team_id", "")) is None and plan[t.get("team_id", "")][0]
+            ]
+            skipped = sum(1 for due, _ in plan.values() if not due)
+            if skipped:
+                print(f"📅 {skipped}/{len(teams)} équipe(s) sans nouveau match attendu — ignorée(s)")
+
+            # Mode "league" : championnat lu une fois pour toute la ligue sur
+            # l'API scoreboard, plus de page résultats par équipe.
+            league_matches = None
+            if RESULTS_CRAWL == "league":
+                if pending:
+                    all_tracked = all(existing_teams_by_id.get(t.get("team_id")) for t in pending)
+                    league_seasons = [END_SEASON] if all_tracked else list(range(START_SEASON, END_SEASON + 1))
+                    with instrumentation.timer("league_crawl"):
+                        league_matches = crawl_league_results(teams[0].get("league_id"), league_seasons)
+            league_match_ids = {m["match_id"] for m in league_matches or []}
+
             for team in teams:
                 team_name = team.get("team", "")
                 team_id = team.get("team_id", "")
 
+                done = checkpoint.get("team", team_id)
+                if done is not None:
+                    print(f"\n⏯️ {team_name} (id={team_id}) déjà scrapée (checkpoint) — {len(done['matches'])} match(s)")
+                    matches_by_team[team_id] = done["matches"]
+                    team_meta[team_id] = done["meta"]
+                    new_match_ids_global |= set(done["new_match_ids"])
+                    continue
+
+                due, reason = plan[team_id]
+                update_planner.record(reason)
+                if not due:
+                    continue
+
                 existing_entry = existing_teams_by_id.get(team_id)
                 is_tracked = existing_entry is not None
 
                 print("\n" + "=" * 60)
                 print(f"⚽ ÉQUIPE: {team_name} (id={team_id}) — {league_name}")
                 if is_tracked:
-                    print(f"🔁 Équipe déjà trackée — mise à jour saison en cours uniquement ({format_season(END_SEASON)})")
+                    print(f"🔁 Équipe déjà trackée ({reason}) — mise à jour saison en cours uniquement ({format_season(END_SEASON)})")
                     seasons_to_scrape = [END_SEASON]
                 else:
                     print(f"🆕 Équipe jamais trackée — scraping complet depuis {format_season(START_SEASON)}")
                     seasons_to_scrape = list(range(START_SEASON, END_SEASON + 1))
                 print("=" * 60)
 
-                newly_scraped = scrape_team_results_for_seasons(driver, team_name, team_id, seasons_to_scrape)
+                instrumentation.incr("teams_scraped")
+                with instrumentation.timer("team_results"):
+                    if league_matches is not None:
+                        others = fetch_team_other_games(team_id, seasons_to_scrape, league_match_ids)
+                        if others is None:
+                            print("⚠️ Calendrier JSON illisible — repli page résultats")
+                            others = scrape_team_results_for_seasons(driver, team_name, team_id, seasons_to_scrape)
+                        newly_scraped = team_view_from_league(league_matches, others, team_id, seasons_to_scrape)
+                    else:
+                        newly_scraped = scrape_team_results_for_seasons(driver, team_name, team_id, seasons_to_scrape)
                 newly_scraped = compute_matchdays_for_team(newly_scraped, league_label)
 
                 existing_matches_flat = flatten_existing_matches(existing_entry) if is_tracked else []
@@ -1417,9 +1720,16 @@ def scrape_with_selenium():
                 # On mémorise le pays/la ligue avec l'équipe pour la suite du traitement
                 team_meta[team_id] = {**team, "_league_country": league_country, "_league_label": league_label}
                 new_match_ids_global |= new_match_ids
+                checkpoint.record("team", team_id, {
+                    "matches": merged_matches,
+                    "meta": team_meta[team_id],
+                    "new_match_ids": sorted(new_match_ids),
+                })
 
+        instrumentation.incr("new_matches", len(new_match_ids_global))
         if new_match_ids_global:
-            enrich_matches_with_stats_and_odds(driver, matches_by_team, only_match_ids=new_match_ids_global)
+            with instrumentation.timer("enrich"):
+                enrich_matches_with_stats_and_odds(driver, matches_by_team, only_match_ids=new_match_ids_global)
         else:
             print("\nℹ️ Aucun nouveau match à enrichir")
 
@@ -1428,6 +1738,13 @@ def scrape_with_selenium():
         for team_id, unique_matches in matches_by_team.items():
             team = team_meta[team_id]
             team_name = team.get("team", "")
+
+            done = checkpoint.get("team_output", team_id)
+            if done is not None:
+                print(f"\n⏯️ {team_name} : sortie déjà construite (checkpoint)")
+                newly_processed_by_id[team_id] = done
+                continue
+
             team_country = team.get("_league_country", "")
             league_label = team.get("_league_label", "")
 
@@ -1435,7 +1752,8 @@ def scrape_with_selenium():
                 m["team_result"] = compute_team_result(m, team_id)
 
             # ── Chaînage next_game (match suivant chronologique par match) ──
-            unique_matches = apply_next_game_chain(driver, unique_matches, team_id, team_name, league_label)
+            with instrumentation.timer("next_game_chain"):
+                unique_matches = apply_next_game_chain(driver, unique_matches, team_id, team_name, league_label)
             unique_matches.sort(key=date_sort_key, reverse=True)
 
             team_output = {
@@ -1451,6 +1769,7 @@ def scrape_with_selenium():
             }
 
             newly_processed_by_id[team_id] = clean_team_output(team_output)
+            checkpoint.record("team_output", team_id, newly_processed_by_id[team_id])
 
             competitions = {}
             for m in unique_matches:
@@ -1478,14 +1797,21 @@ def scrape_with_selenium():
             "teams": output_data,
         }
 
-        with open(OUTPUT_JSON_PATH, "w", encoding="utf-8") as f:
-            json.dump(
-                final_output,
-                f,
-                ensure_ascii=False,
-                indent=2,
-                separators=(",", ": "),
-            )
+        if SHARD_OUTPUT:
+            # Mode shard : seules les équipes de ce worker sont écrites, la
+            # fusion dans data_teams.json est faite par shard_planner.py merge.
+            jsonio.dump(SHARD_OUTPUT, {
+                "selection": selection_label(),
+                "scraped_at": datetime.now().isoformat(),
+                "teams": list(newly_processed_by_id.values()),
+            })
+            checkpoint.complete()
+            print(f"\n💾 Shard {SHARD_OUTPUT} sauvegardé ({len(newly_processed_by_id)} équipe(s))")
+            return list(newly_processed_by_id.values())
+
+        jsonio.dump(OUTPUT_JSON_PATH, final_output)
+        views.write_views(output_data, newly_processed_by_id)
+        checkpoint.complete()
 
         print(f"\n💾 {OUTPUT_JSON_PATH} sauvegardé ({len(output_data)} équipe(s) au total)")
 
@@ -1497,16 +1823,20 @@ def scrape_with_selenium():
         traceback.print_exc()
         return []
     finally:
+        checkpoint.close()
         if driver:
             print("\n🧹 Fermeture du navigateur…")
             driver.quit()
 
 
 def main():
+    instrumentation.start_run()
     print("=" * 60)
     print("⚽ ESPN SCRAPER — TRACKING INCRÉMENTAL (PLAGE DE LIGUES)")
-    print(f"📆 Plage de ligues sélectionnée: [{LEAGUE_INDEX_START}, {LEAGUE_INDEX_END}]")
+    print(f"📆 Ligues sélectionnées: {selection_label()}")
     print("📆 Scraping complet si jamais trackée, sinon mise à jour saison en cours + next_game chaîné par match")
+    print(f"📆 Plan de mise à jour : {update_planner.UPDATE_PLAN} (équipes trackées : seulement si leur prochain match est passé"
+          f" ou scraping > {update_planner.FIXTURE_STALE_DAYS} j)")
     print("=" * 60)
 
     reset_output_directories()
@@ -0,0 +1,257 @@
+"""
+Classements « à date » (as-of) rejoués à partir des résultats des ligues.
+
+Standings.json ne contient que le classement au moment du scraping : pour
+une feature du type « position moyenne des adversaires battus », il faut la
+position de chaque adversaire à la date du match, sans fuite des matchs
+suivants. Les résultats de data/football/leagues_with_odds/<Ligue>.json
+sont rejoués dans l'ordre chronologique, saison par saison ; après chaque
+journée (date), seules les équipes qui ont joué reçoivent une nouvelle
+ligne (points, différence de buts, buts marqués, matchs joués). La position
+est recalculée à la requête à partir des lignes de toutes les équipes :
+
+    asof_standings.at("England_Premier_League", "Arsenal", "2025-12-14")
+    → {"position": 2, "points": 33, "goal_diff": 17, "played": 15}
+
+La valeur retournée est le classement AVANT les matchs du jour demandé
+(seuls les matchs de dates strictement antérieures comptent). Recherche
+dichotomique sur les dates de chaque équipe de la saison, puis tri de la
+vingtaine de lignes obtenues.
+
+Index persistant (compact, sans indentation) : .cache/asof_standings.json,
+une entrée par ligue avec la signature (mtime_ns, taille) de son fichier
+source ; seules les ligues dont le fichier a changé sont rejouées.
+
+Saisons : découpées par mois de début (SEASON_STARTS, juillet par défaut ;
+tournois Apertura / Clausura = deux saisons par an). Départage : points,
+différence de buts, buts marqués, nom. Les phases finales / play-offs ne
+sont pas distinguées de la saison régulière.
+
+Saison tronquée : les fichiers commencent au 2023-01-01, la première saison
+d'une ligue qui démarre en juillet n'y est rejouée qu'à partir de janvier
+(points et positions faux). La première saison est marquée incomplète si
+son premier match tombe plus de INCOMPLETE_GRACE_DAYS jours plus tard (par
+rapport au début de saison) que dans les saisons suivantes ; at() renvoie
+alors None. L'écart est relatif car certaines ligues démarrent bien après
+leur mois de saison (Brésil, Suède : avril).
+
+CLI :
+    python scripts/asof_standings.py build
+    python scripts/asof_standings.py <Ligue> <équipe> <YYYY-MM-DD>
+"""
+
+import bisect
+import glob
+import os
+import sys
+from datetime import datetime
+
+import instrumentation
+import jsonio
+
+RESULTS_DIR = os.path.join("data", "football", "leagues_with_odds")
+INDEX_FILE = os.path.join(".cache", "asof_standings.json")
+
+# Mois de début de saison (plusieurs : tournois courts, un classement chacun)
+DEFAULT_SEASON_STARTS = (7,)
+SEASON_STARTS = {
+    "Brazil_Serie_A": (1,),
+    "Brazil_Serie_B": (1,),
+    "Chile_Primera_Division": (1,),
+    "China_Super_League": (1,),
+    "Colombia_Primera_A": (1, 7),
+    "Japan_J1_League": (1,),
+    "Mexico_Liga_MX": (1, 7),
+    "Paraguay_Division_Profesional": (1, 7),
+    "Peru_Primera_Division": (1, 7),
+    "Sweden_Allsvenskan": (1,),
+    "USA_Major_League_Soccer": (1,),
+    "Venezuela_Primera_Division": (1, 7),
+}
+
+# Retard max du premier match de la première saison sur les suivantes
+INCOMPLETE_GRACE_DAYS = 45
+
+# Version du format de l'index persistant (une entrée d'une autre version est rejouée)
+INDEX_VERSION = 3
+
+# Compétitions à élimination directe : pas de classement à rejouer
+NON_LEAGUE = {"FIFA_Club_World_Cup", "UEFA_Champions_League", "UEFA_Europa_League"}
+
+_index = {
+    "loaded": False,
+    "leagues": {},   # ligue → {"version", "source": [mtime_ns, taille], "seasons": {saison: {...}}}
+}
+
+
+# ===============================================================
+# RÉSULTATS
+# ===============================================================
+
+def to_iso(date_text):
+    """"Sunday, January 1, 2023" (format leagues_with_odds) → "2023-01-01"."""
+    try:
+        return datetime.strptime(date_text, "%A, %B %d, %Y").strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return date_text if isinstance(date_text, str) and len(date_text) == 10 else None
+
+
+def season_of(league, date_iso):
+    """Clé de saison d'une date : "YYYY-MM" du début de la saison / du tournoi."""
+    year, month = int(date_iso[:4]), int(date_iso[5:7])
+    starts = SEASON_STARTS.get(league, DEFAULT_SEASON_STARTS)
+    past = [m for m in starts if m <= month]
+    if past:
+        return f"{year}-{max(past):02d}"
+    return f"{year - 1}-{max(starts):02d}"
+
+
+def _score(text):
+    try:
+        home, away = (int(x) for x in text.split("-"))
+    except (AttributeError, ValueError):
+        return None
+    return home, away
+
+
+def league_results(path):
+    """[(date, domicile, extérieur, buts dom., buts ext.)] triés, matchs terminés seulement."""
+    results = []
+    for entry in jsonio.load(path, default=[]):
+        date, score = to_iso(entry.get("date")), _score(entry.get("score"))
+        if date and score and entry.get("team1") and entry.get("team2"):
+            results.append((date, entry["team1"], entry["team2"], *score))
+    results.sort()
+    return results
+
+
+# ===============================================================
+# REJEU
+# ===============================================================
+
+def _start_offset(season, first_date):
+    """Jours entre le début de la saison ("YYYY-MM") et son premier match."""
+    return (datetime.strptime(first_date, "%Y-%m-%d") - datetime.strptime(season, "%Y-%m")).days
+
+
+def replay_league(league, results):
+    """
+    Lignes par saison : {saison: {"start", "teams", "incomplete"}},
+    teams = {équipe: {"dates": [...], "rows": [[points, diff, buts, joués], ...]}}
+    (une ligne par journée où l'équipe a joué, dates croissantes).
+    """
+    seasons = {}
+    by_season = {}
+    for r in results:
+        by_season.setdefault(season_of(league, r[0]), []).append(r)
+
+    for season, matches in by_season.items():
+        table, teams, played_today = {}, {}, set()
+        for i, (date, home, away, home_goals, away_goals) in enumerate(matches):
+            for team, scored, conceded in ((home, home_goals, away_goals), (away, away_goals, home_goals)):
+                row = table.setdefault(team, {"points": 0, "goal_diff": 0, "goals_for": 0, "played": 0})
+                row["points"] += 3 if scored > conceded else 1 if scored == conceded else 0
+                row["goal_diff"] += scored - conceded
+                row["goals_for"] += scored
+                row["played"] += 1
+                played_today.add(team)
+            # Fin de journée (dernier match de la date) : une ligne par équipe qui a joué
+            if i + 1 == len(matches) or matches[i + 1][0] != date:
+                for team in played_today:
+                    row = table[team]
+                    changes = teams.setdefault(team, {"dates": [], "rows": []})
+                    changes["dates"].append(date)
+                    changes["rows"].append([row["points"], row["goal_diff"], row["goals_for"], row["played"]])
+                played_today.clear()
+        seasons[season] = {"start": matches[0][0], "teams": teams, "incomplete": False}
+
+    # Seule la première saison peut être tronquée par le début des données
+    if len(seasons) > 1:
+        first, *others = sorted(seasons)
+        reference = max(_start_offset(s, seasons[s]["start"]) for s in others)
+        if _start_offset(first, seasons[first]["start"]) > reference + INCOMPLETE_GRACE_DAYS:
+            seasons[first]["incomplete"] = True
+    return seasons
+
+
+def _source_signature(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def build(force=False):
+    """Charge l'index persistant et rejoue les ligues dont le fichier a changé."""
+    if _index["loaded"] and not force:
+        return _index
+    with instrumentation.timer("asof_standings_build"):
+        stored = {} if force else jsonio.load(INDEX_FILE, default={})
+        leagues, replayed = {}, 0
+        for path in sorted(glob.glob(os.path.join(RESULTS_DIR, "*.json"))):
+            league = os.path.splitext(os.path.basename(path))[0]
+            if league in NON_LEAGUE:
+                continue
+            signature = _source_signature(path)
+            entry = stored.get(league)
+            if entry is None or entry.get("source") != signature or entry.get("version") != INDEX_VERSION:
+                entry = {
+                    "version": INDEX_VERSION,
+                    "source": signature,
+                    "seasons": replay_league(league, league_results(path)),
+                }
+                replayed += 1
+            leagues[league] = entry
+        _index.update(loaded=True, leagues=leagues)
+        if replayed or set(stored) != set(leagues):
+            jsonio.dump(INDEX_FILE, leagues, pretty=False)
+
+    instrumentation.note("asof_standings", "leagues_replayed", replayed)
+    print(f"📈 Classements à date : {len(leagues)} ligue(s), {replayed} rejouée(s)")
+    return _index
+
+
+# ===============================================================
+# REQUÊTES
+# ===============================================================
+
+def at(league, team, date_iso):
+    """
+    Classement de l'équipe avant les matchs du jour `date_iso` :
+    {"position", "points", "goal_diff", "played"}, ou None (équipe ou
+    saison inconnue, saison incomplète dans les données, ou pas encore de
+    match joué dans la saison).
+    """
+    build()
+    season = season_of(league, date_iso)
+    data = _index["leagues"].get(league, {}).get("seasons", {}).get(season)
+    if data is None or data.get("incomplete"):
+        return None
+    rows = {}
+    for name, changes in data["teams"].items():
+        i = bisect.bisect_left(changes["dates"], date_iso) - 1
+        if i >= 0:
+            rows[name] = changes["rows"][i]
+    if team not in rows:
+        return None
+    # Départage : points, différence de buts, buts marqués, nom
+    order = sorted(rows, key=lambda t: (-rows[t][0], -rows[t][1], -rows[t][2], t))
+    points, goal_diff, _, played = rows[team]
+    return {"position": order.index(team) + 1, "points": points, "goal_diff": goal_diff, "played": played}
+
+
+def average_position(league, team_dates):
+    """
+    Position moyenne d'équipes, chacune à sa date : [(équipe, date), ...]
+    (ex. adversaires battus, à la date de chaque match). None si aucune.
+    """
+    positions = [row["position"] for row in (at(league, t, d) for t, d in team_dates) if row]
+    return round(sum(positions) / len(positions), 2) if positions else None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2 and sys.argv[1] == "build":
+        build(force=True)
+    elif len(sys.argv) == 4:
+        print(at(*sys.argv[1:]))
+    else:
+        print("Usage : python scripts/asof_standings.py build | <Ligue> <équipe> <YYYY-MM-DD>")
+        sys.exit(1)
@@ -0,0 +1,240 @@
+"""
+Benchmark des backends de parsing HTML sur de vraies pages ESPN.
+
+Sources (arguments, défaut : replay/*.zip) :
+  - archives de rejeu enregistrées avec FETCH_MODE=record (pages/ et http/)
+  - fichiers .html ou dossiers contenant des .html
+
+Pour chaque type de page (match, schedule, team_results, fixtures, standings)
+et chaque backend disponible (html.parser, lxml, selectolax) :
+  - temps de parsing (médiane sur BENCH_REPEAT passes)
+  - temps d'exécution des sélecteurs CSS réellement utilisés par les scrapers
+  - parité : nombre de nœuds trouvés par sélecteur, comparé à html.parser
+
+Usage :
+    python scripts/bench_parsers.py replay/games_of_day.zip
+    BENCH_REPEAT=5 python scripts/bench_parsers.py pages/
+"""
+
+import glob
+import json
+import os
+import re
+import statistics
+import sys
+import time
+import zipfile
+
+from bs4 import BeautifulSoup
+
+BENCH_REPEAT = int(os.environ.get("BENCH_REPEAT", "3"))
+
+# ===============================================================
+# TYPES DE PAGES & SÉLECTEURS UTILISÉS PAR LES SCRAPERS
+# ===============================================================
+
+PAGE_TYPES = [
+    ("match", re.compile(r"/(match|game)/_/gameId/"), [
+        'img[data-testid="prism-image"]',
+        'div[data-testid="OddsCell"]',
+        'section[data-testid="prism-LayoutCard"]',
+        'section[data-testid="lastGames"]',
+        "div.THHyw",
+        "div.jaZjJ p",
+        "div.StatCellContent",
+        "div.GameStat",
+        "div.Gamestrip__Container",
+        "div.uCTxv",
+        "span.zRALO",
+        "tr.Table__TR.Table__TR--sm",
+        "td a[data-clubhouse-uid]",
+        "a[data-clubhouse-uid]",
+        "div.rpjsZ.TzFuW.lSDCP",
+        "tbody tr.Table__TR",
+        "td.Table__TD",
+        "span.GameResults",
+    ]),
+    ("schedule", re.compile(r"/schedule/"), [
+        "div.ResponsiveTable",
+        "div.Table__Title",
+        "tbody > tr.Table__TR",
+        "span.Table__Team a.AnchorLink:last-child",
+        "a.AnchorLink.at",
+        "td.date__col a",
+        "tbody tr",
+        "td a[href*='/nhl/game/_/gameId']",
+    ]),
+    ("team_results", re.compile(r"/team/results/"), [
+        "div.ResponsiveTable",
+        "div.Table__Title",
+        "tbody tr.Table__TR",
+        "tr.Table__TR",
+        "td",
+        "a[href*='/gameId/']",
+    ]),
+    ("fixtures", re.compile(r"/team/fixtures/"), [
+        "div.ResponsiveTable",
+        "div.Table__Title",
+        "tbody tr.Table__TR",
+        "td",
+    ]),
+    ("standings", re.compile(r"/standings/"), [
+        "tr.Table__TR",
+        "tr.Table__TR.Table__TR--sm",
+        "td a[data-clubhouse-uid]",
+        "span.Standings__TeamName",
+    ]),
+]
+
+
+def page_type(url):
+    for name, pattern, _ in PAGE_TYPES:
+        if pattern.search(url or ""):
+            return name
+    return None
+
+
+SELECTORS = {name: selectors for name, _, selectors in PAGE_TYPES}
+
+# ===============================================================
+# CHARGEMENT DES PAGES
+# ===============================================================
+
+def load_pages(sources):
+    """Retourne [(url_ou_chemin, html)]."""
+    pages = []
+    for src in sources:
+        if os.path.isdir(src):
+            for path in sorted(glob.glob(os.path.join(src, "**", "*.html"), recursive=True)):
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    pages.append((path, f.read()))
+        elif src.endswith(".zip"):
+            with zipfile.ZipFile(src) as zf:
+                for name in zf.namelist():
+                    if not name.endswith(".json") or name == "meta.json":
+                        continue
+                    entry = json.loads(zf.read(name).decode("utf-8"))
+                    if name.startswith("pages/") and entry.get("states"):
+                        pages.append((entry["url"], entry["states"][0]))
+                    elif name.startswith("http/") and "<html" in (entry.get("body") or "")[:2000].lower():
+                        pages.append((entry["url"], entry["body"]))
+        elif os.path.isfile(src):
+            with open(src, "r", encoding="utf-8", errors="replace") as f:
+                pages.append((src, f.read()))
+        else:
+            print(f"⚠️ Source introuvable : {src}")
+    return pages
+
+# ===============================================================
+# BACKENDS
+# ===============================================================
+
+def available_backends():
+    backends = {
+        "html.parser": (
+            lambda html: BeautifulSoup(html, "html.parser"),
+            lambda doc, sel: len(doc.select(sel)),
+        ),
+    }
+    try:
+        import lxml  # noqa: F401
+        backends["lxml"] = (
+            lambda html: BeautifulSoup(html, "lxml"),
+            lambda doc, sel: len(doc.select(sel)),
+        )
+    except ImportError:
+        print("ℹ️  lxml non installé — backend ignoré")
+    try:
+        from selectolax.parser import HTMLParser
+        backends["selectolax"] = (
+            lambda html: HTMLParser(html),
+            lambda doc, sel: len(doc.css(sel)),
+        )
+    except ImportError:
+        print("ℹ️  selectolax non installé — backend ignoré")
+    return backends
+
+
+def _median_time(fn, repeat):
+    durations = []
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        durations.append(time.perf_counter() - t0)
+    return statistics.median(durations), result
+
+# ===============================================================
+# BENCHMARK
+# ===============================================================
+
+def run(sources):
+    pages = load_pages(sources)
+    by_type = {}
+    for url, html in pages:
+        kind = page_type(url)
+        if kind:
+            by_type.setdefault(kind, []).append((url, html))
+    if not by_type:
+        print("❌ Aucune page ESPN reconnue dans les sources")
+        return {}
+
+    backends = available_backends()
+    report = {}
+
+    for kind, items in by_type.items():
+        selectors = SELECTORS[kind]
+        avg_kb = sum(len(h) for _, h in items) / len(items) / 1024
+        print(f"\n📄 {kind} — {len(items)} page(s), {avg_kb:.0f} Ko en moyenne")
+        print(f"   {'backend':<12} {'parse ms':>10} {'select ms':>10} {'écarts':>7}")
+
+        reference = {}
+        report[kind] = {"pages": len(items), "avg_kb": round(avg_kb, 1), "backends": {}}
+
+        for name, (parse, select) in backends.items():
+            parse_total = select_total = 0.0
+            mismatches = []
+            for url, html in items:
+                t_parse, doc = _median_time(lambda: parse(html), BENCH_REPEAT)
+
+                def select_all():
+                    counts = {}
+                    for sel in selectors:
+                        try:
+                            counts[sel] = select(doc, sel)
+                        except Exception:
+                            counts[sel] = None
+                    return counts
+
+                t_select, counts = _median_time(select_all, BENCH_REPEAT)
+                parse_total += t_parse
+                select_total += t_select
+
+                if name == "html.parser":
+                    reference[url] = counts
+                else:
+                    for sel, n in counts.items():
+                        if n != reference[url].get(sel):
+                            mismatches.append({"url": url, "selector": sel,
+                                               "html.parser": reference[url].get(sel), name: n})
+
+            parse_ms = parse_total / len(items) * 1000
+            select_ms = select_total / len(items) * 1000
+            report[kind]["backends"][name] = {
+                "parse_ms": round(parse_ms, 2),
+                "select_ms": round(select_ms, 2),
+                "mismatches": mismatches,
+            }
+            print(f"   {name:<12} {parse_ms:>10.1f} {select_ms:>10.1f} {len(mismatches):>7}")
+            for mm in mismatches[:5]:
+                print(f"      ⚠️ {mm['selector']!r} : {mm['html.parser']} → {mm[name]} ({mm['url']})")
+
+    return report
+
+
+if __name__ == "__main__":
+    sources = sys.argv[1:] or sorted(glob.glob("replay/*.zip"))
+    if not sources:
+        print("❌ Aucune source : enregistrer une archive (FETCH_MODE=record) ou passer des fichiers HTML")
+        sys.exit(1)
+    run(sources)
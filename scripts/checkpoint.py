@@ -0,0 +1,142 @@
+"""
+Journal de reprise (checkpoint) pour les scrapers longs.
+
+Chaque unité de travail terminée est ajoutée en une ligne JSON à
+.cache/checkpoints/<nom>.jsonl, avec flush + fsync : un crash, un timeout CI
+ou un plantage du driver ne perd au plus que l'unité en cours.
+
+    checkpoint.open_journal("Teams_tracker", run_key)   # relit le journal
+    checkpoint.get("team", team_id)                      # None si à refaire
+    checkpoint.record("team", team_id, payload)          # unité terminée
+    checkpoint.complete()                                # sortie écrite → journal supprimé
+
+Le journal n'est repris que si `run_key` (paramètres du run : plage de
+ligues, saisons…) est identique et qu'il a moins de CHECKPOINT_MAX_AGE_HOURS
+heures ; sinon il est ignoré et recommencé. Une dernière ligne tronquée
+(crash pendant l'écriture) est coupée à la relecture.
+
+Variables d'environnement :
+  - CHECKPOINT               : on (défaut) | off
+  - CHECKPOINT_DIR           : dossier des journaux (défaut .cache/checkpoints)
+  - CHECKPOINT_MAX_AGE_HOURS : âge maximal d'un journal repris (défaut 36)
+"""
+
+import os
+import time
+
+import instrumentation
+import jsonio
+
+CHECKPOINT = os.environ.get("CHECKPOINT", "on").strip().lower() != "off"
+CHECKPOINT_DIR = os.environ.get("CHECKPOINT_DIR", os.path.join(".cache", "checkpoints"))
+CHECKPOINT_MAX_AGE_HOURS = float(os.environ.get("CHECKPOINT_MAX_AGE_HOURS", "36"))
+
+_journal = {
+    "path": None,
+    "file": None,
+    "entries": {},   # kind → {key: payload}
+}
+
+
+# ===============================================================
+# LECTURE
+# ===============================================================
+
+def _read_journal(path):
+    """Retourne (en-tête, [lignes valides], taille valide en octets)."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    header, records, valid = None, [], 0
+    for line in raw.splitlines(keepends=True):
+        if not line.endswith(b"\n"):
+            break   # dernière ligne tronquée
+        try:
+            entry = jsonio.loads(line)
+        except ValueError:
+            break
+        valid += len(line)
+        if header is None:
+            header = entry
+        else:
+            records.append(entry)
+    return header, records, valid
+
+
+def open_journal(name, run_key):
+    """Ouvre (ou reprend) le journal `name` ; retourne le nombre d'unités reprises."""
+    close()
+    _journal["entries"] = {}
+    if not CHECKPOINT:
+        return 0
+
+    os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+    path = os.path.join(CHECKPOINT_DIR, f"{name}.jsonl")
+    resumed = 0
+
+    if os.path.exists(path):
+        header, records, valid = _read_journal(path)
+        age_hours = (time.time() - (header or {}).get("created_at", 0)) / 3600
+        if not header or header.get("run_key") != run_key:
+            print(f"♻️  Checkpoint {path} ignoré (paramètres différents) — nouveau journal")
+            os.remove(path)
+        elif age_hours > CHECKPOINT_MAX_AGE_HOURS:
+            print(f"♻️  Checkpoint {path} ignoré ({age_hours:.0f} h > {CHECKPOINT_MAX_AGE_HOURS:.0f} h) — nouveau journal")
+            os.remove(path)
+        else:
+            if valid < os.path.getsize(path):
+                print("⚠️ Checkpoint : dernière ligne tronquée supprimée")
+                with open(path, "r+b") as f:
+                    f.truncate(valid)
+            for entry in records:
+                _journal["entries"].setdefault(entry["kind"], {})[entry["key"]] = entry.get("data")
+            resumed = len(records)
+            counts = ", ".join(f"{len(v)} {k}" for k, v in _journal["entries"].items())
+            print(f"⏯️  Reprise depuis {path} : {counts or 'aucune unité'}")
+
+    is_new = not os.path.exists(path)
+    _journal["file"] = open(path, "ab")
+    _journal["path"] = path
+    if is_new:
+        _append({"run_key": run_key, "created_at": time.time()})
+    instrumentation.note("checkpoint", "resumed_units", resumed)
+    return resumed
+
+
+# ===============================================================
+# ÉCRITURE
+# ===============================================================
+
+def _append(entry):
+    f = _journal["file"]
+    f.write(jsonio.dumps(entry, pretty=False) + b"\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+def get(kind, key):
+    """Données enregistrées pour l'unité (kind, key), ou None si elle est à faire."""
+    return _journal["entries"].get(kind, {}).get(key)
+
+
+def record(kind, key, data):
+    """Enregistre une unité terminée (écriture durable avant de rendre la main)."""
+    _journal["entries"].setdefault(kind, {})[key] = data
+    if _journal["file"] is not None:
+        with instrumentation.timer("checkpoint"):
+            _append({"kind": kind, "key": key, "data": data})
+
+
+def close():
+    """Ferme le journal sans le supprimer (il sera repris au prochain run)."""
+    if _journal["file"] is not None:
+        _journal["file"].close()
+        _journal["file"] = None
+
+
+def complete():
+    """La sortie finale est écrite : le journal n'a plus lieu d'être."""
+    close()
+    if _journal["path"] and os.path.exists(_journal["path"]):
+        os.remove(_journal["path"])
+    _journal["path"] = None
+    _journal["entries"] = {}
@@ -0,0 +1,192 @@
+"""
+Démarrage de Chrome commun aux scrapers : chromedriver résolu hors ligne
+et profil persistant déjà « chaud ».
+
+    options = Options()
+    ...
+    chrome_startup.apply_options(options, "standings")
+    driver = webdriver.Chrome(service=chrome_startup.service(options), options=options)
+
+Résolution du chromedriver (chemin mis en cache dans .cache/chromedriver.json,
+indexé par la version de Chrome installée) :
+  1. CHROMEDRIVER (chemin explicite)
+  2. cache, si Chrome n'a pas changé de version et que le binaire existe
+  3. chromedriver du PATH de même version majeure que Chrome
+  4. ChromeDriverManager().install() (réseau), résultat mis en cache
+  5. à défaut, Selenium Manager (Service() sans chemin)
+Tant que Chrome ne change pas de version, aucun appel réseau n'est fait.
+
+Profil : .cache/chrome-profile/<nom> est réutilisé d'un run à l'autre
+(cache HTTP, DNS, composants déjà initialisés). Si le profil est verrouillé
+par un Chrome encore vivant, un profil temporaire est utilisé à la place.
+
+Le temps jusqu'à la première page (lancement de Chrome compris) est
+reporté par fetch_backend dans le run_report (time_to_first_page). En
+FETCH_MODE=replay, rien de tout cela n'est appelé : Chrome n'est pas lancé.
+
+Variables d'environnement :
+  - CHROMEDRIVER       : chemin du chromedriver (court-circuite la résolution)
+  - CHROME_BINARY      : binaire Chrome à utiliser
+  - CHROME_PROFILE     : on (défaut) | off (profil vierge à chaque lancement)
+  - CHROME_PROFILE_DIR : dossier des profils (défaut .cache/chrome-profile)
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+
+import instrumentation
+import jsonio
+
+CHROMEDRIVER = os.environ.get("CHROMEDRIVER", "").strip()
+CHROME_BINARY = os.environ.get("CHROME_BINARY", "").strip()
+CHROME_PROFILE = os.environ.get("CHROME_PROFILE", "on").strip().lower() != "off"
+CHROME_PROFILE_DIR = os.environ.get("CHROME_PROFILE_DIR", os.path.join(".cache", "chrome-profile"))
+
+DRIVER_CACHE_FILE = os.path.join(".cache", "chromedriver.json")
+
+CHROME_CANDIDATES = ["google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome"]
+
+# Fichiers de verrou laissés par Chrome dans le profil
+_LOCK_FILES = ("SingletonLock", "SingletonSocket", "SingletonCookie")
+
+_VERSION = re.compile(r"(\d+)\.(\d+)\.(\d+)\.(\d+)")
+
+_resolved = {}   # binaire Chrome → chemin du chromedriver (pour ce processus)
+
+
+# ===============================================================
+# VERSIONS
+# ===============================================================
+
+def _version_of(binary):
+    try:
+        out = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    m = _VERSION.search(out or "")
+    return m.group(0) if m else None
+
+
+def chrome_binary(options=None):
+    """Binaire Chrome utilisé : CHROME_BINARY, options.binary_location, sinon le PATH."""
+    if CHROME_BINARY:
+        return CHROME_BINARY
+    if options is not None and getattr(options, "binary_location", None):
+        return options.binary_location
+    for name in CHROME_CANDIDATES:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def _major(version):
+    return version.split(".")[0] if version else None
+
+
+# ===============================================================
+# CHROMEDRIVER
+# ===============================================================
+
+def _from_manager():
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+    except ImportError:
+        return None
+    try:
+        return ChromeDriverManager().install()
+    except Exception as e:
+        print(f"⚠️ ChromeDriverManager indisponible : {e}")
+        return None
+
+
+def driver_path(options=None):
+    """
+    Chemin du chromedriver compatible avec le Chrome installé, ou None
+    (Selenium Manager choisira alors lui-même).
+    """
+    if CHROMEDRIVER:
+        return CHROMEDRIVER
+    binary = chrome_binary(options)
+    if binary in _resolved:
+        return _resolved[binary]
+
+    with instrumentation.timer("chromedriver_resolve"):
+        version = _version_of(binary) if binary else None
+        cache = jsonio.load(DRIVER_CACHE_FILE, default={})
+        key = f"{binary}@{version}"
+        path = cache.get(key)
+
+        if path and os.path.isfile(path):
+            instrumentation.incr("chromedriver_cache_hits")
+        else:
+            path = None
+            on_path = shutil.which("chromedriver")
+            if on_path and version and _major(_version_of(on_path)) == _major(version):
+                path = on_path
+            if path is None:
+                print(f"🔧 Résolution du chromedriver pour Chrome {version or '?'} (réseau)…")
+                path = _from_manager()
+            if path:
+                cache[key] = path
+                jsonio.dump(DRIVER_CACHE_FILE, cache)
+
+    _resolved[binary] = path
+    return path
+
+
+def service(options=None):
+    """Service Selenium du chromedriver résolu (Selenium Manager en dernier recours)."""
+    from selenium.webdriver.chrome.service import Service
+
+    path = driver_path(options)
+    return Service(path) if path else Service()
+
+
+# ===============================================================
+# PROFIL PERSISTANT
+# ===============================================================
+
+def _lock_owner_alive(profile):
+    """True si le profil est verrouillé par un Chrome encore en vie."""
+    lock = os.path.join(profile, "SingletonLock")
+    try:
+        target = os.readlink(lock)            # "<hôte>-<pid>"
+    except OSError:
+        return False
+    try:
+        os.kill(int(target.rsplit("-", 1)[-1]), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def profile_dir(name):
+    """Dossier de profil persistant pour `name` (temporaire si déjà utilisé)."""
+    profile = os.path.abspath(os.path.join(CHROME_PROFILE_DIR, name))
+    os.makedirs(profile, exist_ok=True)
+    if _lock_owner_alive(profile):
+        print(f"ℹ️  Profil Chrome {profile} déjà utilisé — profil temporaire")
+        return tempfile.mkdtemp(prefix=f"chrome-{name}-")
+    # Verrous d'un Chrome tué (crash, timeout CI) : ils bloqueraient le lancement
+    for lock in _LOCK_FILES:
+        path = os.path.join(profile, lock)
+        if os.path.lexists(path):
+            os.remove(path)
+    return profile
+
+
+def apply_options(options, name):
+    """Profil persistant et options qui évitent le travail de premier lancement."""
+    options.add_argument("--no-first-run")
+    options.add_argument("--no-default-browser-check")
+    options.add_argument("--disable-component-update")
+    options.add_argument("--disable-sync")
+    if CHROME_PROFILE:
+        options.add_argument(f"--user-data-dir={profile_dir(name)}")
+    return options
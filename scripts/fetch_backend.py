@@ -0,0 +1,566 @@
+"""
+Backend de récupération des pages ESPN avec modes enregistrement / rejeu.
+
+Le mode est choisi par la variable d'environnement FETCH_MODE :
+  - "live"   (défaut) : Chrome / HTTP réels, comportement historique
+  - "record" : Chrome / HTTP réels, et chaque page lue est archivée
+  - "replay" : aucune requête réseau, aucune instance Chrome ; les pages
+               sont servies depuis l'archive enregistrée
+
+L'archive est un fichier zip compressé (FETCH_ARCHIVE, par défaut
+replay/<nom_du_script>.zip). Un enregistrement écrit toujours une archive
+neuve (<archive>.partial, qui remplace l'ancienne à la fermeture : un run
+interrompu laisse l'archive précédente intacte). Chaque URL y est stockée sous la forme
+d'une entrée JSON :
+  - pages/<sha1(url)>.json : {"url", "states": [html, ...]} (Selenium)
+  - http/<sha1(url)>.json  : {"url", "status", "body"}      (HTTP simple)
+  - meta.json              : {"recorded_at", "script"}
+
+Une page Selenium peut avoir plusieurs "états" : l'état 0 est la page
+telle que chargée, chaque clic déclenché via execute_script() fait
+passer à l'état suivant (ex: onglet away des derniers matchs).
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import warnings
+import zipfile
+from datetime import datetime, timezone
+
+import instrumentation
+import lean_browser
+import rate_limiter
+
+FETCH_MODE = os.environ.get("FETCH_MODE", "live").strip().lower()
+if FETCH_MODE not in ("live", "record", "replay"):
+    print(f"⚠️ FETCH_MODE inconnu '{FETCH_MODE}' — retour au mode live")
+    FETCH_MODE = "live"
+
+_SCRIPT_NAME = os.path.splitext(os.path.basename(sys.argv[0] or "session"))[0] or "session"
+FETCH_ARCHIVE = os.environ.get("FETCH_ARCHIVE", os.path.join("replay", f"{_SCRIPT_NAME}.zip"))
+
+# Un script exécuté via execute_script() qui contient un clic modifie le
+# DOM : la lecture suivante correspond à un nouvel état de la page.
+_MUTATING_SCRIPT = re.compile(r"\.click\(")
+
+_EMPTY_PAGE = "<html><head></head><body></body></html>"
+
+_RUN_STARTED_AT = datetime.now(timezone.utc)
+
+
+def is_replay():
+    return FETCH_MODE == "replay"
+
+
+def is_record():
+    return FETCH_MODE == "record"
+
+
+def _entry_name(kind, url):
+    digest = hashlib.sha1(url.encode("utf-8")).hexdigest()
+    return f"{kind}/{digest}.json"
+
+
+# ===============================================================
+# ARCHIVE ZIP (partagée par tous les drivers d'un même processus)
+# ===============================================================
+
+class _Archive:
+    def __init__(self, path, mode):
+        self.path = path
+        self.mode = mode
+        self._zip = None
+        self._lock = threading.Lock()
+        self._names = set()
+        self._duplicates = False
+
+    def _open(self):
+        if self._zip is not None:
+            return self._zip
+        if self.mode == "record":
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            self._zip = zipfile.ZipFile(self._partial_path(), "w",
+                                        compression=zipfile.ZIP_DEFLATED, compresslevel=6)
+            self._zip.writestr("meta.json", json.dumps({
+                "recorded_at": _RUN_STARTED_AT.isoformat(),
+                "script": _SCRIPT_NAME,
+            }))
+            self._names.add("meta.json")
+            print(f"📼 Enregistrement des pages dans {self.path}")
+        else:
+            if not os.path.isfile(self.path):
+                raise FileNotFoundError(f"Archive de rejeu introuvable : {self.path}")
+            self._zip = zipfile.ZipFile(self.path, "r")
+            print(f"📼 Rejeu des pages depuis {self.path} ({len(self._zip.namelist())} entrée(s))")
+        return self._zip
+
+    def _partial_path(self):
+        return self.path + ".partial"
+
+    def write(self, name, payload):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        with self._lock:
+            zf = self._open()
+            # Une URL rechargée dans le même run est réécrite : zipfile
+            # retient la dernière entrée de ce nom, les doublons sont
+            # retirés à la fermeture.
+            if name in self._names:
+                self._duplicates = True
+            self._names.add(name)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                zf.writestr(name, data)
+
+    def read(self, name):
+        with self._lock:
+            zf = self._open()
+            try:
+                return json.loads(zf.read(name).decode("utf-8"))
+            except KeyError:
+                return None
+
+    def _compact(self, path):
+        """Réécrit l'archive en ne gardant que la dernière entrée de chaque nom."""
+        compact_path = path + ".compact"
+        with zipfile.ZipFile(path, "r") as src, \
+                zipfile.ZipFile(compact_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as dst:
+            latest = {info.filename: info for info in src.infolist()}
+            for info in latest.values():
+                dst.writestr(info.filename, src.read(info))
+        os.replace(compact_path, path)
+
+    def close(self):
+        with self._lock:
+            if self._zip is None:
+                return
+            self._zip.close()
+            self._zip = None
+            if self.mode == "record":
+                if self._duplicates:
+                    self._compact(self._partial_path())
+                os.replace(self._partial_path(), self.path)
+
+
+_archive = _Archive(FETCH_ARCHIVE, FETCH_MODE) if FETCH_MODE != "live" else None
+
+
+def run_datetime():
+    """
+    Horodatage de référence du run (UTC). En rejeu, c'est la date de
+    l'enregistrement : les URLs datées (matchs du jour, saison en
+    cours) sont alors identiques à celles archivées.
+    """
+    if is_replay():
+        meta = _archive.read("meta.json") or {}
+        recorded_at = meta.get("recorded_at")
+        if recorded_at:
+            return datetime.fromisoformat(recorded_at)
+    return _RUN_STARTED_AT
+
+
+def close_archive():
+    if _archive is not None:
+        _archive.close()
+
+
+atexit.register(close_archive)
+
+
+# ===============================================================
+# DRIVER SELENIUM : proxy (live / record) et faux driver (replay)
+# ===============================================================
+
+class _PageRecorder:
+    """Accumule les états HTML de la page courante avant écriture."""
+
+    def __init__(self):
+        self.url = None
+        self.states = []
+        self.state_index = 0
+
+    def start(self, url):
+        self.flush()
+        self.url = url
+        self.states = []
+        self.state_index = 0
+
+    def advance(self):
+        if self.url is not None and len(self.states) > self.state_index:
+            self.state_index += 1
+
+    def capture(self, html):
+        if self.url is None or html is None:
+            return
+        while len(self.states) <= self.state_index:
+            self.states.append(None)
+        self.states[self.state_index] = html
+
+    def flush(self):
+        if self.url is not None and any(s is not None for s in self.states):
+            states = [s if s is not None else _EMPTY_PAGE for s in self.states]
+            _archive.write(_entry_name("pages", self.url), {"url": self.url, "states": states})
+        self.url = None
+        self.states = []
+        self.state_index = 0
+
+
+class DriverProxy:
+    """
+    Enveloppe un vrai WebDriver. En mode record, chaque lecture de la
+    page (page_source, find_element(s) au niveau du driver) met à jour
+    l'état archivé de l'URL courante. Tous les autres attributs sont
+    délégués tels quels au driver réel.
+    """
+
+    def __init__(self, driver, started_at=None):
+        self._driver = driver
+        self._recorder = _PageRecorder() if is_record() else None
+        self._started_at = started_at   # lancement de Chrome (time_to_first_page)
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    @property
+    def raw_driver(self):
+        return self._driver
+
+    def get(self, url):
+        if self._recorder:
+            self._recorder.start(url)
+        host = urllib.parse.urlsplit(url).netloc
+        rate_limiter.acquire(host)
+        instrumentation.incr("pages")
+        t0 = time.perf_counter()
+        try:
+            with instrumentation.timer("page_load"):
+                result = self._driver.get(url)
+        except Exception:
+            rate_limiter.report(host, error=True)
+            raise
+        try:
+            blocked = rate_limiter.looks_blocked(self._driver.title)
+        except Exception:
+            blocked = False
+        rate_limiter.report(host, latency=time.perf_counter() - t0, blocked=blocked)
+        lean_browser.measure(self._driver)
+        self.page_loaded()
+        return result
+
+    def page_loaded(self):
+        """Une page est prête : la première fixe time_to_first_page."""
+        if self._started_at is None:
+            return
+        first_page = time.perf_counter() - self._started_at
+        instrumentation.add_time("time_to_first_page", first_page)
+        instrumentation.note("startup", "time_to_first_page", round(first_page, 2))
+        print(f"🚀 Première page chargée {first_page:.1f}s après le lancement de Chrome")
+        self._started_at = None
+
+    @property
+    def page_source(self):
+        html = self._driver.page_source
+        instrumentation.incr("page_bytes", len(html))
+        if self._recorder:
+            self._recorder.capture(html)
+        return html
+
+    def _snapshot(self):
+        if self._recorder and self._recorder.url is not None:
+            self._recorder.capture(self._driver.page_source)
+
+    def find_element(self, by, value=None):
+        element = self._driver.find_element(by, value)
+        self._snapshot()
+        return element
+
+    def find_elements(self, by, value=None):
+        elements = self._driver.find_elements(by, value)
+        self._snapshot()
+        return elements
+
+    def execute_script(self, script, *args):
+        result = self._driver.execute_script(script, *args)
+        if self._recorder and _MUTATING_SCRIPT.search(script or ""):
+            self._recorder.advance()
+        return result
+
+    def quit(self):
+        if self._recorder:
+            self._recorder.flush()
+        return self._driver.quit()
+
+
+class _ReplayElement:
+    """Équivalent minimal d'un WebElement, adossé à un tag BeautifulSoup."""
+
+    def __init__(self, tag, base_url):
+        self._tag = tag
+        self._base_url = base_url
+
+    @property
+    def text(self):
+        return re.sub(r"\s+", " ", self._tag.get_text(" ", strip=True)).strip()
+
+    @property
+    def tag_name(self):
+        return self._tag.name
+
+    def get_attribute(self, name):
+        value = self._tag.get(name)
+        if value is None:
+            return None
+        if isinstance(value, list):
+            value = " ".join(value)
+        if name in ("href", "src") and self._base_url:
+            # Selenium renvoie la propriété DOM, donc une URL absolue
+            return urllib.parse.urljoin(self._base_url, value)
+        return value
+
+    def find_element(self, by, value=None):
+        return _replay_find(self._tag, by, value, self._base_url, single=True)
+
+    def find_elements(self, by, value=None):
+        return _replay_find(self._tag, by, value, self._base_url, single=False)
+
+    def is_displayed(self):
+        return True
+
+    def click(self):
+        return None
+
+
+def _replay_find(root, by, value, base_url, single):
+    from selenium.common.exceptions import NoSuchElementException
+    from selenium.webdriver.common.by import By
+
+    if by == By.CSS_SELECTOR:
+        tags = root.select(value)
+    elif by == By.TAG_NAME:
+        tags = root.find_all(value)
+    elif by == By.CLASS_NAME:
+        tags = root.select("." + value)
+    elif by == By.ID:
+        tags = root.select("#" + value)
+    else:
+        raise NotImplementedError(f"Localisateur non supporté en rejeu : {by}")
+
+    if single:
+        if not tags:
+            raise NoSuchElementException(f"Élément introuvable en rejeu : {value}")
+        return _ReplayElement(tags[0], base_url)
+    return [_ReplayElement(t, base_url) for t in tags]
+
+
+class ReplayDriver:
+    """
+    Faux WebDriver servant les pages archivées, sans Chrome ni réseau.
+    Couvre le sous-ensemble de l'API utilisé par les scrapers.
+    """
+
+    def __init__(self):
+        self.current_url = "about:blank"
+        self._states = [_EMPTY_PAGE]
+        self._state_index = 0
+        self._soup = None
+        self.missing_urls = []
+
+    def get(self, url):
+        self.current_url = url
+        instrumentation.incr("pages")
+        with instrumentation.timer("page_load"):
+            entry = _archive.read(_entry_name("pages", url))
+        if entry is None:
+            print(f"    📼 Page absente de l'archive : {url}")
+            self.missing_urls.append(url)
+            self._states = [_EMPTY_PAGE]
+        else:
+            self._states = entry.get("states") or [_EMPTY_PAGE]
+        self._state_index = 0
+        self._soup = None
+
+    @property
+    def page_source(self):
+        html = self._states[min(self._state_index, len(self._states) - 1)]
+        instrumentation.incr("page_bytes", len(html))
+        return html
+
+    def _current_soup(self):
+        if self._soup is None:
+            import html_parser
+            self._soup = html_parser.parse(self.page_source)
+        return self._soup
+
+    def find_element(self, by, value=None):
+        return _replay_find(self._current_soup(), by, value, self.current_url, single=True)
+
+    def find_elements(self, by, value=None):
+        return _replay_find(self._current_soup(), by, value, self.current_url, single=False)
+
+    def execute_script(self, script, *args):
+        if _MUTATING_SCRIPT.search(script or "") and self._state_index < len(self._states) - 1:
+            self._state_index += 1
+            self._soup = None
+        return None
+
+    @property
+    def title(self):
+        tag = self._current_soup().find("title")
+        return tag.get_text(strip=True) if tag else ""
+
+    def implicitly_wait(self, seconds):
+        return None
+
+    def set_page_load_timeout(self, seconds):
+        return None
+
+    def save_screenshot(self, path):
+        return False
+
+    def quit(self):
+        if self.missing_urls:
+            print(f"📼 {len(self.missing_urls)} page(s) absente(s) de l'archive pendant le rejeu")
+
+
+def open_driver(factory):
+    """
+    Point d'entrée unique pour obtenir un driver :
+      - replay : ReplayDriver (Chrome n'est jamais lancé)
+      - live / record : factory() enveloppé dans un DriverProxy, avec le
+        blocage d'URLs du profil léger (lean_browser)
+    """
+    if is_replay():
+        return ReplayDriver()
+    started_at = time.perf_counter()
+    return DriverProxy(lean_browser.apply_cdp(factory()), started_at=started_at)
+
+
+# ===============================================================
+# HTTP SIMPLE (urllib, sans dépendance externe)
+# ===============================================================
+
+class FetchResponse:
+    """Réponse HTTP minimale, compatible avec l'usage fait de requests."""
+
+    def __init__(self, url, status_code, body, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = body
+        self.headers = headers or {}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise urllib.error.HTTPError(self.url, self.status_code, f"HTTP {self.status_code}", None, None)
+
+
+def http_get(url, headers=None, timeout=30):
+    """GET HTTP simple, archivé en mode record et servi depuis l'archive en replay."""
+    instrumentation.incr("http_requests")
+    if is_replay():
+        entry = _archive.read(_entry_name("http", url))
+        if entry is None:
+            print(f"    📼 URL absente de l'archive : {url}")
+            return FetchResponse(url, 404, b"")
+        return FetchResponse(url, entry.get("status", 200), entry.get("body", "").encode("utf-8"),
+                             entry.get("headers"))
+
+    req = urllib.request.Request(url, headers=headers or {"User-Agent": "Mozilla/5.0"})
+    host = urllib.parse.urlsplit(url).netloc
+    rate_limiter.acquire(host)
+    t0 = time.perf_counter()
+    with instrumentation.timer("http_get"):
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                status, body, resp_headers = resp.status, resp.read(), dict(resp.headers)
+        except urllib.error.HTTPError as e:
+            status, body, resp_headers = e.code, e.read() or b"", dict(e.headers or {})
+        except Exception:
+            rate_limiter.report(host, error=True)
+            raise
+    instrumentation.incr("http_bytes", len(body))
+    rate_limiter.report(
+        host,
+        latency=time.perf_counter() - t0,
+        status=status,
+        retry_after=rate_limiter.parse_retry_after(resp_headers.get("Retry-After")),
+    )
+
+    if is_record():
+        _archive.write(_entry_name("http", url), {
+            "url": url,
+            "status": status,
+            "headers": resp_headers,
+            "body": body.decode("utf-8", errors="replace"),
+        })
+    return FetchResponse(url, status, body, resp_headers)
+
+
+# ===============================================================
+# ATTENTES
+# ===============================================================
+# La politesse entre deux requêtes est assurée par rate_limiter (appelé par
+# DriverProxy.get et http_get) ; il ne reste ici que l'attente de rendu.
+
+SETTLE_MIN = float(os.environ.get("SETTLE_MIN", "0.2"))
+
+
+def pause(seconds):
+    """
+    Attente fixe (rares cas sans condition observable).
+    Ignorée en rejeu : les pages sont déjà complètes dans l'archive.
+    """
+    if is_replay():
+        return
+    instrumentation.incr("sleeps")
+    with instrumentation.timer("sleep"):
+        time.sleep(seconds)
+
+
+def settle(driver, max_seconds, min_seconds=None, selector=None):
+    """
+    Attente de rendu après un chargement, un scroll ou un clic : rend la
+    main dès que le contenu attendu est présent (après min_seconds), au
+    plus tard après max_seconds. Remplace les anciennes pauses fixes.
+
+    Les pages ESPN sont rendues côté client : document.readyState vaut
+    "complete" bien avant que les données soient affichées. L'appelant
+    passe donc le sélecteur CSS du contenu qu'il va lire ; readyState
+    n'est qu'un repli quand aucun sélecteur ne s'applique.
+    """
+    if is_replay():
+        return
+    min_seconds = SETTLE_MIN if min_seconds is None else min_seconds
+    if selector:
+        script, expected = "return document.querySelector(arguments[0]) !== null", True
+    else:
+        script, expected = "return document.readyState", "complete"
+    instrumentation.incr("sleeps")
+    with instrumentation.timer("sleep"):
+        deadline = time.monotonic() + max_seconds
+        time.sleep(min(min_seconds, max_seconds))
+        while time.monotonic() < deadline:
+            try:
+                if driver.execute_script(script, *([selector] if selector else [])) == expected:
+                    return
+            except Exception:
+                return
+            time.sleep(0.1)
+        if selector:
+            instrumentation.incr("settle_timeouts")
@@ -1,18 +1,24 @@
-import json
-from datetime import datetime, timezone
+from datetime import datetime
 import re
 import os
-import time
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+
+import chrome_startup
+import fetch_backend
+import html_parser
+import instrumentation
+import jsonio
+import lean_browser
+
+instrumentation.start_run()
 
 # ================= DRIVER SELENIUM =================
-def make_driver():
+def _start_chrome():
     options = Options()
     options.add_argument("--headless=new")
     options.add_argument("--no-sandbox")
@@ -23,10 +29,15 @@ def make_driver():
         "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:128.0) Gecko/20100101 Firefox/128.0"
     )
     options.add_argument("--lang=en-US")
-    driver = webdriver.Chrome(options=options)
+    lean_browser.apply_options(options)
+    chrome_startup.apply_options(options, "games_models")
+    driver = webdriver.Chrome(service=chrome_startup.service(options), options=options)
     driver.implicitly_wait(10)
     return driver
 
+def make_driver():
+    return fetch_backend.open_driver(_start_chrome)
+
 def get_soup(driver, url, wait_selector=None, timeout=15):
     driver.get(url)
     if wait_selector:
@@ -36,7 +47,7 @@ def get_soup(driver, url, wait_selector=None, timeout=15):
             )
         except Exception:
             pass
-    return BeautifulSoup(driver.page_source, "html.parser")
+    return html_parser.parse(driver.page_source)
 
 # ================= DOSSIERS =================
 BASE_DIR      = "data/football"
@@ -45,6 +56,7 @@ STANDINGS_DIR = os.path.join(BASE_DIR, "standings")
 os.makedirs(BASE_DIR, exist_ok=True)
 
 OUTPUT_FILE = os.path.join(BASE_DIR, "games_of_day.json")
+V2_OUTPUT_FILE = os.path.join(BASE_DIR, "games_of_day_v2.json")
 
 # ================= LIGUES =================
 LEAGUES = {
@@ -94,8 +106,8 @@ LEAGUES = {
 BASE_URL = "https://www.espn.com/soccer/schedule/_/date/{date}/league/{league}"
 
 # ================= DATE =================
-today_str = datetime.now(timezone.utc).strftime("%Y%m%d")
-today_iso = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+today_str = fetch_backend.run_datetime().strftime("%Y%m%d")
+today_iso = fetch_backend.run_datetime().strftime("%Y-%m-%d")
 
 # ================= UTILITAIRES =================
 def convert_date_to_iso(date_text):
@@ -252,8 +264,7 @@ def extract_match_stats(soup):
 STANDINGS_FILE = os.path.join(STANDINGS_DIR, "Standings.json")
 standings_data = {}
 if os.path.exists(STANDINGS_FILE):
-    with open(STANDINGS_FILE, "r", encoding="utf-8") as f:
-        standings_data = json.load(f)
+    standings_data = jsonio.load(STANDINGS_FILE)
 else:
     print(f"⚠️ Standings introuvables : {STANDINGS_FILE}")
 
@@ -310,7 +321,6 @@ try:
                     wait_selector='img[data-testid="prism-image"], [data-testid="OddsCell"]',
                     timeout=15,
                 )
-                time.sleep(0.5)
 
                 # ── Logos & IDs extraits depuis la page du match ──
                 logo_home, logo_away = extract_logos_from_match_page(match_soup)
@@ -356,15 +366,23 @@ try:
                 stats_str = f"📊 {len(match_stats)} stats" if match_stats else "📊 pas de stats"
                 logo_str  = f"🖼️  {team_id_home} / {team_id_away}" if team_id_home else "🖼️  logos manquants"
                 print(f"  {team1} vs {team2} → {odds_str} | {stats_str} | {logo_str}")
-                time.sleep(0.5)
 
 finally:
     driver.quit()
 
 # ================= SAUVEGARDE ATOMIQUE =================
-tmp_file = OUTPUT_FILE + ".tmp"
-with open(tmp_file, "w", encoding="utf-8") as f:
-    json.dump(list(games_of_day.values()), f, indent=2, ensure_ascii=False)
-os.replace(tmp_file, OUTPUT_FILE)
+# Mêmes fichiers que games_of_day.py : games_of_day.json à l'ancien format
+# (liste de matchs), games_of_day_v2.json normalisé. Pas de classement ici,
+# section vide et matchs sans standings_ref.
+output = {
+    "format":       "games_of_day/v2",
+    "generated_at": fetch_backend.run_datetime().isoformat(timespec="seconds"),
+    "date":         today_iso,
+    "standings":    {},
+    "games":        [{**g, "standings_ref": None} for g in games_of_day.values()],
+}
+
+jsonio.dump(V2_OUTPUT_FILE, output)
+jsonio.dump(OUTPUT_FILE, list(games_of_day.values()))
 
-print(f"\n💾 {len(games_of_day)} matchs sauvegardés → {OUTPUT_FILE}")
\ No newline at end of file
+print(f"\n💾 {len(games_of_day)} matchs sauvegardés → {OUTPUT_FILE}, {V2_OUTPUT_FILE}")
\ No newline at end of file
@@ -1,24 +1,32 @@
-import json
-from datetime import datetime, timezone
+from datetime import datetime
 import re
 import os
-import time
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from bs4 import BeautifulSoup, NavigableString
-from webdriver_manager.chrome import ChromeDriverManager
+from bs4 import NavigableString
+
+import chrome_startup
+import fetch_backend
+import html_parser
+import instrumentation
+import jsonio
+import lean_browser
+import match_store
+import soup_cache
+import tab_fetcher
+
+instrumentation.start_run()
 
 # ===============================================================
 # DRIVER
 # ===============================================================
 
-def make_driver():
+def _start_chrome():
     options = Options()
     options.add_argument("--headless=new")
     options.add_argument("--no-sandbox")
@@ -34,7 +42,10 @@ def make_driver():
         "Chrome/124.0.0.0 Safari/537.36"
     )
     options.add_argument("--lang=en-US")
-    service = Service(ChromeDriverManager().install())
+    lean_browser.apply_options(options)
+    chrome_startup.apply_options(options, "games_of_day")
+    tab_fetcher.apply_options(options)
+    service = chrome_startup.service(options)
     driver = webdriver.Chrome(service=service, options=options)
     driver.execute_script(
         "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
@@ -42,16 +53,9 @@ def make_driver():
     driver.implicitly_wait(10)
     return driver
 
-def get_soup(driver, url, wait_selector=None, timeout=15):
-    driver.get(url)
-    if wait_selector:
-        try:
-            WebDriverWait(driver, timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, wait_selector))
-            )
-        except Exception:
-            pass
-    return BeautifulSoup(driver.page_source, "html.parser")
+def make_driver():
+    # En FETCH_MODE=replay, aucune instance Chrome n'est lancée
+    return fetch_backend.open_driver(_start_chrome)
 
 # ===============================================================
 # DOSSIERS
@@ -60,7 +64,11 @@ def get_soup(driver, url, wait_selector=None, timeout=15):
 BASE_DIR      = "data/football"
 STANDINGS_DIR = os.path.join(BASE_DIR, "standings")
 os.makedirs(BASE_DIR, exist_ok=True)
+# games_of_day.json garde l'ancien format (liste de matchs, chacun avec
+# l'historique complet du classement de sa ligue dans full_standings) pour
+# les lecteurs du fichier brut ; games_of_day_v2.json est la forme normalisée.
 OUTPUT_FILE = os.path.join(BASE_DIR, "games_of_day.json")
+V2_OUTPUT_FILE = os.path.join(BASE_DIR, "games_of_day_v2.json")
 
 # ===============================================================
 # LIGUES
@@ -116,8 +124,8 @@ BASE_URL = "https://www.espn.com/soccer/schedule/_/date/{date}/league/{league}"
 # DATE
 # ===============================================================
 
-today_str = datetime.now(timezone.utc).strftime("%Y%m%d")
-today_iso = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+today_str = fetch_backend.run_datetime().strftime("%Y%m%d")
+today_iso = fetch_backend.run_datetime().strftime("%Y-%m-%d")
 
 # ===============================================================
 # UTILITAIRES
@@ -344,25 +352,34 @@ def extract_match_stats(soup):
 # EXTRACTION STATS DU MATCH (Selenium CSS avancé — fallback)
 # ===============================================================
 
-def get_match_stats_selenium(driver, game_id):
-    url = f"https://www.espn.com/soccer/match/_/gameId/{game_id}"
-    try:
-        driver.get(url)
-        WebDriverWait(driver, 12).until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "section[data-testid='prism-LayoutCard']")
+def get_match_stats_selenium(driver, game_id, soup=None):
+    """
+    Stats du match `game_id`. Si `soup` est fourni, la page du match est déjà
+    chargée dans le driver : pas de re-navigation ni de nouveau parsing.
+    """
+    key = soup_cache.page_key(game_id, "past")
+    if soup is None:
+        url = f"https://www.espn.com/soccer/match/_/gameId/{game_id}"
+        try:
+            driver.get(url)
+            WebDriverWait(driver, 12).until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, "section[data-testid='prism-LayoutCard']")
+                )
             )
-        )
-    except TimeoutException:
-        pass
-    except WebDriverException as e:
-        print(f"    ⚠️  WebDriver erreur stats ({game_id}) : {e}")
-        return {}
-
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    stats = extract_match_stats_prism(soup)
+        except TimeoutException:
+            pass
+        except WebDriverException as e:
+            print(f"    ⚠️  WebDriver erreur stats ({game_id}) : {e}")
+            return {}
+        # Page rechargée : aucun document ni champ de l'état précédent
+        soup_cache.forget(game_id)
+        soup = soup_cache.soup(key, lambda: driver.page_source)
+
+    stats = soup_cache.field(key, "stats_prism", extract_match_stats_prism, soup)
     if stats:
         return stats
+    stats = {}
 
     try:
         stats_section = driver.find_element(
@@ -380,7 +397,6 @@ def get_match_stats_selenium(driver, game_id):
                     }
             except NoSuchElementException:
                 continue
-        time.sleep(0.6)
         return stats
     except NoSuchElementException:
         return {}
@@ -597,9 +613,10 @@ def extract_score_and_status(driver):
 # SCRAPING D'UN MATCH PASSÉ (last5 / H2H) — avec cotes
 # ===============================================================
 
-def scrape_past_match(driver, url):
+def capture_past_match(driver, url):
     """
-    Charge une page de match ESPN et retourne :
+    Lit une page de match ESPN déjà chargée dans `driver` (onglet prêt,
+    cf. tab_fetcher) et retourne :
     {
         gameId, url,
         team_home, team_home_id, team_home_logo,
@@ -617,21 +634,20 @@ def scrape_past_match(driver, url):
 
     print(f"    🔍 Traitement match passé gameId={game_id}")
 
+    # Le fetcher attend la section stats (Prism), qui arrive après le
+    # gamestrip : la page n'est parsée qu'une fois (plus de re-navigation).
     try:
-        driver.get(url)
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div.Gamestrip__Container"))
-        )
-    except TimeoutException:
-        print(f"      ⚠️  Timeout gameId={game_id}")
-        return None
+        if not driver.find_elements(By.CSS_SELECTOR, "div.Gamestrip__Container"):
+            print(f"      ⚠️  Timeout gameId={game_id}")
+            return None
     except WebDriverException as e:
         print(f"      ⚠️  WebDriver : {e}")
         return None
 
-    time.sleep(1.2)
+    fetch_backend.settle(driver, 3, selector=PAST_MATCH_STATS_READY)
 
-    soup = BeautifulSoup(driver.page_source, "html.parser")
+    past_key = soup_cache.page_key(game_id, "past")
+    soup = soup_cache.soup(past_key, lambda: driver.page_source)
 
     # IDs équipes
     home_id, away_id = extract_team_ids_gamestrip(driver)
@@ -649,18 +665,10 @@ def scrape_past_match(driver, url):
     home_score, away_score, status = extract_score_and_status(driver)
 
     # Cotes (disponibles si le match n'a pas encore eu lieu, sinon None)
-    ml = extract_ml_odds(soup)
+    ml = soup_cache.field(past_key, "odds", extract_ml_odds, soup)
 
-    # Stats (nouvelle structure Prism en priorité, re-navigue sur la même URL)
-    stats = get_match_stats_selenium(driver, game_id)
-
-    # Refresh soup après la re-navigation de get_match_stats_selenium
-    # pour s'assurer qu'on a le bon état de page
-    soup_fresh = BeautifulSoup(driver.page_source, "html.parser")
-
-    # Tentative de récupération des cotes depuis la page fraîche si la première a échoué
-    if not ml:
-        ml = extract_ml_odds(soup_fresh)
+    # Stats (nouvelle structure Prism en priorité, sur la page déjà chargée)
+    stats = get_match_stats_selenium(driver, game_id, soup=soup)
 
     result = {
         "gameId":         game_id,
@@ -830,193 +838,424 @@ def extract_last_five(soup, team_id):
 STANDINGS_FILE = os.path.join(STANDINGS_DIR, "Standings.json")
 standings_data = {}
 if os.path.exists(STANDINGS_FILE):
-    with open(STANDINGS_FILE, "r", encoding="utf-8") as f:
-        standings_data = json.load(f)
+    standings_data = jsonio.load(STANDINGS_FILE)
 else:
     print(f"⚠️ Standings introuvables : {STANDINGS_FILE}")
 
+
+def current_season_table(league_name):
+    """
+    Saison la plus récente de Standings.json pour la ligue (ou None).
+
+    Ligues à plusieurs phases (Belgique : regular_season / playoffs,
+    Mexique : apertura / clausura) : l'entrée de saison n'a pas de clé
+    "standings" mais une entrée par phase ; la phase la plus avancée qui a
+    un classement est retenue, son libellé dans "phase".
+    """
+    seasons = standings_data.get(league_name) or {}
+    if not seasons:
+        return None
+    season = max(seasons)
+    entry = seasons[season]
+    if "standings" in entry:
+        return {"season": season, "source": "Standings.json", **entry}
+
+    phases = [(label, phase) for label, phase in entry.items()
+              if isinstance(phase, dict) and phase.get("standings")]
+    if not phases:
+        return None
+    label, phase = max(phases, key=lambda p: p[1].get("partie") or 0)
+    return {"season": season, "source": "Standings.json", "phase": label, **phase}
+
 # ===============================================================
-# SCRAPING PRINCIPAL — MATCHS DU JOUR
+# H2H DEPUIS LE STORE DES MATCHS (sans chargement de page)
 # ===============================================================
 
-games_of_day = {}
-driver = make_driver()
+H2H_SIZE = 10
+LAST_FIVE_SIZE = 5
+
+
+def store_entry(m):
+    """Entrée H2H / last5 déjà enrichie, au format injecté en phase 2."""
+    return {
+        "date":           m.get("date"),
+        "competition":    m.get("competition"),
+        "match_url":      m.get("match_url"),
+        "team_home":      m.get("home_team"),
+        "team_home_id":   m.get("home_team_id"),
+        "team_home_logo": m.get("home_logo_url"),
+        "team_away":      m.get("away_team"),
+        "team_away_id":   m.get("away_team_id"),
+        "team_away_logo": m.get("away_logo_url"),
+        "home_score":     m.get("home_score"),
+        "away_score":     m.get("away_score"),
+        "status":         m.get("result"),
+        "odds":           m.get("odds") or {"home": None, "away": None, "draw": None},
+        "stats":          m.get("stats") or {},
+    }
 
-try:
-    for league_name, league_code in LEAGUES.items():
-        print(f"\n📅 {league_name}")
 
-        try:
-            soup = get_soup(
-                driver,
-                BASE_URL.format(date=today_str, league=league_code),
-                wait_selector="div.ResponsiveTable",
-                timeout=15,
-            )
-        except Exception as e:
-            print(f"  ⚠️ Erreur réseau : {e}")
+def team_result(m, team_id):
+    """Résultat W / D / L du match du point de vue de team_id (comme ESPN)."""
+    home_score, away_score = m.get("home_score"), m.get("away_score")
+    try:
+        diff = int(home_score) - int(away_score)
+    except (TypeError, ValueError):
+        return None
+    if diff == 0 and m.get("decided_by_penalties") and m.get("penalty_winner"):
+        diff = 1 if m["penalty_winner"] == "home" else -1
+    if m.get("away_team_id") == team_id:
+        diff = -diff
+    return "W" if diff > 0 else "L" if diff < 0 else "D"
+
+
+def store_last_five(team_id):
+    """
+    5 derniers matchs de l'équipe depuis le store (déjà enrichis), ou None si
+    l'équipe n'y est pas couverte ou a pu jouer depuis son scraping (prochain
+    match connu antérieur à aujourd'hui).
+    """
+    if not match_store.covers(team_id, as_of=today_iso):
+        return None
+    return [
+        {
+            "date":        m.get("date"),
+            "competition": m.get("competition"),
+            "match_url":   m.get("match_url"),
+            "result":      team_result(m, team_id),
+            **store_entry(m),
+        }
+        for m in match_store.recent(team_id, limit=LAST_FIVE_SIZE, before=today_iso)
+    ]
+
+
+def store_h2h(page_h2h, team_id_home, team_id_away):
+    """
+    H2H de la carte de la page du match (liste de référence : le store ne
+    remonte qu'à START_SEASON), chaque entrée enrichie depuis le store par
+    gameId ; les matchs absents du store restent à enrichir en phase 2.
+    Carte absente : confrontations du store si l'une des deux équipes y est
+    couverte et à jour (aucun match joué depuis son scraping).
+    """
+    if not page_h2h:
+        if not (match_store.covers(team_id_home, as_of=today_iso)
+                or match_store.covers(team_id_away, as_of=today_iso)):
+            return page_h2h
+        return [
+            store_entry(m)
+            for m in match_store.head_to_head(team_id_home, team_id_away, limit=H2H_SIZE, before=today_iso)
+        ]
+    h2h = []
+    for entry in page_h2h:
+        game = re.search(r"gameId/(\d+)", entry.get("match_url") or "")
+        known = match_store.get_match(game.group(1)) if game else None
+        h2h.append({**entry, **store_entry(known)} if known else dict(entry))
+    return h2h
+
+# ===============================================================
+# PAGES DU JOUR — CALENDRIER ET PAGE DE MATCH
+# ===============================================================
+
+SCHEDULE_READY = "div.ResponsiveTable"
+# Cotes, classement et derniers matchs sont rendus côté client après le
+# bandeau et les logos : la page est prête quand les cartes Prism sont là,
+# et n'est capturée qu'une fois la section lastGames rendue (au moins
+# MATCH_RENDER_MIN s après, comme l'ancienne pause d'1 s).
+MATCH_READY = "section[data-testid='prism-LayoutCard']"
+LAST_GAMES_READY = "section[data-testid='lastGames']"
+MATCH_RENDER_MIN = 1.0
+MATCH_RENDER_MAX = 3.0
+PAST_MATCH_READY = "section[data-testid='prism-LayoutCard']"
+# Contenu lu par extract_match_stats (cartes Prism ou tableau de stats)
+PAST_MATCH_STATS_READY = "section[data-testid='prism-LayoutCard'] div.THHyw, div.StatCellContent"
+
+
+def parse_schedule(url, html):
+    """Matchs du jour (non commencés) d'une page calendrier de ligue."""
+    soup = html_parser.parse(html)
+    fixtures = []
+    for table in soup.select("div.ResponsiveTable"):
+        date_tag = table.select_one("div.Table__Title")
+        date_iso = convert_date_to_iso(date_tag.text.strip() if date_tag else today_str)
+
+        if date_iso != today_iso:
             continue
 
-        for table in soup.select("div.ResponsiveTable"):
-            date_tag = table.select_one("div.Table__Title")
-            date_iso = convert_date_to_iso(date_tag.text.strip() if date_tag else today_str)
+        for row in table.select("tbody > tr.Table__TR"):
+            teams     = row.select("span.Table__Team a.AnchorLink:last-child")
+            score_tag = row.select_one("a.AnchorLink.at")
+            time_tag  = row.select_one("td.date__col a")
 
-            if date_iso != today_iso:
+            if len(teams) != 2 or not score_tag:
+                continue
+            if score_tag.text.strip().lower() != "v":
                 continue
 
-            for row in table.select("tbody > tr.Table__TR"):
-                teams     = row.select("span.Table__Team a.AnchorLink:last-child")
-                score_tag = row.select_one("a.AnchorLink.at")
-                time_tag  = row.select_one("td.date__col a")
+            match_id = re.search(r"gameId/(\d+)", score_tag["href"])
+            if not match_id:
+                continue
 
-                if len(teams) != 2 or not score_tag:
-                    continue
-                if score_tag.text.strip().lower() != "v":
-                    continue
+            raw_time = time_tag.text.strip() if time_tag else None
+            fixtures.append({
+                "game_id":   match_id.group(1),
+                "date":      date_iso,
+                "team1":     teams[0].text.strip(),
+                "team2":     teams[1].text.strip(),
+                "team1_id":  extract_team_id_from_team_url(teams[0].get("href")),
+                "team2_id":  extract_team_id_from_team_url(teams[1].get("href")),
+                "match_url": "https://www.espn.com" + score_tag["href"],
+                "time_ci":   convert_time_espn_to_ci(raw_time) if raw_time else None,
+            })
+    return fixtures
 
-                match_id = re.search(r"gameId/(\d+)", score_tag["href"])
-                if not match_id:
-                    continue
 
-                game_id   = match_id.group(1)
-                team1     = teams[0].text.strip()
-                team2     = teams[1].text.strip()
-                match_url = "https://www.espn.com" + score_tag["href"]
-                raw_time  = time_tag.text.strip() if time_tag else None
-                time_ci   = convert_time_espn_to_ci(raw_time) if raw_time else None
-
-                # ── Chargement de la page du match ──
-                match_soup = get_soup(
-                    driver,
-                    match_url,
-                    wait_selector=(
-                        'img[data-testid="prism-image"], '
-                        'section[data-testid="lastGames"], '
-                        'section[data-testid="prism-LayoutCard"]'
-                    ),
-                    timeout=20,
-                )
-                time.sleep(1)
-
-                # ── Logos & IDs ──
-                logo_home, logo_away = extract_logos_from_match_page(match_soup)
-                team_id_home = extract_team_id_from_logo(logo_home)
-                team_id_away = extract_team_id_from_logo(logo_away)
-
-                # ── Slugs depuis les liens ──
-                slug_home, slug_away = None, None
-                for a_tag in match_soup.select("a[data-clubhouse-uid]"):
-                    href = a_tag.get("href", "")
-                    if team_id_home and f"/id/{team_id_home}/" in href:
-                        m2 = re.search(r"/id/\d+/([^/\?]+)$", href)
-                        if m2 and not slug_home:
-                            slug_home = m2.group(1)
-                    if team_id_away and f"/id/{team_id_away}/" in href:
-                        m2 = re.search(r"/id/\d+/([^/\?]+)$", href)
-                        if m2 and not slug_away:
-                            slug_away = m2.group(1)
-
-                # ── Cotes ──
-                ml = extract_ml_odds(match_soup)
-
-                # ── Stats ──
-                match_stats = extract_match_stats(match_soup)
-
-                # ── Classement actuel + projeté + tableau complet ──
-                standings_info = extract_standings_for_match(
-                    match_soup, team_id_home, team_id_away
-                )
+def capture_match_page(driver, fixture):
+    """
+    États HTML d'une page de match chargée : [page, onglet away des derniers
+    matchs]. Le clic sur l'onglet away n'est fait que si le store ne sert
+    pas la forme de l'équipe extérieure (second état absent sinon, ou si le
+    clic a échoué).
+    """
+    fetch_backend.settle(driver, MATCH_RENDER_MAX, min_seconds=MATCH_RENDER_MIN, selector=LAST_GAMES_READY)
+    states = [driver.page_source]
+    if store_last_five(fixture.get("team2_id")) is not None:
+        return states
+    try:
+        away_btns = driver.find_elements(
+            By.CSS_SELECTOR,
+            "section[data-testid='lastGames'] button.Button--filter"
+        )
+        if len(away_btns) >= 2:
+            driver.execute_script("arguments[0].click();", away_btns[1])
+            # Onglet away actif : son bouton porte le logo de l'équipe extérieure
+            away_id = fixture.get("team2_id")
+            active_away = (
+                f"section[data-testid='lastGames'] button.Button--active img[src*='/{away_id}.png']"
+                if away_id else "section[data-testid='lastGames'] button.Button--active"
+            )
+            fetch_backend.settle(driver, 3, min_seconds=0.3, selector=active_away)
+            states.append(driver.page_source)
+        else:
+            print(f"  ⚠️ Bouton away last5 introuvable")
+    except Exception as e:
+        print(f"  ⚠️ Erreur clic onglet away last5 : {e}")
+    return states
+
+
+def parse_match_page(fixture, states):
+    """Champs extraits d'une page de match du jour (thread de parsing)."""
+    game_id    = fixture["game_id"]
+    page_key   = soup_cache.page_key(game_id, "today")
+    match_soup = soup_cache.soup(page_key, states[0])
+
+    # ── Logos & IDs ──
+    logo_home, logo_away = soup_cache.field(page_key, "logos", extract_logos_from_match_page, match_soup)
+    team_id_home = extract_team_id_from_logo(logo_home)
+    team_id_away = extract_team_id_from_logo(logo_away)
+
+    # ── Slugs depuis les liens ──
+    slug_home, slug_away = None, None
+    for a_tag in match_soup.select("a[data-clubhouse-uid]"):
+        href = a_tag.get("href", "")
+        if team_id_home and f"/id/{team_id_home}/" in href:
+            m2 = re.search(r"/id/\d+/([^/\?]+)$", href)
+            if m2 and not slug_home:
+                slug_home = m2.group(1)
+        if team_id_away and f"/id/{team_id_away}/" in href:
+            m2 = re.search(r"/id/\d+/([^/\?]+)$", href)
+            if m2 and not slug_away:
+                slug_away = m2.group(1)
+
+    # ── Last 5 : store des matchs (déjà enrichi), sinon tableau lastGames de
+    # la page (away : état de la page après clic sur l'onglet away) ──
+    last5_home = store_last_five(team_id_home)
+    if last5_home is None:
+        last5_home = soup_cache.field(
+            page_key, "last_five", extract_last_five, match_soup, team_id_home
+        )
+    last5_away = store_last_five(team_id_away)
+    if last5_away is None:
+        last5_away = []
+    if not last5_away and len(states) > 1:
+        away_key  = soup_cache.page_key(game_id, "away")
+        away_soup = soup_cache.soup(away_key, states[1])
+        last5_away = soup_cache.field(
+            away_key, "last_five", extract_last_five, away_soup, team_id_away
+        )
+
+    # ── H2H : carte H2H de la page, entrées enrichies depuis le store ──
+    h2h = store_h2h(
+        soup_cache.field(page_key, "h2h", extract_h2h, match_soup, team_id_home, team_id_away),
+        team_id_home, team_id_away,
+    )
+
+    return {
+        "logo_home":    logo_home,
+        "logo_away":    logo_away,
+        "team_id_home": team_id_home,
+        "team_id_away": team_id_away,
+        "slug_home":    slug_home,
+        "slug_away":    slug_away,
+        # ── Cotes ──
+        "ml":           soup_cache.field(page_key, "odds", extract_ml_odds, match_soup),
+        # ── Stats ──
+        "stats":        soup_cache.field(page_key, "stats", extract_match_stats, match_soup),
+        # ── Classement actuel + projeté + tableau complet ──
+        "standings_info": soup_cache.field(
+            page_key, "standings", extract_standings_for_match,
+            match_soup, team_id_home, team_id_away
+        ),
+        "h2h":          h2h,
+        "last5_home":   last5_home,
+        "last5_away":   last5_away,
+    }
+
+# ===============================================================
+# SCRAPING PRINCIPAL — MATCHS DU JOUR
+# ===============================================================
 
-                # ── Classement complet de la ligue depuis Standings.json ──
-                # Priorité 1 : Standings.json (scrape complet)
-                # Priorité 2 : tableau partiel extrait de la page ESPN (fallback)
-                full_standings = standings_data.get(league_name, None)
-                if not full_standings:
-                    # Fallback : tableau extrait de la page du match (peut être partiel)
-                    full_standings = standings_info.get("full_table", [])
-                    if full_standings:
-                        print(f"  ℹ️  Standings complets non trouvés dans Standings.json, "
-                              f"utilisation du tableau ESPN ({len(full_standings)} équipes)")
-
-                # ── Forme en championnat + journée actuelle ──
-                form_home, matchday_home = compute_form_and_matchday(standings_info.get("home"))
-                form_away, matchday_away = compute_form_and_matchday(standings_info.get("away"))
-
-                # ── H2H ──
-                h2h = extract_h2h(match_soup, team_id_home, team_id_away)
-
-                # ── Last 5 home ──
-                last5_home = extract_last_five(match_soup, team_id_home)
-
-                # ── Last 5 away ──
-                last5_away = []
-                try:
-                    away_btns = driver.find_elements(
-                        By.CSS_SELECTOR,
-                        "section[data-testid='lastGames'] button.Button--filter"
-                    )
-                    if len(away_btns) >= 2:
-                        driver.execute_script("arguments[0].click();", away_btns[1])
-                        time.sleep(1.5)
-                        away_soup  = BeautifulSoup(driver.page_source, "html.parser")
-                        last5_away = extract_last_five(away_soup, team_id_away)
-                    else:
-                        print(f"  ⚠️ Bouton away last5 introuvable")
-                except Exception as e:
-                    print(f"  ⚠️ Erreur clic onglet away last5 : {e}")
-
-                games_of_day[game_id] = {
-                    "gameId":    game_id,
-                    "date":      date_iso,
-                    "time_ci":   time_ci,
-                    "league":    league_name,
-                    "match_url": match_url,
-
-                    "home": {
-                        "team":      team1,
-                        "team_id":   team_id_home,
-                        "team_slug": slug_home,
-                        "logo":      logo_home,
-                        "url":       f"https://www.espn.com/soccer/team/_/id/{team_id_home}" if team_id_home else None,
-                        "standings": standings_info.get("home"),
-                        "form":      form_home,        # ← NOUVEAU : forme V-N-D en championnat
-                        "matchday":  matchday_home,     # ← NOUVEAU : journée actuelle (joués + 1)
-                        "last_five": last5_home,
-                    },
-                    "away": {
-                        "team":      team2,
-                        "team_id":   team_id_away,
-                        "team_slug": slug_away,
-                        "logo":      logo_away,
-                        "url":       f"https://www.espn.com/soccer/team/_/id/{team_id_away}" if team_id_away else None,
-                        "standings": standings_info.get("away"),
-                        "form":      form_away,        # ← NOUVEAU : forme V-N-D en championnat
-                        "matchday":  matchday_away,     # ← NOUVEAU : journée actuelle (joués + 1)
-                        "last_five": last5_away,
-                    },
-
-                    "odds": {
-                        "home": ml["home"] if ml else None,
-                        "away": ml["away"] if ml else None,
-                        "draw": ml["draw"] if ml else None,
-                    },
-
-                    "stats":          match_stats,
-                    "h2h":            h2h,
-                    "full_standings": full_standings,
+games_of_day = {}
+standings_section = {}   # ligue → classement de la saison en cours (une seule fois)
+with instrumentation.timer("driver_startup"):
+    driver = make_driver()
+
+# Plusieurs onglets dans le même Chrome (TABS) : les pages chargent en
+# parallèle, le parsing se fait au fil de l'eau dans un thread dédié.
+fetcher = tab_fetcher.TabFetcher(driver)
+
+# H2H et last5 servis par le store des matchs : entrées déjà enrichies
+match_store.load()
+
+try:
+    # ── Calendriers du jour, une page par ligue ──
+    schedule_urls = {
+        BASE_URL.format(date=today_str, league=league_code): league_name
+        for league_name, league_code in LEAGUES.items()
+    }
+    fixtures_by_league = {}
+    for url, fixtures in fetcher.fetch(
+        schedule_urls, ready_selector=SCHEDULE_READY, timeout=15, parse=parse_schedule
+    ):
+        if fixtures is None:
+            print(f"  ⚠️ Erreur réseau : {schedule_urls[url]}")
+            continue
+        fixtures_by_league[schedule_urls[url]] = fixtures
+
+    fixture_by_url = {}
+    for league_name in LEAGUES:
+        for fixture in fixtures_by_league.get(league_name, []):
+            fixture_by_url.setdefault(fixture["match_url"], {**fixture, "league": league_name})
+
+    # ── Pages de match (ordre de fin de chargement) ──
+    pages = {}
+    for url, page in fetcher.fetch(
+        fixture_by_url,
+        ready_selector=MATCH_READY,
+        timeout=20,
+        capture=lambda driver, url: capture_match_page(driver, fixture_by_url[url]),
+        parse=lambda url, states: parse_match_page(fixture_by_url[url], states),
+    ):
+        instrumentation.incr("games_of_day")
+        pages[url] = page
+
+    # ── Assemblage dans l'ordre des ligues et du calendrier ──
+    current_league = None
+    for match_url, fixture in fixture_by_url.items():
+        league_name = fixture["league"]
+        if league_name != current_league:
+            print(f"\n📅 {league_name}")
+            current_league = league_name
+
+        page = pages.get(match_url)
+        if page is None:
+            print(f"  ⚠️ Page de match non chargée : {match_url}")
+            continue
+
+        game_id        = fixture["game_id"]
+        team1          = fixture["team1"]
+        team2          = fixture["team2"]
+        time_ci        = fixture["time_ci"]
+        team_id_home   = page["team_id_home"]
+        team_id_away   = page["team_id_away"]
+        ml             = page["ml"]
+        standings_info = page["standings_info"]
+        h2h            = page["h2h"]
+        last5_home     = page["last5_home"]
+        last5_away     = page["last5_away"]
+
+        # ── Classement de la ligue : stocké une fois dans la section
+        # "standings" du fichier, le match y fait référence par ligue ──
+        # Priorité 1 : saison en cours de Standings.json (scrape complet)
+        # Priorité 2 : tableau partiel extrait de la page ESPN (fallback)
+        if league_name not in standings_section:
+            league_table = current_season_table(league_name)
+            if league_table is None and standings_info.get("full_table"):
+                league_table = {
+                    "season":    None,
+                    "source":    "espn_match_page",
+                    "standings": standings_info["full_table"],
                 }
+                print(f"  ℹ️  Standings complets non trouvés dans Standings.json, "
+                      f"utilisation du tableau ESPN ({len(league_table['standings'])} équipes)")
+            if league_table:
+                standings_section[league_name] = league_table
+        standings_ref = league_name if league_name in standings_section else None
+
+        # ── Forme en championnat + journée actuelle ──
+        form_home, matchday_home = compute_form_and_matchday(standings_info.get("home"))
+        form_away, matchday_away = compute_form_and_matchday(standings_info.get("away"))
+
+        games_of_day[game_id] = {
+            "gameId":    game_id,
+            "date":      fixture["date"],
+            "time_ci":   time_ci,
+            "league":    league_name,
+            "match_url": match_url,
+
+            "home": {
+                "team":      team1,
+                "team_id":   team_id_home,
+                "team_slug": page["slug_home"],
+                "logo":      page["logo_home"],
+                "url":       f"https://www.espn.com/soccer/team/_/id/{team_id_home}" if team_id_home else None,
+                "standings": standings_info.get("home"),
+                "form":      form_home,        # ← NOUVEAU : forme V-N-D en championnat
+                "matchday":  matchday_home,     # ← NOUVEAU : journée actuelle (joués + 1)
+                "last_five": last5_home,
+            },
+            "away": {
+                "team":      team2,
+                "team_id":   team_id_away,
+                "team_slug": page["slug_away"],
+                "logo":      page["logo_away"],
+                "url":       f"https://www.espn.com/soccer/team/_/id/{team_id_away}" if team_id_away else None,
+                "standings": standings_info.get("away"),
+                "form":      form_away,        # ← NOUVEAU : forme V-N-D en championnat
+                "matchday":  matchday_away,     # ← NOUVEAU : journée actuelle (joués + 1)
+                "last_five": last5_away,
+            },
+
+            "odds": {
+                "home": ml["home"] if ml else None,
+                "away": ml["away"] if ml else None,
+                "draw": ml["draw"] if ml else None,
+            },
+
+            "stats":          page["stats"],
+            "h2h":           h2h,
+            "standings_ref": standings_ref,
+        }
 
-                odds_str = f"✅ {ml['home']} / {ml['draw']} / {ml['away']}" if ml else "ℹ️  pas de cotes"
-                h2h_str  = f"🔁 {len(h2h)} H2H" if h2h else "🔁 pas de H2H"
-                l5_str   = f"🏠{len(last5_home)} ✈️{len(last5_away)}"
-                st_str   = (
-                    f"📊#{standings_info['home']['position_current'] if standings_info['home'] else '?'}"
-                    f"→#{standings_info['home']['position_if_win'] if standings_info['home'] else '?'}"
-                )
-                fs_str   = f"📋{len(full_standings) if full_standings else 0} équipes"
-                form_str = f"📈 {form_home or '?'} (J{matchday_home or '?'}) vs {form_away or '?'} (J{matchday_away or '?'})"
-                print(f"  {team1} vs {team2} [{time_ci}] → {odds_str} | {h2h_str} | L5:{l5_str} | {st_str} | {fs_str} | {form_str}")
-                time.sleep(0.5)
+        odds_str = f"✅ {ml['home']} / {ml['draw']} / {ml['away']}" if ml else "ℹ️  pas de cotes"
+        h2h_str  = f"🔁 {len(h2h)} H2H" if h2h else "🔁 pas de H2H"
+        l5_str   = f"🏠{len(last5_home)} ✈️{len(last5_away)}"
+        st_str   = (
+            f"📊#{standings_info['home']['position_current'] if standings_info['home'] else '?'}"
+            f"→#{standings_info['home']['position_if_win'] if standings_info['home'] else '?'}"
+        )
+        fs_str   = f"📋{len(standings_section[standings_ref].get('standings') or []) if standings_ref else 0} équipes"
+        form_str = f"📈 {form_home or '?'} (J{matchday_home or '?'}) vs {form_away or '?'} (J{matchday_away or '?'})"
+        print(f"  {team1} vs {team2} [{time_ci}] → {odds_str} | {h2h_str} | L5:{l5_str} | {st_str} | {fs_str} | {form_str}")
 
     # ==============================================================
     # PHASE 2 — ENRICHISSEMENT DES URLs last5 ET H2H
@@ -1026,30 +1265,45 @@ try:
     print("🔄 PHASE 2 — Enrichissement last5 & H2H (stats + cotes)")
     print("=" * 60)
 
+    # Dédoublonnage par gameId : un même match peut apparaître sous plusieurs
+    # URLs (slug différent) dans les last5 / H2H de plusieurs matchs du jour.
     urls_to_scrape = {}
+    url_by_game    = {}
+
+    def game_key(u):
+        m = re.search(r"gameId/(\d+)", u or "")
+        return m.group(1) if m else u
 
+    # Les entrées servies par le store sont déjà enrichies (team_home_id présent)
+    from_store = 0
     for gid, gdata in games_of_day.items():
-        for entry in gdata["home"]["last_five"]:
-            u = entry.get("match_url")
-            if u and u not in urls_to_scrape:
-                urls_to_scrape[u] = None
-        for entry in gdata["away"]["last_five"]:
-            u = entry.get("match_url")
-            if u and u not in urls_to_scrape:
-                urls_to_scrape[u] = None
-        for entry in gdata["h2h"]:
+        entries = gdata["home"]["last_five"] + gdata["away"]["last_five"] + gdata["h2h"]
+        for entry in entries:
+            if "team_home_id" in entry:
+                from_store += 1
+                continue
             u = entry.get("match_url")
             if u and u not in urls_to_scrape:
                 urls_to_scrape[u] = None
-
-    total = len(urls_to_scrape)
-    print(f"  📋 {total} URLs uniques à enrichir\n")
-
-    for idx, url in enumerate(urls_to_scrape, 1):
-        print(f"  [{idx}/{total}] {url}")
-        result = scrape_past_match(driver, url)
-        urls_to_scrape[url] = result
-        time.sleep(1)
+                url_by_game.setdefault(game_key(u), u)
+
+    total = len(url_by_game)
+    print(f"  🗂️  {from_store} entrée(s) last5 / H2H servie(s) par le store des matchs")
+    print(f"  📋 {total} matchs uniques à enrichir ({len(urls_to_scrape)} URLs)\n")
+
+    past_by_url = {}
+    with instrumentation.timer("past_matches"):
+        for idx, (url, data) in enumerate(fetcher.fetch(
+            url_by_game.values(),
+            ready_selector=PAST_MATCH_READY,
+            timeout=15,
+            capture=capture_past_match,
+        ), 1):
+            print(f"  [{idx}/{total}] {url}")
+            past_by_url[url] = data
+
+    for u in urls_to_scrape:
+        urls_to_scrape[u] = past_by_url.get(url_by_game[game_key(u)])
 
     print("\n  💉 Injection des données enrichies…")
 
@@ -1083,6 +1337,7 @@ try:
             inject(entry)
 
     print("  ✅ Injection terminée")
+    instrumentation.note("soup_cache", "final", soup_cache.stats())
 
 finally:
     driver.quit()
@@ -1092,9 +1347,29 @@ finally:
 # SAUVEGARDE ATOMIQUE
 # ===============================================================
 
-tmp_file = OUTPUT_FILE + ".tmp"
-with open(tmp_file, "w", encoding="utf-8") as f:
-    json.dump(list(games_of_day.values()), f, indent=2, ensure_ascii=False)
-os.replace(tmp_file, OUTPUT_FILE)
+def expand_game(game):
+    """Ancien format : full_standings = historique complet de la ligue."""
+    expanded = {k: v for k, v in game.items() if k != "standings_ref"}
+    ref = game.get("standings_ref")
+    full_standings = standings_data.get(game["league"])
+    if not full_standings and ref:
+        full_standings = standings_section[ref].get("standings")
+    expanded["full_standings"] = full_standings or []
+    return expanded
+
+
+# Format normalisé : chaque classement n'apparaît qu'une fois (section
+# "standings"), les matchs y renvoient via "standings_ref" (= nom de ligue).
+output = {
+    "format":       "games_of_day/v2",
+    "generated_at": fetch_backend.run_datetime().isoformat(timespec="seconds"),
+    "date":         today_iso,
+    "standings":    standings_section,
+    "games":        list(games_of_day.values()),
+}
+
+jsonio.dump(V2_OUTPUT_FILE, output)
+jsonio.dump(OUTPUT_FILE, [expand_game(g) for g in games_of_day.values()])
 
-print(f"\n💾 {len(games_of_day)} matchs sauvegardés → {OUTPUT_FILE}")
+print(f"\n💾 {len(games_of_day)} matchs sauvegardés → {OUTPUT_FILE} (ancien format)")
+print(f"💾 {len(standings_section)} classement(s), format normalisé → {V2_OUTPUT_FILE}")
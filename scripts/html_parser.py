@@ -0,0 +1,60 @@
+"""
+Point d'entrée unique pour parser le HTML des pages ESPN.
+
+Le backend BeautifulSoup est choisi par la variable d'environnement HTML_PARSER :
+  - html.parser (défaut) → parseur pur Python (comportement historique)
+  - lxml                 → tokenizer C de lxml
+  - auto                 → lxml s'il est installé, sinon html.parser
+
+L'API reste celle de BeautifulSoup (select / select_one / find_all…) et la
+sélection CSS passe par soupsieve quel que soit le backend. Mais html.parser
+et lxml ne construisent pas le même arbre sur du HTML mal formé : lxml ne
+deviendra le défaut qu'une fois un rejeu (FETCH_MODE=replay) comparé avec
+les deux backends et produisant des sorties identiques.
+
+selectolax n'expose pas l'API BeautifulSoup : il n'est mesuré que par le
+benchmark (python scripts/bench_parsers.py), pour décider d'un éventuel
+portage des extracteurs.
+"""
+
+import os
+
+from bs4 import BeautifulSoup
+
+import instrumentation
+
+HTML_PARSER = os.environ.get("HTML_PARSER", "html.parser").strip().lower()
+
+_backend = {"name": None}
+
+
+def _lxml_available():
+    try:
+        import lxml  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def backend():
+    """Nom du parseur BeautifulSoup effectivement utilisé."""
+    if _backend["name"] is None:
+        if HTML_PARSER == "auto":
+            name = "lxml" if _lxml_available() else "html.parser"
+        elif HTML_PARSER == "lxml" and not _lxml_available():
+            print("⚠️ HTML_PARSER=lxml mais lxml n'est pas installé — repli sur html.parser")
+            name = "html.parser"
+        elif HTML_PARSER in ("lxml", "html.parser", ""):
+            name = HTML_PARSER or "html.parser"
+        else:
+            print(f"⚠️ HTML_PARSER inconnu '{HTML_PARSER}' — repli sur html.parser")
+            name = "html.parser"
+        _backend["name"] = name
+        instrumentation.note("html_parser", "backend", name)
+    return _backend["name"]
+
+
+def parse(html, features=None):
+    """Parse `html` (str ou bytes) avec le backend configuré (chronométré "parse")."""
+    with instrumentation.timer("parse"):
+        return BeautifulSoup(html, features or backend())
@@ -0,0 +1,194 @@
+"""
+Instrumentation légère des scrapers : chronomètres par étape, compteurs
+et rapport JSON écrit en fin de run.
+
+Utilisation :
+    import instrumentation
+    instrumentation.start_run()            # en tête du script
+    with instrumentation.timer("parse"):
+        soup = BeautifulSoup(html, "html.parser")
+    instrumentation.incr("pages")
+
+Le rapport est écrit à la sortie du processus dans RUN_REPORT_DIR
+(défaut : run_reports/<script>-<horodatage>.json).
+
+Profilage optionnel via la variable d'environnement PROFILE :
+  - PROFILE=cprofile    → run_reports/<script>-<horodatage>.prof
+  - PROFILE=pyinstrument → run_reports/<script>-<horodatage>.html
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+RUN_REPORT_DIR = os.environ.get("RUN_REPORT_DIR", "run_reports")
+PROFILE = os.environ.get("PROFILE", "").strip().lower()
+
+_lock = threading.Lock()
+_timers = {}
+_counters = {}
+_notes = {}
+
+_run = {
+    "started": False,
+    "script": None,
+    "started_at": None,
+    "t0": None,
+    "profiler": None,
+}
+
+
+# ===============================================================
+# CHRONOMÈTRES & COMPTEURS
+# ===============================================================
+
+def add_time(name, seconds):
+    """Ajoute une durée (en secondes) au chronomètre `name`."""
+    with _lock:
+        t = _timers.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+        t["count"] += 1
+        t["total"] += seconds
+        if seconds > t["max"]:
+            t["max"] = seconds
+
+
+@contextmanager
+def timer(name):
+    """Chronomètre le bloc `with` sous le nom `name`."""
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_time(name, time.perf_counter() - t0)
+
+
+def incr(name, n=1):
+    """Incrémente le compteur `name` de `n`."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def note(section, key, value):
+    """Enregistre une information libre dans le rapport (section → clé → valeur)."""
+    with _lock:
+        _notes.setdefault(section, {})[key] = value
+
+
+# ===============================================================
+# PROFILAGE OPTIONNEL
+# ===============================================================
+
+def _start_profiler():
+    if PROFILE == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+    if PROFILE == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            print("⚠️ PROFILE=pyinstrument mais pyinstrument n'est pas installé — profilage désactivé")
+            return None
+        profiler = Profiler()
+        profiler.start()
+        return profiler
+    if PROFILE:
+        print(f"⚠️ PROFILE inconnu '{PROFILE}' — profilage désactivé")
+    return None
+
+
+def _stop_profiler(profiler, base_path):
+    if profiler is None:
+        return None
+    if PROFILE == "cprofile":
+        profiler.disable()
+        path = base_path + ".prof"
+        profiler.dump_stats(path)
+        return path
+    profiler.stop()
+    path = base_path + ".html"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(profiler.output_html())
+    return path
+
+
+# ===============================================================
+# RAPPORT DE RUN
+# ===============================================================
+
+def start_run(script=None):
+    """Démarre le suivi du run : profilage éventuel + rapport JSON à la sortie."""
+    if _run["started"]:
+        return
+    _run["started"] = True
+    _run["script"] = script or os.path.splitext(os.path.basename(sys.argv[0] or "run"))[0]
+    _run["started_at"] = datetime.now(timezone.utc)
+    _run["t0"] = time.perf_counter()
+    _run["profiler"] = _start_profiler()
+    atexit.register(write_report)
+
+
+def snapshot():
+    """Retourne l'état courant des chronomètres, compteurs et notes."""
+    with _lock:
+        timers = {
+            name: {
+                "count": t["count"],
+                "total_s": round(t["total"], 4),
+                "mean_s": round(t["total"] / t["count"], 4) if t["count"] else 0.0,
+                "max_s": round(t["max"], 4),
+            }
+            for name, t in sorted(_timers.items())
+        }
+        return {
+            "timers": timers,
+            "counters": dict(sorted(_counters.items())),
+            "notes": json.loads(json.dumps(_notes, default=str)),
+        }
+
+
+def write_report():
+    """Écrit le rapport JSON du run (appelé automatiquement à la sortie)."""
+    if not _run["started"]:
+        return None
+    finished_at = datetime.now(timezone.utc)
+    stamp = _run["started_at"].strftime("%Y%m%dT%H%M%S")
+    os.makedirs(RUN_REPORT_DIR, exist_ok=True)
+    base_path = os.path.join(RUN_REPORT_DIR, f"{_run['script']}-{stamp}")
+
+    profile_path = None
+    try:
+        profile_path = _stop_profiler(_run["profiler"], base_path)
+    except Exception as e:
+        print(f"⚠️ Erreur écriture profil : {e}")
+    _run["profiler"] = None
+
+    report = {
+        "script": _run["script"],
+        "started_at": _run["started_at"].isoformat(),
+        "finished_at": finished_at.isoformat(),
+        "wall_s": round(time.perf_counter() - _run["t0"], 3),
+        "fetch_mode": os.environ.get("FETCH_MODE", "live"),
+        "profile": profile_path,
+        **snapshot(),
+    }
+
+    path = base_path + ".json"
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    _run["started"] = False
+
+    print(f"\n⏱️  Rapport de run ({report['wall_s']}s) → {path}")
+    for name, t in sorted(report["timers"].items(), key=lambda kv: kv[1]["total_s"], reverse=True)[:8]:
+        print(f"   {name:<22} {t['total_s']:>9.2f}s  ({t['count']}×, max {t['max_s']:.2f}s)")
+    if profile_path:
+        print(f"   🔬 Profil : {profile_path}")
+    return path
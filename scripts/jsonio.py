@@ -0,0 +1,210 @@
+"""
+Lecture / écriture JSON commune à tous les scripts.
+
+    load(path, default=...)          → objet Python (orjson si installé)
+    dump(path, obj, pretty=True)     → écriture atomique (fichier .tmp + os.replace)
+    write_bytes / write_text         → écriture atomique d'un contenu déjà sérialisé
+
+Sérialiseur : orjson s'il est installé (5 à 10 fois plus rapide que json),
+sinon la bibliothèque standard. La sortie "pretty" d'orjson (indentation 2,
+UTF-8 brut) est identique octet pour octet à json.dump(indent=2,
+ensure_ascii=False) ; une autre indentation (ex. Standings.json en 4) passe
+par la bibliothèque standard pour garder le même fichier.
+
+Variables d'environnement :
+  - JSON_STYLE    : auto (défaut, choix de chaque sortie) | pretty | compact
+  - JSON_SIDECARS : copies compressées écrites à côté de chaque sortie,
+                    ex. "gz" ou "gz,zst" (zst nécessite le paquet zstandard)
+
+Benchmark (temps d'écriture et taille par fichier) :
+    python scripts/jsonio.py bench [fichiers...]
+"""
+
+import gzip
+import json
+import os
+import sys
+import time
+from collections.abc import Mapping
+
+import instrumentation
+
+try:
+    import orjson
+except ImportError:   # repli : bibliothèque standard
+    orjson = None
+
+JSON_STYLE = os.environ.get("JSON_STYLE", "auto").strip().lower()
+JSON_SIDECARS = [s.strip() for s in os.environ.get("JSON_SIDECARS", "").lower().split(",") if s.strip()]
+
+_MISSING = object()
+
+
+# ===============================================================
+# SÉRIALISATION
+# ===============================================================
+
+def _default(obj):
+    """Mappings qui ne sont pas des dict (ex. predictions_store.LazyGame) → dict."""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Type non sérialisable en JSON : {type(obj).__name__}")
+
+
+def dumps(obj, pretty=True, indent=2):
+    """Sérialise `obj` en bytes UTF-8 (pretty : indentation `indent`)."""
+    if orjson is not None and (not pretty or indent == 2):
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+    if pretty:
+        text = json.dumps(obj, indent=indent, ensure_ascii=False, default=_default)
+    else:
+        text = json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default)
+    return text.encode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, bytes):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+# ===============================================================
+# FICHIERS
+# ===============================================================
+
+def write_bytes(path, data):
+    """Écriture atomique : fichier .tmp puis os.replace."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_text(path, text):
+    write_bytes(path, text.encode("utf-8"))
+
+
+def _compress(data, kind):
+    if kind == "gz":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if kind == "zst":
+        import zstandard
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    raise ValueError(f"compression inconnue : {kind}")
+
+
+def _write_sidecars(path, data, sidecars):
+    for kind in sidecars:
+        try:
+            write_bytes(f"{path}.{kind}", _compress(data, kind))
+        except ImportError:
+            print(f"⚠️ JSON_SIDECARS={kind} : module zstandard absent — copie ignorée")
+        except ValueError as e:
+            print(f"⚠️ JSON_SIDECARS : {e}")
+
+
+def dump(path, obj, pretty=True, indent=2, sidecars=None):
+    """
+    Écrit `obj` dans `path` de façon atomique (un lecteur ne voit jamais de
+    fichier tronqué). `pretty` est le choix de la sortie, JSON_STYLE peut le
+    forcer. Retourne la taille écrite en octets.
+    """
+    if JSON_STYLE == "pretty":
+        pretty = True
+    elif JSON_STYLE == "compact":
+        pretty = False
+
+    with instrumentation.timer("json_dump"):
+        data = dumps(obj, pretty=pretty, indent=indent)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        write_bytes(path, data)
+        _write_sidecars(path, data, JSON_SIDECARS if sidecars is None else sidecars)
+    instrumentation.incr("json_bytes", len(data))
+    return len(data)
+
+
+def load(path, default=_MISSING):
+    """Lit un fichier JSON ; retourne `default` s'il est absent (sinon FileNotFoundError)."""
+    if default is not _MISSING and not os.path.exists(path):
+        return default
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+# ===============================================================
+# BENCHMARK
+# ===============================================================
+
+BENCH_FILES = [
+    "data/football/standings/Standings.json",
+    "data/football/leagues/data_teams.json",
+    "data/football/games_of_day.json",
+    "data/hockey/leagues/NHL.json",
+    "data/football/teams/football_teams.json",
+]
+
+
+def _median_ms(fn, repeat=5):
+    durations = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        durations.append(time.perf_counter() - t0)
+    return sorted(durations)[len(durations) // 2] * 1000
+
+
+def bench(paths):
+    """Temps de sérialisation et taille de chaque fichier selon la méthode."""
+    try:
+        import zstandard  # noqa: F401
+        has_zstd = True
+    except ImportError:
+        has_zstd = False
+        print("ℹ️  zstandard non installé — colonne zst ignorée")
+    if orjson is None:
+        print("ℹ️  orjson non installé — seules les mesures stdlib sont faites")
+
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"⚠️ Fichier introuvable : {path}")
+            continue
+        with open(path, "rb") as f:
+            raw = f.read()
+        obj = json.loads(raw)
+        print(f"\n📄 {path} ({os.path.getsize(path) / 1e6:.2f} Mo)")
+        print(f"   {'méthode':<22} {'ms':>9} {'octets':>12} {'gz':>10} {'zst':>10}")
+
+        methods = [
+            ("json indent=2", lambda: json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")),
+            ("json compact", lambda: json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")),
+        ]
+        if orjson is not None:
+            methods += [
+                ("orjson pretty", lambda: orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)),
+                ("orjson compact", lambda: orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)),
+            ]
+        for name, fn in methods:
+            ms = _median_ms(fn)
+            data = fn()
+            gz = len(_compress(data, "gz"))
+            zst = len(_compress(data, "zst")) if has_zstd else None
+            print(f"   {name:<22} {ms:>9.1f} {len(data):>12,} {gz:>10,} {zst if zst is not None else '-':>10}")
+
+        line = f"   lecture : json {_median_ms(lambda: json.loads(raw)):.1f} ms"
+        if orjson is not None:
+            line += f" | orjson {_median_ms(lambda: orjson.loads(raw)):.1f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench(sys.argv[2:] or BENCH_FILES)
+    else:
+        print("Usage : python scripts/jsonio.py bench [fichiers...]")
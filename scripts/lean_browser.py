@@ -0,0 +1,211 @@
+"""
+Profil Chrome « léger » commun à tous les scrapers Selenium.
+
+Les scrapers ne lisent que le HTML (et les URLs des logos, dans les
+attributs src) : images, polices, vidéos, publicités et traceurs sont
+téléchargés pour rien. En mode léger :
+
+  - options Chrome (avant lancement) : images désactivées, stratégie de
+    chargement "eager" (driver.get rend la main au DOMContentLoaded)
+  - CDP Network.setBlockedURLs (après lancement) : liste BLOCKED_URLS
+    ci-dessous (régies pub, mesure d'audience, polices, médias)
+
+    lean_browser.apply_options(options)   # dans chaque _start_chrome
+    lean_browser.apply_cdp(driver)        # fait par fetch_backend.open_driver
+
+Mesure : après chaque driver.get, fetch_backend appelle measure(driver)
+(Resource Timing du navigateur) → compteurs transfer_bytes / page_requests
+et chronomètre dom_ready du run_report, à comparer entre LEAN_BROWSER=on
+et off. Comparaison directe sur quelques pages :
+
+    python scripts/lean_browser.py bench [url ...]
+
+Variables d'environnement :
+  - LEAN_BROWSER : on (défaut) | off (profil complet historique)
+"""
+
+import os
+import sys
+import time
+
+import instrumentation
+
+LEAN_BROWSER = os.environ.get("LEAN_BROWSER", "on").strip().lower() != "off"
+
+# Motifs Network.setBlockedURLs ("*" = joker). À compléter quand un nouveau
+# fournisseur apparaît dans le bench (colonne requêtes anormalement haute).
+BLOCKED_URLS = [
+    # Publicité
+    "*doubleclick.net*",
+    "*googlesyndication.com*",
+    "*googleadservices.com*",
+    "*amazon-adsystem.com*",
+    "*adnxs.com*",
+    "*rubiconproject.com*",
+    "*pubmatic.com*",
+    "*casalemedia.com*",
+    "*openx.net*",
+    "*criteo.*",
+    "*taboola.com*",
+    "*outbrain.com*",
+    "*moatads.com*",
+    "*adsafeprotected.com*",
+    "*doubleverify.com*",
+    # Mesure d'audience / traceurs
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*omtrdc.net*",
+    "*demdex.net*",
+    "*2o7.net*",
+    "*chartbeat.com*",
+    "*chartbeat.net*",
+    "*scorecardresearch.com*",
+    "*imrworldwide.com*",
+    "*krxd.net*",
+    "*bluekai.com*",
+    "*quantserve.com*",
+    "*newrelic.com*",
+    "*nr-data.net*",
+    "*hotjar.com*",
+    "*optimizely.com*",
+    "*connect.facebook.net*",
+    "*platform.twitter.com*",
+    # Médias
+    "*.mp4*",
+    "*.webm*",
+    "*.m3u8*",
+    "*brightcove*",
+    # Polices
+    "*.woff*",
+    "*.ttf*",
+    "*.otf*",
+    "*.eot*",
+    # Images (les logos sont lus dans l'attribut src, jamais téléchargés)
+    "*.png*",
+    "*.jpg*",
+    "*.jpeg*",
+    "*.gif*",
+    "*.webp*",
+    "*.svg*",
+    "*.ico*",
+    "*/combiner/i?img=*",
+]
+
+# Octets transférés et nombre de ressources de la page courante
+_MEASURE_SCRIPT = """
+const nav = performance.getEntriesByType('navigation')[0] || {};
+const resources = performance.getEntriesByType('resource');
+let bytes = nav.transferSize || 0;
+for (const r of resources) { bytes += r.transferSize || 0; }
+return {
+    bytes: bytes,
+    requests: resources.length + 1,
+    dom_ready_ms: nav.domContentLoadedEventEnd || 0
+};
+"""
+
+
+# ===============================================================
+# CONFIGURATION DU NAVIGATEUR
+# ===============================================================
+
+def apply_options(options):
+    """Options de lancement du profil léger (no-op si LEAN_BROWSER=off)."""
+    if not LEAN_BROWSER:
+        return options
+    options.page_load_strategy = "eager"
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.add_argument("--mute-audio")
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.media_stream": 2,
+    })
+    return options
+
+
+def apply_cdp(driver):
+    """Active le blocage d'URLs par CDP sur un driver Chrome démarré."""
+    if not LEAN_BROWSER:
+        return driver
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    except Exception as e:
+        # Driver sans CDP (autre navigateur) : seules les options s'appliquent
+        print(f"⚠️ Blocage d'URLs CDP indisponible : {e}")
+    return driver
+
+
+# ===============================================================
+# MESURE
+# ===============================================================
+
+def measure(driver):
+    """
+    Octets transférés, requêtes et temps DOMContentLoaded de la page
+    courante, ajoutés au run_report. Retourne le dict (ou None).
+    """
+    try:
+        metrics = driver.execute_script(_MEASURE_SCRIPT)
+    except Exception:
+        return None
+    if not metrics:
+        return None
+    instrumentation.incr("transfer_bytes", int(metrics.get("bytes") or 0))
+    instrumentation.incr("page_requests", int(metrics.get("requests") or 0))
+    instrumentation.add_time("dom_ready", (metrics.get("dom_ready_ms") or 0) / 1000)
+    return metrics
+
+
+# ===============================================================
+# BENCHMARK (profil complet vs léger)
+# ===============================================================
+
+BENCH_URLS = [
+    "https://www.espn.com/soccer/standings/_/league/eng.1",
+    "https://www.espn.com/soccer/team/results/_/id/359",
+    "https://www.espn.com/soccer/schedule",
+]
+
+
+def _bench_driver(lean):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    global LEAN_BROWSER
+    previous, LEAN_BROWSER = LEAN_BROWSER, lean
+    try:
+        options = Options()
+        options.add_argument("--headless=new")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--window-size=1920,1080")
+        apply_options(options)
+        driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(60)
+        return apply_cdp(driver)
+    finally:
+        LEAN_BROWSER = previous
+
+
+def bench(urls):
+    print(f"   {'profil':<8} {'s':>6} {'Ko':>9} {'requêtes':>9}  url")
+    for lean in (False, True):
+        driver = _bench_driver(lean)
+        try:
+            for url in urls:
+                t0 = time.perf_counter()
+                driver.get(url)
+                seconds = time.perf_counter() - t0
+                metrics = measure(driver) or {}
+                print(f"   {'léger' if lean else 'complet':<8} {seconds:>6.1f} "
+                      f"{(metrics.get('bytes') or 0) / 1024:>9.0f} {metrics.get('requests', 0):>9}  {url}")
+        finally:
+            driver.quit()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench(sys.argv[2:] or BENCH_URLS)
+    else:
+        print("Usage : python scripts/lean_browser.py bench [url ...]")
@@ -0,0 +1,275 @@
+"""
+API de requêtes Python sur les matchs, avec index en mémoire (équivalent de
+getLastMatches de src/index.js, sans relire ni re-parser le fichier de la
+ligue à chaque appel).
+
+    match_query.last_matches("England_Premier_League", limit=15)
+    match_query.league_matches("Spain_Laliga", since="2025-08-01", until="2025-12-31")
+    match_query.team_matches("Arsenal", limit=10)            # nom (fichiers de ligue)
+    match_query.team_matches("359", limit=10)                # id ESPN (store des matchs)
+    match_query.competition_matches("English FA Cup", limit=5)
+    match_query.get("637991")                                 # gameId → match
+    match_query.head_to_head("359", "360", limit=10)          # ids ESPN (store des matchs)
+
+Index construits à la première requête qui en a besoin, puis gardés :
+  - fichiers de ligue (data/football/leagues/<Ligue>.json, sinon
+    leagues_with_odds) : ligue → matchs triés par date, équipe (nom) →
+    positions dans cette liste, gameId → match
+  - store des matchs (match_store, data_teams.json) : id d'équipe → matchs
+    triés, compétition → matchs triés
+Chaque requête compare le mtime / la taille du fichier source à ceux de
+l'index : un fichier réécrit par un scraper est relu à la requête suivante.
+
+Les matchs retournés sont ceux des fichiers (même format que getLastMatches),
+du plus ancien au plus récent ; `since` / `until` sont des dates ISO
+incluses, filtrées par dichotomie.
+
+Benchmark (index vs relecture complète à chaque appel) :
+    python scripts/match_query.py bench [Ligue]
+"""
+
+import bisect
+import glob
+import heapq
+import os
+import sys
+import time
+
+import asof_standings
+import jsonio
+import match_store
+
+LEAGUE_DIRS = [
+    os.path.join("data", "football", "leagues"),
+    os.path.join("data", "football", "leagues_with_odds"),
+]
+# Fichiers de ces dossiers qui ne sont pas des ligues
+NOT_LEAGUES = {"data_teams"}
+
+_leagues = {}   # ligue → {"signature", "dates", "matches", "teams", "by_id"}
+_store_index = {"signature": None, "teams": {}, "competitions": {}}   # clé → ([dates], [matchs])
+
+
+# ===============================================================
+# FICHIERS DE LIGUE
+# ===============================================================
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def league_path(league):
+    for directory in LEAGUE_DIRS:
+        path = os.path.join(directory, f"{league}.json")
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def leagues():
+    """Ligues disponibles (premier dossier de LEAGUE_DIRS qui contient le fichier)."""
+    names = set()
+    for directory in LEAGUE_DIRS:
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            names.add(os.path.splitext(os.path.basename(path))[0])
+    return sorted(names - NOT_LEAGUES)
+
+
+def is_played(match):
+    """Même filtre que getLastMatches : score présent, ni "-" ni "vs"."""
+    score = match.get("score")
+    return bool(score) and score != "-" and "vs" not in score.lower()
+
+
+def _build_league(path):
+    rows = []
+    for seq, m in enumerate(jsonio.load(path, default=[])):
+        if is_played(m):
+            rows.append((asof_standings.to_iso(m.get("date")) or "", seq, m))
+    rows.sort(key=lambda r: (r[0], r[1]))
+
+    matches = [m for _, _, m in rows]
+    teams, by_id = {}, {}
+    for i, m in enumerate(matches):
+        for side in ("team1", "team2"):
+            if m.get(side):
+                teams.setdefault(m[side], []).append(i)
+        if m.get("gameId"):
+            by_id[str(m["gameId"])] = m
+    return {
+        "signature": _signature(path),
+        "dates": [d for d, _, _ in rows],
+        "matches": matches,
+        "teams": teams,
+        "by_id": by_id,
+    }
+
+
+def _league(league):
+    """Index de la ligue, reconstruit si son fichier a changé (None si inconnue)."""
+    path = league_path(league)
+    if path is None:
+        _leagues.pop(league, None)
+        return None
+    entry = _leagues.get(league)
+    if entry is None or entry["signature"] != _signature(path):
+        entry = _leagues[league] = _build_league(path)
+    return entry
+
+
+def _window(dates, since, until):
+    lo = bisect.bisect_left(dates, since) if since else 0
+    hi = bisect.bisect_right(dates, until) if until else len(dates)
+    return lo, hi
+
+
+def _strip_stats(matches, include_stats):
+    if include_stats:
+        return matches
+    return [{k: v for k, v in m.items() if k != "stats"} for m in matches]
+
+
+def last_matches(league, limit=15, include_stats=True):
+    """Les `limit` derniers matchs joués de la ligue (ValueError si ligue inconnue)."""
+    entry = _league(league)
+    if entry is None:
+        raise ValueError(f"Ligue inconnue : {league}")
+    return _strip_stats(entry["matches"][-limit:] if limit else [], include_stats)
+
+
+def league_matches(league, since=None, until=None, limit=None, include_stats=True):
+    """Matchs joués de la ligue entre `since` et `until` (les `limit` plus récents)."""
+    entry = _league(league)
+    if entry is None:
+        raise ValueError(f"Ligue inconnue : {league}")
+    lo, hi = _window(entry["dates"], since, until)
+    if limit is not None:
+        lo = max(lo, hi - limit)
+    return _strip_stats(entry["matches"][lo:hi], include_stats)
+
+
+def get(game_id):
+    """Match par gameId : fichiers de ligue, sinon store des matchs."""
+    game_id = str(game_id)
+    for league in leagues():
+        entry = _league(league)
+        if entry and game_id in entry["by_id"]:
+            return entry["by_id"][game_id]
+    _refresh_store()
+    return match_store.get_match(game_id)
+
+
+# ===============================================================
+# STORE DES MATCHS (ids d'équipe, compétitions)
+# ===============================================================
+
+def _refresh_store():
+    signature = _signature(match_store.DATA_TEAMS_FILE)
+    if signature == _store_index["signature"]:
+        return
+    store = match_store.load(force=_store_index["signature"] is not None)
+    teams, competitions = {}, {}
+    for m in sorted(store["matches"].values(), key=lambda m: (m.get("date") or "", m.get("match_id"))):
+        keys = [(teams, m.get("home_team_id")), (teams, m.get("away_team_id")),
+                (competitions, m.get("competition"))]
+        for index, key in keys:
+            dates, matches = index.setdefault(key, ([], []))
+            dates.append(m.get("date") or "")
+            matches.append(m)
+    _store_index.update(signature=signature, teams=teams, competitions=competitions)
+
+
+def refresh():
+    """Reconstruit les index (store, ligues déjà chargées) dont le fichier a changé."""
+    _refresh_store()
+    for league in list(_leagues):
+        _league(league)
+
+
+def _store_window(entry, since, until, limit):
+    dates, matches = entry
+    lo, hi = _window(dates, since, until)
+    if limit is not None:
+        lo = max(lo, hi - limit)
+    return matches[lo:hi]
+
+
+def competition_matches(competition, since=None, until=None, limit=None):
+    """Matchs terminés d'une compétition (libellé ESPN du store)."""
+    _refresh_store()
+    return _store_window(_store_index["competitions"].get(competition, ([], [])), since, until, limit)
+
+
+def team_matches(team, since=None, until=None, limit=None, league=None):
+    """
+    Matchs d'une équipe : `team` est un id ESPN (store des matchs, toutes
+    compétitions) ou un nom (fichiers de ligue ; `league` pour n'en lire qu'un).
+    """
+    if str(team).isdigit():
+        _refresh_store()
+        return _store_window(_store_index["teams"].get(str(team), ([], [])), since, until, limit)
+
+    per_league = []
+    for name in ([league] if league else leagues()):
+        entry = _league(name)
+        positions = entry["teams"].get(team) if entry else None
+        if not positions:
+            continue
+        per_league.append([(entry["dates"][i], entry["matches"][i]) for i in positions
+                           if (not since or entry["dates"][i] >= since)
+                           and (not until or entry["dates"][i] <= until)])
+    merged = [m for _, m in heapq.merge(*per_league, key=lambda r: r[0])]
+    return merged[-limit:] if limit is not None else merged
+
+
+def head_to_head(team_a, team_b, limit=None, before=None):
+    """Confrontations entre deux ids d'équipe (store des matchs), de la plus récente à la plus ancienne."""
+    _refresh_store()
+    return match_store.head_to_head(team_a, team_b, limit=limit, before=before)
+
+
+# ===============================================================
+# BENCHMARK
+# ===============================================================
+
+def _naive_last_matches(league, limit=15):
+    """Comportement de getLastMatches : relecture complète et filtre linéaire."""
+    data = jsonio.load(league_path(league))
+    return [m for m in data if is_played(m)][-limit:]
+
+
+def bench(league="England_Premier_League", repeat=200):
+    path = league_path(league)
+    if path is None:
+        print(f"⚠️ Ligue introuvable : {league}")
+        return
+    print(f"📄 {path} ({os.path.getsize(path) / 1e6:.2f} Mo), {repeat} requêtes last_matches(limit=15)")
+
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        _naive_last_matches(league)
+    naive = (time.perf_counter() - t0) / repeat
+
+    _leagues.pop(league, None)
+    t0 = time.perf_counter()
+    last_matches(league)
+    first = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        last_matches(league)
+    indexed = (time.perf_counter() - t0) / repeat
+
+    print(f"   relecture complète : {naive * 1e3:9.2f} ms / requête")
+    print(f"   index (1re requête) : {first * 1e3:9.2f} ms")
+    print(f"   index (ensuite)     : {indexed * 1e6:9.1f} µs / requête  (×{naive / indexed:,.0f})")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "bench":
+        bench(*sys.argv[2:3])
+    else:
+        print("Usage : python scripts/match_query.py bench [Ligue]")
@@ -0,0 +1,208 @@
+"""
+Store des matchs terminés déjà scrapés, avec index en mémoire, chargé une
+seule fois par processus :
+
+    load()                              → charge data_teams.json (+ leagues_with_odds)
+    ingest(match)                       → ajoute / complète un match, index mis à jour
+    covers(team_id, as_of=None)         → True si l'historique de l'équipe est dans le store
+    get_match(match_id)                 → match du store (ou None)
+    head_to_head(team_a, team_b, ...)   → confrontations, de la plus récente à la plus ancienne
+    recent(team_id, ...)                → derniers matchs d'une équipe, du plus récent au plus ancien
+
+Sources :
+  - data/football/leagues/data_teams.json (Teams_tracker.py) : chaque match
+    y figure dans l'historique de ses deux équipes ; il n'est gardé qu'une
+    fois, sans les champs propres à une équipe (team_result, next_game).
+  - data/football/leagues_with_odds/*.json : complète cotes et stats (par
+    gameId) des matchs qui n'en ont pas.
+
+Index tenus à jour par insertion dichotomique à chaque ingest() (pas de
+reconstruction) :
+  - confrontations : paire non ordonnée (team_id, team_id) → liste
+    [(date, match_id), ...] triée par date
+  - forme récente  : team_id → ses RECENT_SIZE derniers matchs, même format
+    (liste bornée : le plus ancien sort quand un plus récent arrive)
+"""
+
+import bisect
+import glob
+import os
+from datetime import datetime
+
+import instrumentation
+import jsonio
+import update_planner
+
+DATA_TEAMS_FILE = os.path.join("data", "football", "leagues", "data_teams.json")
+ODDS_DIR = os.path.join("data", "football", "leagues_with_odds")
+
+# Champs qui dépendent de l'équipe dont l'historique contient le match
+TEAM_FIELDS = ("team_result", "next_game")
+
+# Matchs gardés par équipe dans la vue « forme récente »
+RECENT_SIZE = 20
+
+_store = {
+    "loaded": False,
+    "matches": {},   # match_id → match
+    "pairs": {},     # (team_id, team_id) trié → [(date, match_id), ...] trié
+    "recent": {},    # team_id → RECENT_SIZE derniers [(date, match_id), ...] triés
+    "teams": {},     # équipe trackée (historique complet dans le store) → date ISO de son prochain match
+}
+
+
+# ===============================================================
+# INGESTION
+# ===============================================================
+
+def pair_key(team_a, team_b):
+    return (team_a, team_b) if team_a <= team_b else (team_b, team_a)
+
+
+def _is_finished(match):
+    return match.get("home_score") is not None and match.get("away_score") is not None
+
+
+def _has_odds(match):
+    return any(v is not None for v in (match.get("odds") or {}).values())
+
+
+def ingest(match):
+    """
+    Ajoute un match terminé au store (ou complète celui déjà connu).
+    Retourne True si le match est nouveau.
+    """
+    match_id = match.get("match_id")
+    home_id, away_id = match.get("home_team_id"), match.get("away_team_id")
+    if not match_id or not home_id or not away_id or not _is_finished(match):
+        return False
+
+    known = _store["matches"].get(match_id)
+    if known is not None:
+        if not _has_odds(known) and _has_odds(match):
+            known["odds"] = match["odds"]
+        if not known.get("stats") and match.get("stats"):
+            known["stats"] = match["stats"]
+        return False
+
+    stored = {k: v for k, v in match.items() if k not in TEAM_FIELDS}
+    _store["matches"][match_id] = stored
+    key = (stored.get("date") or "", match_id)
+    bisect.insort(_store["pairs"].setdefault(pair_key(home_id, away_id), []), key)
+    for team_id in (home_id, away_id):
+        recent_matches = _store["recent"].setdefault(team_id, [])
+        bisect.insort(recent_matches, key)
+        if len(recent_matches) > RECENT_SIZE:
+            del recent_matches[0]
+    return True
+
+
+def _apply_odds_files():
+    """Cotes / stats de leagues_with_odds pour les matchs qui n'en ont pas."""
+    completed = 0
+    for path in sorted(glob.glob(os.path.join(ODDS_DIR, "*.json"))):
+        for entry in jsonio.load(path, default=[]):
+            known = _store["matches"].get(str(entry.get("gameId") or ""))
+            if known is None:
+                continue
+            changed = False
+            if not _has_odds(known) and entry.get("odds"):
+                known["odds"] = entry["odds"]
+                changed = True
+            if not known.get("stats") and entry.get("stats"):
+                known["stats"] = entry["stats"]
+                changed = True
+            completed += changed
+    return completed
+
+
+def _next_fixture_date(team):
+    """Date ISO du prochain match connu au scraping de l'équipe (None si inconnue)."""
+    try:
+        scraped_at = datetime.fromisoformat(team.get("scraped_at"))
+    except (TypeError, ValueError):
+        scraped_at = None
+    next_game = update_planner.next_fixture(team) or {}
+    next_date = update_planner.fixture_date(next_game.get("date"), scraped_at)
+    return next_date.isoformat() if next_date else None
+
+
+def load(force=False):
+    """Charge le store (une seule fois par processus sauf force=True)."""
+    if _store["loaded"] and not force:
+        return _store
+    _store.update(loaded=True, matches={}, pairs={}, recent={}, teams={})
+
+    with instrumentation.timer("match_store_load"):
+        data = jsonio.load(DATA_TEAMS_FILE, default=None)
+        if data is None:
+            print(f"ℹ️ Store des matchs vide ({DATA_TEAMS_FILE} introuvable)")
+            return _store
+        for team in data.get("teams", []):
+            if team.get("team_id"):
+                _store["teams"][team["team_id"]] = _next_fixture_date(team)
+            for season_matches in (team.get("matches_by_season") or {}).values():
+                for m in season_matches:
+                    ingest(m)
+        completed = _apply_odds_files()
+
+    print(f"🗂️  Store des matchs : {len(_store['matches'])} match(s), "
+          f"{len(_store['pairs'])} paire(s), {len(_store['teams'])} équipe(s) couvertes"
+          f" ({completed} complété(s) par leagues_with_odds)")
+    instrumentation.note("match_store", "matches", len(_store["matches"]))
+    return _store
+
+
+# ===============================================================
+# REQUÊTES
+# ===============================================================
+
+def _newest(entries, limit, before):
+    """Matchs d'une liste [(date, match_id)] triée, du plus récent au plus ancien."""
+    if before:
+        entries = entries[:bisect.bisect_left(entries, (before, ""))]
+    ids = [match_id for _, match_id in reversed(entries)]
+    if limit is not None:
+        ids = ids[:limit]
+    return [_store["matches"][match_id] for match_id in ids]
+
+
+def covers(team_id, as_of=None):
+    """
+    True si l'historique complet de l'équipe est dans le store. Avec as_of
+    (date ISO), il doit aussi être à jour à cette date : le prochain match
+    connu au scraping tombe le jour as_of ou après, aucun match n'a donc été
+    joué depuis (prochain match inconnu → pas à jour).
+    """
+    load()
+    if not team_id or team_id not in _store["teams"]:
+        return False
+    if as_of is None:
+        return True
+    next_date = _store["teams"][team_id]
+    return next_date is not None and next_date >= as_of
+
+
+def get_match(match_id):
+    load()
+    return _store["matches"].get(match_id)
+
+
+def head_to_head(team_a, team_b, limit=None, before=None):
+    """
+    Confrontations terminées entre deux équipes, de la plus récente à la
+    plus ancienne (strictement avant la date ISO `before` si fournie).
+    """
+    load()
+    if not team_a or not team_b:
+        return []
+    return _newest(_store["pairs"].get(pair_key(team_a, team_b), []), limit, before)
+
+
+def recent(team_id, limit=None, before=None):
+    """
+    Derniers matchs terminés de l'équipe (au plus RECENT_SIZE), du plus
+    récent au plus ancien (strictement avant la date ISO `before` si fournie).
+    """
+    load()
+    return _newest(_store["recent"].get(team_id, []), limit, before)
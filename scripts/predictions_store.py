@@ -0,0 +1,274 @@
+"""
+Stockage adressé par contenu des fichiers de prédictions
+data/football/predictions/games-YYYY-MM-DD.json.
+
+Un fichier quotidien "empaqueté" ne contient plus que des références :
+
+    {
+      "format": "predictions/v2",
+      "games": [
+        {
+          ...champs du match (gameId, team1, odds, Analyse, Prediction_JSON...),
+          "recent_form": {"match1": {"team": ..., "last_matches": ["<ref>", ...]}, "match2": {...}},
+          "h2h": ["<ref>", ...],
+          "league_standing": "<ref>" | null
+        }
+      ]
+    }
+
+Les enregistrements sont stockés une seule fois (jamais modifiés) dans des
+fichiers de blobs regroupés par shard, un blob par ligne (diffs git en ajout) :
+
+    data/football/predictions/blobs/matches/<2 derniers chiffres du gameId>.json
+    data/football/predictions/blobs/standings/<1er caractère du hash>.json
+
+ref match = "<gameId>.<hash12>" (le même gameId peut exister en plusieurs
+versions, ex. stats complétées plus tard) ; ref classement = "<hash16>".
+Regrouper évite des milliers de petits fichiers (un bloc disque chacun).
+
+Lecture : load_day() rend les matchs avec réhydratation paresseuse (les blobs
+ne sont lus qu'à l'accès à recent_form / h2h / league_standing) ; les
+fichiers encore à l'ancien format sont rendus tels quels.
+
+CLI :
+    python scripts/predictions_store.py pack   [fichiers...]  # défaut : tous
+    python scripts/predictions_store.py unpack [fichiers...]  # retour à l'ancien format
+    python scripts/predictions_store.py stats
+"""
+
+import copy
+import glob
+import hashlib
+import json
+import os
+import sys
+from collections.abc import MutableMapping
+
+import jsonio
+
+PREDICTIONS_DIR = os.path.join("data", "football", "predictions")
+BLOBS_DIR = os.path.join(PREDICTIONS_DIR, "blobs")
+FORMAT = "predictions/v2"
+
+
+# ===============================================================
+# BLOBS
+# ===============================================================
+
+def _canonical(obj):
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _digest(obj):
+    return hashlib.sha1(_canonical(obj).encode("utf-8")).hexdigest()
+
+
+_shards = {}     # chemin du shard → {ref: enregistrement}
+_dirty = set()
+
+
+def _match_shard(ref):
+    game_id = ref.split(".", 1)[0]
+    return os.path.join(BLOBS_DIR, "matches", f"{game_id[-2:].rjust(2, '0')}.json")
+
+
+def _standing_shard(ref):
+    return os.path.join(BLOBS_DIR, "standings", f"{ref[0]}.json")
+
+
+def _load_shard(path):
+    if path not in _shards:
+        if os.path.exists(path):
+            _shards[path] = jsonio.load(path)
+        else:
+            _shards[path] = {}
+    return _shards[path]
+
+
+def _put(path, ref, obj):
+    shard = _load_shard(path)
+    if ref not in shard:
+        shard[ref] = obj
+        _dirty.add(path)
+    return ref
+
+
+def flush():
+    """Écrit les shards modifiés : un blob par ligne, refs triées."""
+    for path in sorted(_dirty):
+        shard = _shards[path]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lines = [f"{json.dumps(ref)}:{_canonical(shard[ref])}" for ref in sorted(shard)]
+        jsonio.write_text(path, "{\n" + ",\n".join(lines) + "\n}\n")
+    _dirty.clear()
+
+
+def put_match(record):
+    ref = f"{record.get('gameId') or 'x'}.{_digest(record)[:12]}"
+    return _put(_match_shard(ref), ref, record)
+
+
+def put_standing(table):
+    if not table:
+        return None
+    ref = _digest(table)[:16]
+    return _put(_standing_shard(ref), ref, table)
+
+
+def get_match(ref):
+    return copy.deepcopy(_load_shard(_match_shard(ref))[ref])
+
+
+def get_standing(ref):
+    return copy.deepcopy(_load_shard(_standing_shard(ref))[ref]) if ref else []
+
+
+# ===============================================================
+# EMPAQUETAGE / DÉPAQUETAGE D'UN MATCH
+# ===============================================================
+
+def pack_game(game):
+    packed = dict(game)
+    recent_form = {}
+    for key, form in (game.get("recent_form") or {}).items():
+        form = dict(form)
+        form["last_matches"] = [put_match(m) for m in form.get("last_matches", [])]
+        recent_form[key] = form
+    packed["recent_form"] = recent_form
+    packed["h2h"] = [put_match(m) for m in game.get("h2h", [])]
+    packed["league_standing"] = put_standing(game.get("league_standing"))
+    return packed
+
+
+def _rehydrate_field(game, key):
+    if key == "recent_form":
+        recent_form = {}
+        for k, form in (game.get("recent_form") or {}).items():
+            form = dict(form)
+            form["last_matches"] = [get_match(r) for r in form.get("last_matches", [])]
+            recent_form[k] = form
+        return recent_form
+    if key == "h2h":
+        return [get_match(r) for r in game.get("h2h", [])]
+    return get_standing(game.get("league_standing"))
+
+
+class LazyGame(MutableMapping):
+    """
+    Match empaqueté : recent_form / h2h / league_standing sont réhydratés au
+    premier accès puis gardés en mémoire.
+
+    Ce n'est pas une sous-classe de dict : toute lecture (game["h2h"], get,
+    items, values, itération, dict(game), copy) passe par __getitem__ et
+    rend les enregistrements, jamais les refs. json / jsonio le sérialisent
+    via dict(game) ; expand() et copy() rendent un dict complet (ancien format).
+    """
+
+    LAZY_KEYS = ("recent_form", "h2h", "league_standing")
+
+    def __init__(self, packed):
+        self._data = dict(packed)
+        self._loaded = set()
+
+    def _load(self, key):
+        if key in self.LAZY_KEYS and key not in self._loaded and key in self._data:
+            self._loaded.add(key)
+            packed_view = {k: self._data[k] for k in self.LAZY_KEYS if k in self._data}
+            self._data[key] = _rehydrate_field(packed_view, key)
+
+    def __getitem__(self, key):
+        self._load(key)
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self._loaded.add(key)
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        del self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"LazyGame({self.expand()!r})"
+
+    def expand(self):
+        return {key: self[key] for key in self._data}
+
+    copy = expand
+
+
+def unpack_game(game):
+    return LazyGame(game).expand()
+
+
+# ===============================================================
+# FICHIERS QUOTIDIENS
+# ===============================================================
+
+def is_packed(data):
+    return isinstance(data, dict) and data.get("format") == FORMAT
+
+
+def load_day(path):
+    """Matchs d'un fichier quotidien (réhydratation paresseuse si empaqueté)."""
+    data = jsonio.load(path)
+    if is_packed(data):
+        return [LazyGame(g) for g in data.get("games", [])]
+    return data
+
+
+def day_path(day):
+    """'2026-03-26' → data/football/predictions/games-2026-03-26.json"""
+    return os.path.join(PREDICTIONS_DIR, f"games-{day}.json")
+
+
+def pack_file(path):
+    data = jsonio.load(path)
+    if is_packed(data):
+        return False
+    packed = {"format": FORMAT, "games": [pack_game(g) for g in data]}
+    flush()   # blobs d'abord : un fichier quotidien ne référence que des blobs écrits
+    jsonio.dump(path, packed, indent=1)
+    return True
+
+
+def unpack_file(path):
+    data = jsonio.load(path)
+    if not is_packed(data):
+        return False
+    jsonio.dump(path, [unpack_game(g) for g in data.get("games", [])])
+    return True
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
+
+
+def daily_files():
+    return sorted(glob.glob(os.path.join(PREDICTIONS_DIR, "games-*.json")))
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    files = sys.argv[2:] or daily_files()
+
+    if command in ("pack", "unpack"):
+        before = _dir_size(PREDICTIONS_DIR)
+        action = pack_file if command == "pack" else unpack_file
+        changed = sum(1 for path in files if action(path))
+        after = _dir_size(PREDICTIONS_DIR)
+        print(f"✅ {changed}/{len(files)} fichier(s) {'empaqueté' if command == 'pack' else 'dépaqueté'}(s) — "
+              f"{before / 1e6:.1f} Mo → {after / 1e6:.1f} Mo")
+    else:
+        packed = sum(1 for path in files if is_packed(jsonio.load(path)))
+        print(f"📊 {len(files)} fichier(s) quotidien(s), {packed} empaqueté(s)")
+        print(f"   fichiers : {sum(os.path.getsize(p) for p in files) / 1e6:.1f} Mo, "
+              f"blobs : {_dir_size(BLOBS_DIR) / 1e6:.1f} Mo")
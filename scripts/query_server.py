@@ -0,0 +1,418 @@
+"""
+Service HTTP local, en lecture seule, sur les données du dépôt.
+
+Les applications internes lisaient les fichiers JSON bruts (games_of_day.json,
+Standings.json, historiques de ligue…) : plusieurs Mo re-téléchargés et
+re-parsés à chaque fois. Le service charge ces fichiers une fois dans des
+structures indexées et ne renvoie que la tranche demandée :
+
+    GET /health
+    GET /games-of-day?league=&limit=&offset=
+    GET /games-of-day/<gameId>                  (classement de la ligue joint)
+    GET /standings                              → ligues et saisons disponibles
+    GET /standings/<Ligue>[/<saison>]           (saison la plus récente par défaut)
+    GET /teams/<id ou nom>/matches?since=&until=&league=&limit=&offset=
+    GET /leagues/<Ligue>/matches?since=&until=&limit=&offset=
+    GET /h2h/<team_id>/<team_id>?before=&limit=&offset=
+    GET /nhl/games-of-day
+    GET /nhl/games?date=|since=&until=&team=&limit=&offset=
+
+Listes paginées ({"total", "offset", "limit", "items"}, du plus récent au
+plus ancien), ETag (hash du contenu) et réponse 304 sur If-None-Match,
+gzip si le client l'accepte. Équipes, ligues et H2H passent par
+match_query / match_store ; games of day, classements et NHL sont indexés
+ici.
+
+Rechargement à chaud : chaque requête compare mtime / taille des fichiers
+sources à ceux de l'index (rechargé s'ils ont changé), et une tâche de fond
+fait la même vérification toutes les RELOAD_INTERVAL s pour que le
+rechargement ne soit pas payé par un client. Les index ne sont lus et
+reconstruits que dans un thread dédié : la boucle asyncio n'est jamais
+bloquée par un parsing.
+
+    python scripts/query_server.py
+
+Variables d'environnement :
+  - QUERY_HOST      : adresse d'écoute (défaut 127.0.0.1)
+  - QUERY_PORT      : port (défaut 8765)
+  - RELOAD_INTERVAL : secondes entre deux vérifications des fichiers (défaut 5)
+"""
+
+import asyncio
+import bisect
+import glob
+import gzip
+import hashlib
+import os
+import sys
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "NHL"))
+import jsonio
+import match_query
+import nhl_store
+
+QUERY_HOST = os.environ.get("QUERY_HOST", "127.0.0.1")
+QUERY_PORT = int(os.environ.get("QUERY_PORT", "8765"))
+RELOAD_INTERVAL = float(os.environ.get("RELOAD_INTERVAL", "5"))
+
+GAMES_OF_DAY_FILE = os.path.join("data", "football", "games_of_day_v2.json")
+GAMES_OF_DAY_LEGACY_FILE = os.path.join("data", "football", "games_of_day.json")
+STANDINGS_FILE = os.path.join("data", "football", "standings", "Standings.json")
+NHL_GAMES_OF_DAY_FILE = os.path.join("data", "hockey", "games_of_days_nhl.json")
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+GZIP_MIN_BYTES = 1024
+HEADER_TIMEOUT = 30
+
+# Un seul thread pour les index : pas de verrou, pas de reconstruction en double
+_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query-index")
+_datasets = {}   # nom → {"signature", "data"}
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# ===============================================================
+# DONNÉES (rechargées quand leurs fichiers changent)
+# ===============================================================
+
+def _signature(paths):
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((path, st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+def _games_of_day_paths():
+    return [GAMES_OF_DAY_FILE if os.path.exists(GAMES_OF_DAY_FILE) else GAMES_OF_DAY_LEGACY_FILE]
+
+
+def _games_of_day(paths):
+    raw = jsonio.load(paths[0], default=None)
+    if isinstance(raw, list):           # ancien format : liste de matchs
+        raw = {"date": None, "standings": {}, "games": raw}
+    raw = raw or {"date": None, "standings": {}, "games": []}
+    games = sorted(raw.get("games", []), key=lambda g: (g.get("date") or "", g.get("time_ci") or ""))
+    return {
+        "date": raw.get("date"),
+        "generated_at": raw.get("generated_at"),
+        "standings": raw.get("standings") or {},
+        "games": games,
+        "by_id": {str(g.get("gameId")): g for g in games},
+        "by_league": _group(games, lambda g: g.get("league")),
+    }
+
+
+def _standings(paths):
+    return jsonio.load(paths[0], default={}) or {}
+
+
+def _nhl_paths():
+    partitions = sorted(glob.glob(os.path.join(nhl_store.STORE_DIR, "*", "*.json")))
+    return partitions or [nhl_store.LEGACY_FILE]
+
+
+def _nhl_games(paths):
+    games = []
+    for path in paths:
+        games.extend(jsonio.load(path, default=[]) or [])
+    games.sort(key=lambda g: (g.get("date") or "", g.get("game_id") or ""))
+    teams = {}
+    for g in games:
+        for side in ("home_team", "away_team"):
+            team = g.get(side) or {}
+            for key in (team.get("short"), team.get("name")):
+                if key:
+                    teams.setdefault(key.lower(), []).append(g)
+    return {"games": games, "dates": [g.get("date") or "" for g in games], "teams": teams}
+
+
+def _nhl_games_of_day(paths):
+    return jsonio.load(paths[0], default={}) or {}
+
+
+def _group(items, key):
+    groups = {}
+    for item in items:
+        groups.setdefault(key(item), []).append(item)
+    return groups
+
+
+# nom → (fonction qui liste les fichiers sources, chargeur)
+DATASETS = {
+    "games_of_day": (_games_of_day_paths, _games_of_day),
+    "standings": (lambda: [STANDINGS_FILE], _standings),
+    "nhl_games": (_nhl_paths, _nhl_games),
+    "nhl_games_of_day": (lambda: [NHL_GAMES_OF_DAY_FILE], _nhl_games_of_day),
+}
+
+
+def dataset(name):
+    """Données indexées de `name`, rechargées si un fichier source a changé."""
+    list_paths, loader = DATASETS[name]
+    paths = list_paths()
+    signature = _signature(paths)
+    entry = _datasets.get(name)
+    if entry is None or entry["signature"] != signature:
+        entry = _datasets[name] = {"signature": signature, "data": loader(paths)}
+        print(f"🔄 {name} chargé ({len(paths)} fichier(s))")
+    return entry["data"]
+
+
+def refresh_all():
+    for name in DATASETS:
+        dataset(name)
+    match_query.refresh()
+
+
+# ===============================================================
+# ENDPOINTS
+# ===============================================================
+
+def _int_param(params, name, default, maximum=None):
+    try:
+        value = int(params.get(name, default))
+    except (TypeError, ValueError):
+        raise HttpError(400, f"paramètre {name} invalide")
+    if value < 0:
+        raise HttpError(400, f"paramètre {name} invalide")
+    return min(value, maximum) if maximum is not None else value
+
+
+def paginate(items, params, newest_first=True):
+    """Enveloppe paginée ; `items` est trié du plus ancien au plus récent."""
+    limit = _int_param(params, "limit", DEFAULT_LIMIT, MAX_LIMIT)
+    offset = _int_param(params, "offset", 0)
+    if newest_first:
+        end = len(items) - offset
+        page = items[max(0, end - limit):max(0, end)][::-1]
+    else:
+        page = items[offset:offset + limit]
+    return {"total": len(items), "offset": offset, "limit": limit, "items": page}
+
+
+def games_of_day_list(params):
+    data = dataset("games_of_day")
+    games = data["by_league"].get(params["league"], []) if params.get("league") else data["games"]
+    return {"date": data["date"], "generated_at": data["generated_at"],
+            **paginate(games, params, newest_first=False)}
+
+
+def _table_rows(table):
+    """
+    Lignes d'un classement de la section "standings" ; une entrée par phase
+    (regular_season / playoffs, apertura / clausura) → phase la plus avancée
+    qui a des lignes.
+    """
+    if not table:
+        return None
+    if "standings" in table:
+        return table["standings"]
+    phases = [p for p in table.values() if isinstance(p, dict) and p.get("standings")]
+    return max(phases, key=lambda p: p.get("partie") or 0)["standings"] if phases else None
+
+
+def games_of_day_one(params, game_id):
+    data = dataset("games_of_day")
+    game = data["by_id"].get(game_id)
+    if game is None:
+        raise HttpError(404, f"match {game_id} absent des matchs du jour")
+    ref = game.get("standings_ref")
+    standings = _table_rows(data["standings"].get(ref)) if ref else None
+    return {**game, "standings": standings}
+
+
+def standings_index(params):
+    return {league: sorted(seasons, reverse=True) for league, seasons in dataset("standings").items()}
+
+
+def standings_one(params, league, season=None):
+    seasons = dataset("standings").get(league)
+    if not seasons:
+        raise HttpError(404, f"ligue inconnue : {league}")
+    season = season or max(seasons, key=lambda s: int(s) if s.isdigit() else 0)
+    if season not in seasons:
+        raise HttpError(404, f"saison {season} absente pour {league}")
+    return {"league": league, "season": season, **seasons[season]}
+
+
+def team_matches(params, team):
+    matches = match_query.team_matches(team, since=params.get("since"), until=params.get("until"),
+                                       league=params.get("league"))
+    return {"team": team, **paginate(matches, params)}
+
+
+def league_matches(params, league):
+    try:
+        matches = match_query.league_matches(league, since=params.get("since"), until=params.get("until"))
+    except ValueError as e:
+        raise HttpError(404, str(e))
+    return {"league": league, **paginate(matches, params)}
+
+
+def h2h(params, team_a, team_b):
+    matches = match_query.head_to_head(team_a, team_b, before=params.get("before"))
+    return {"teams": [team_a, team_b], **paginate(matches[::-1], params)}
+
+
+def nhl_games_of_day(params):
+    return dataset("nhl_games_of_day")
+
+
+def nhl_games(params):
+    data = dataset("nhl_games")
+    games, dates = data["games"], data["dates"]
+    if params.get("team"):
+        games = data["teams"].get(params["team"].lower(), [])
+        dates = [g.get("date") or "" for g in games]
+    since = params.get("date") or params.get("since")
+    until = params.get("date") or params.get("until")
+    lo = bisect.bisect_left(dates, since) if since else 0
+    hi = bisect.bisect_right(dates, until) if until else len(dates)
+    return paginate(games[lo:hi], params)
+
+
+ROUTES = [
+    (("health",), lambda params: {"status": "ok"}),
+    (("games-of-day",), games_of_day_list),
+    (("games-of-day", None), games_of_day_one),
+    (("standings",), standings_index),
+    (("standings", None), standings_one),
+    (("standings", None, None), standings_one),
+    (("teams", None, "matches"), team_matches),
+    (("leagues", None, "matches"), league_matches),
+    (("h2h", None, None), h2h),
+    (("nhl", "games-of-day"), nhl_games_of_day),
+    (("nhl", "games"), nhl_games),
+]
+
+
+def route(path, params):
+    """Résultat (objet JSON) de la requête ; None dans un motif = segment variable."""
+    parts = [urllib.parse.unquote(p) for p in path.strip("/").split("/") if p]
+    for pattern, handler in ROUTES:
+        if len(pattern) == len(parts) and all(p is None or p == s for p, s in zip(pattern, parts)):
+            return handler(params, *[s for p, s in zip(pattern, parts) if p is None])
+    raise HttpError(404, f"route inconnue : /{'/'.join(parts)}")
+
+
+def render(target):
+    """(statut, corps JSON, etag) pour une cible "/chemin?requête" (dans le thread des index)."""
+    url = urllib.parse.urlsplit(target)
+    params = dict(urllib.parse.parse_qsl(url.query))
+    try:
+        status, payload = 200, route(url.path, params)
+    except HttpError as e:
+        status, payload = e.status, {"error": e.message}
+    except Exception as e:
+        print(f"❌ {target} : {e}")
+        status, payload = 500, {"error": "erreur interne"}
+    body = jsonio.dumps(payload, pretty=False)
+    etag = f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+    return status, body, etag
+
+
+# ===============================================================
+# HTTP (asyncio)
+# ===============================================================
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+async def _read_request(reader):
+    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), HEADER_TIMEOUT)
+    lines = head.decode("latin-1").split("\r\n")
+    method, target, version = lines[0].split(" ", 2)
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+def _response(status, headers, body=b""):
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    headers = {**headers, "Content-Length": str(len(body))}
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+async def handle(reader, writer):
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                method, target, version, headers = await _read_request(reader)
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                break
+            except ValueError:
+                writer.write(_response(400, {"Connection": "close"}))
+                break
+
+            keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+            common = {"Connection": "keep-alive" if keep_alive else "close"}
+            if method not in ("GET", "HEAD"):
+                writer.write(_response(405, {**common, "Allow": "GET, HEAD"}))
+            else:
+                status, body, etag = await loop.run_in_executor(_worker, render, target)
+                common.update({"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"})
+                if status == 200 and etag in [t.strip() for t in headers.get("if-none-match", "").split(",")]:
+                    writer.write(_response(304, common))
+                else:
+                    common["Content-Type"] = "application/json; charset=utf-8"
+                    if len(body) >= GZIP_MIN_BYTES and "gzip" in headers.get("accept-encoding", ""):
+                        body = gzip.compress(body, compresslevel=5)
+                        common["Content-Encoding"] = "gzip"
+                    response = _response(status, common, body)
+                    if method == "HEAD":
+                        response = response[:len(response) - len(body)]
+                    writer.write(response)
+                print(f"   {method} {target} → {status}")
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+
+async def _reload_loop():
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(RELOAD_INTERVAL)
+        try:
+            await loop.run_in_executor(_worker, refresh_all)
+        except Exception as e:
+            print(f"⚠️ Rechargement : {e}")
+
+
+async def serve(host=QUERY_HOST, port=QUERY_PORT):
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_worker, refresh_all)
+    server = await asyncio.start_server(handle, host, port)
+    print(f"🌐 Service de requêtes : http://{host}:{port}/ (rechargement toutes les {RELOAD_INTERVAL:g} s)")
+    reloader = asyncio.create_task(_reload_loop())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        reloader.cancel()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\n👋 Service arrêté")
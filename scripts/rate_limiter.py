@@ -0,0 +1,206 @@
+"""
+Limiteur de débit adaptatif, partagé par tous les threads et processus.
+
+Un seau à jetons par hôte (www.espn.com, site.api.espn.com…), dont l'état
+est stocké dans .cache/rate_limiter/<hôte>.json et protégé par un verrou
+fcntl : plusieurs scripts lancés en parallèle sur la même machine (shards,
+MaJ NHL + games_of_day…) se partagent le même budget.
+
+    rate_limiter.acquire(host)                 # bloque jusqu'au prochain jeton
+                                               # (host : nom d'hôte ou URL complète)
+    wait = rate_limiter.reserve(host)          # variante non bloquante (asyncio)
+    rate_limiter.report(host, latency=1.2, status=200)
+
+Ajustement AIMD à partir des réponses observées :
+  - succès avec latence correcte   → débit + step (additif)
+  - latence moyenne > 2 × cible     → débit × 0.9
+  - erreur réseau / HTTP 5xx        → débit × 0.8
+  - HTTP 429 / page de blocage      → débit × 0.5 et pause de l'hôte
+                                      (Retry-After, sinon BAN_COOLDOWN s,
+                                      doublée à chaque blocage consécutif)
+
+Variables d'environnement :
+  - RATE_LIMIT       : on (défaut) | off
+  - RATE_LIMIT_SCALE : multiplicateur des débits de départ et maximum (défaut 1)
+  - RATE_LIMIT_DIR   : dossier d'état partagé (défaut .cache/rate_limiter)
+"""
+
+import os
+import re
+import threading
+import time
+import urllib.parse
+
+import instrumentation
+import jsonio
+
+try:
+    import fcntl
+except ImportError:   # Windows : verrou limité au processus
+    fcntl = None
+
+RATE_LIMIT = os.environ.get("RATE_LIMIT", "on").strip().lower() != "off"
+RATE_LIMIT_SCALE = float(os.environ.get("RATE_LIMIT_SCALE", "1"))
+RATE_LIMIT_DIR = os.environ.get("RATE_LIMIT_DIR", os.path.join(".cache", "rate_limiter"))
+
+# rate / max_rate en requêtes par seconde ; latency_target en secondes
+HOST_BUDGETS = {
+    "www.espn.com": {"rate": 0.5, "min_rate": 0.1, "max_rate": 4.0, "burst": 2, "step": 0.05, "latency_target": 6.0},
+    "site.api.espn.com": {"rate": 3.0, "min_rate": 0.5, "max_rate": 8.0, "burst": 5, "step": 0.1, "latency_target": 1.5},
+}
+DEFAULT_BUDGET = {"rate": 1.0, "min_rate": 0.2, "max_rate": 4.0, "burst": 3, "step": 0.05, "latency_target": 3.0}
+
+BAN_COOLDOWN = 60.0
+MAX_COOLDOWN = 15 * 60.0
+
+# Pages servies à la place du contenu quand ESPN / le CDN bloque
+BLOCK_MARKERS = re.compile(
+    r"access denied|too many requests|request blocked|are you a robot|captcha|403 forbidden",
+    re.IGNORECASE,
+)
+
+_thread_lock = threading.Lock()
+
+
+# ===============================================================
+# ÉTAT PARTAGÉ
+# ===============================================================
+
+def host_of(host_or_url):
+    if "://" in (host_or_url or ""):
+        return urllib.parse.urlsplit(host_or_url).netloc
+    return host_or_url
+
+
+def budget(host):
+    b = dict(HOST_BUDGETS.get(host, DEFAULT_BUDGET))
+    b["rate"] *= RATE_LIMIT_SCALE
+    b["max_rate"] *= RATE_LIMIT_SCALE
+    return b
+
+
+def _state_path(host):
+    return os.path.join(RATE_LIMIT_DIR, re.sub(r"[^A-Za-z0-9_.-]", "_", host or "default") + ".json")
+
+
+class _LockedState:
+    """Contexte : lit l'état de l'hôte sous verrou exclusif et le réécrit à la sortie."""
+
+    def __init__(self, host):
+        self.host = host
+        self.path = _state_path(host)
+
+    def __enter__(self):
+        _thread_lock.acquire()
+        os.makedirs(RATE_LIMIT_DIR, exist_ok=True)
+        self.f = open(self.path, "a+b")
+        if fcntl:
+            fcntl.flock(self.f.fileno(), fcntl.LOCK_EX)
+        self.f.seek(0)
+        raw = self.f.read()
+        try:
+            self.state = jsonio.loads(raw) if raw else {}
+        except ValueError:
+            self.state = {}
+        b = budget(self.host)
+        self.state.setdefault("rate", b["rate"])
+        self.state.setdefault("tat", 0.0)            # instant théorique du prochain jeton
+        self.state.setdefault("cooldown_until", 0.0)
+        self.state.setdefault("strikes", 0)          # blocages consécutifs
+        self.state.setdefault("latency_ewma", None)
+        return self.state
+
+    def __exit__(self, *exc):
+        try:
+            self.f.seek(0)
+            self.f.truncate()
+            self.f.write(jsonio.dumps(self.state, pretty=False))
+            self.f.flush()
+        finally:
+            if fcntl:
+                fcntl.flock(self.f.fileno(), fcntl.LOCK_UN)
+            self.f.close()
+            _thread_lock.release()
+        return False
+
+
+# ===============================================================
+# JETONS
+# ===============================================================
+
+def reserve(host):
+    """
+    Réserve le prochain jeton de `host` et retourne le temps d'attente (s)
+    avant de pouvoir émettre la requête (GCRA : `burst` requêtes immédiates,
+    puis une toutes les 1/rate secondes).
+    """
+    if not RATE_LIMIT:
+        return 0.0
+    host = host_of(host)
+    b = budget(host)
+    now = time.time()
+    with _LockedState(host) as state:
+        interval = 1.0 / state["rate"]
+        tat = max(state["tat"], now, state["cooldown_until"])
+        wait = max(0.0, tat - interval * (b["burst"] - 1) - now, state["cooldown_until"] - now)
+        state["tat"] = tat + interval
+    return wait
+
+
+def acquire(host):
+    """Attend le jeton suivant pour `host` (bloquant)."""
+    wait = reserve(host)
+    if wait > 0:
+        instrumentation.incr("rate_waits")
+        with instrumentation.timer("rate_wait"):
+            time.sleep(wait)
+    return wait
+
+
+# ===============================================================
+# RETOUR D'EXPÉRIENCE (AIMD)
+# ===============================================================
+
+def report(host, latency=None, status=None, error=False, retry_after=None, blocked=False):
+    """Ajuste le débit de `host` d'après une réponse (ou une erreur) observée."""
+    if not RATE_LIMIT:
+        return
+    host = host_of(host)
+    b = budget(host)
+    now = time.time()
+    with _LockedState(host) as state:
+        rate = state["rate"]
+        if blocked or status == 429:
+            state["strikes"] += 1
+            cooldown = retry_after or min(MAX_COOLDOWN, BAN_COOLDOWN * 2 ** (state["strikes"] - 1))
+            state["cooldown_until"] = max(state["cooldown_until"], now + cooldown)
+            rate *= 0.5
+            instrumentation.incr("rate_limited")
+            print(f"🚦 {host} : limitation détectée ({status or 'page de blocage'}) — "
+                  f"pause {cooldown:.0f}s, débit {rate:.2f} req/s")
+        elif error or (status is not None and status >= 500):
+            rate *= 0.8
+            instrumentation.incr("rate_errors")
+        else:
+            state["strikes"] = 0
+            if latency is not None:
+                ewma = state["latency_ewma"]
+                state["latency_ewma"] = latency if ewma is None else 0.8 * ewma + 0.2 * latency
+            if state["latency_ewma"] is not None and state["latency_ewma"] > 2 * b["latency_target"]:
+                rate *= 0.9
+            else:
+                rate += b["step"]
+        state["rate"] = min(b["max_rate"], max(b["min_rate"], rate))
+    instrumentation.note("rate_limiter", host, round(state["rate"], 3))
+
+
+def looks_blocked(text):
+    """True si un titre / début de page ressemble à une page de blocage."""
+    return bool(text) and bool(BLOCK_MARKERS.search(text[:5000]))
+
+
+def parse_retry_after(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
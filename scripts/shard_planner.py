@@ -0,0 +1,240 @@
+"""
+Découpage de Teams_tracker.py en N shards parallèles de durée comparable.
+
+Le coût d'une ligue est estimé à partir du store existant (data_teams.json)
+et du registre des équipes, en nombre de pages ESPN pondérées :
+
+  - équipe jamais trackée : une page résultats par saison START..END,
+    un enrichissement par match attendu (matchs par saison de la ligue),
+    une page fixtures
+  - équipe trackée sans match joué depuis son scraping : rien (ignorée,
+    voir update_planner)
+  - équipe trackée à mettre à jour : une page résultats (saison en cours), un
+    enrichissement par nouveau match attendu depuis son scraped_at
+    (cadence observée sur ses 365 derniers jours), une page fixtures
+
+Les enrichissements sont pondérés par MATCH_SHARE (un match entre deux
+équipes de la ligue n'est visité qu'une fois). En RESULTS_CRAWL=league, les
+pages résultats par équipe sont remplacées par les requêtes scoreboard du
+championnat (par ligue et par saison) et une requête calendrier JSON par
+équipe et par saison (SECONDS_PER_SCOREBOARD).
+
+Les ligues sont réparties par LPT (plus coûteuse d'abord, dans le shard le
+moins chargé), ce qui borne l'écart au shard idéal à 4/3.
+
+CLI :
+    python scripts/shard_planner.py plan 4 [plan.json]   # plan + matrice GitHub
+    python scripts/shard_planner.py merge shards/*.json  # fusion → data_teams.json
+
+Chaque worker tourne avec LEAGUE_INDEXES="<index du shard>" et
+SHARD_OUTPUT=<fichier> ; merge applique les équipes des shards sur
+data_teams.json (une équipe présente dans deux shards : la plus récente
+gagne, signalé en console).
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+import jsonio
+import team_registry
+import Teams_tracker
+import update_planner
+import views
+
+# Secondes par page (ordre de grandeur mesuré dans les run_reports :
+# timers team_results / enrich / next_game_chain)
+SECONDS_PER_RESULTS_PAGE = 8.0
+SECONDS_PER_MATCH_PAGE = 6.0
+SECONDS_PER_FIXTURES_PAGE = 8.0
+SECONDS_PER_SCOREBOARD = 2.0
+DEFAULT_MATCHES_PER_SEASON = 40
+# Un match de championnat oppose deux équipes de la même ligue et n'est
+# enrichi qu'une fois : part moyenne d'enrichissement imputée à chaque équipe.
+MATCH_SHARE = 0.6
+
+PLAN_FILE = os.path.join(".cache", "shard_plan.json")
+
+
+# ===============================================================
+# ESTIMATION DU COÛT
+# ===============================================================
+
+def _parse_dt(value):
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _all_matches(team_entry):
+    return Teams_tracker.flatten_existing_matches(team_entry)
+
+
+def _matches_per_season(entries):
+    """Nombre moyen de matchs par saison observé sur des équipes trackées."""
+    counts = [
+        len(season_matches)
+        for entry in entries
+        for season_matches in entry.get("matches_by_season", {}).values()
+        if season_matches
+    ]
+    return sum(counts) / len(counts) if counts else DEFAULT_MATCHES_PER_SEASON
+
+
+def _expected_new_matches(entry, now):
+    """Nouveaux matchs attendus depuis le dernier scraping de l'équipe."""
+    scraped_at = _parse_dt(entry.get("scraped_at"))
+    if scraped_at is None:
+        return DEFAULT_MATCHES_PER_SEASON / 4
+    year_ago = (now - timedelta(days=365)).date().isoformat()
+    recent = [m for m in _all_matches(entry) if (m.get("date") or "") >= year_ago]
+    days = max(0.0, (now - scraped_at).total_seconds() / 86400)
+    return len(recent) / 365 * days
+
+
+def team_cost(entry, matches_per_season, now):
+    """Coût estimé (secondes) d'une équipe ; entry=None si jamais trackée."""
+    if not update_planner.decide(entry, now)[0]:
+        return 0.0
+    results_page = SECONDS_PER_RESULTS_PAGE if Teams_tracker.RESULTS_CRAWL == "team" else SECONDS_PER_SCOREBOARD
+    if entry is None:
+        seasons = Teams_tracker.END_SEASON - Teams_tracker.START_SEASON + 1
+        return (seasons * results_page
+                + seasons * matches_per_season * MATCH_SHARE * SECONDS_PER_MATCH_PAGE
+                + SECONDS_PER_FIXTURES_PAGE)
+    return (results_page
+            + _expected_new_matches(entry, now) * MATCH_SHARE * SECONDS_PER_MATCH_PAGE
+            + SECONDS_PER_FIXTURES_PAGE)
+
+
+def league_crawl_cost(untracked):
+    """Requêtes scoreboard du championnat d'une ligue en mode league."""
+    if Teams_tracker.RESULTS_CRAWL != "league":
+        return 0.0
+    seasons = Teams_tracker.END_SEASON - Teams_tracker.START_SEASON + 1 if untracked else 1
+    return seasons * 2 * SECONDS_PER_SCOREBOARD
+
+
+def league_costs(now=None):
+    """[{index, country, league_name, teams, untracked, cost}] dans l'ordre du registre."""
+    now = now or datetime.now()
+    existing = Teams_tracker.load_existing_data()
+    costs = []
+    for index, league in enumerate(team_registry.leagues(), 1):
+        teams = team_registry.teams_for_league(league["league_name"], league["country"])
+        entries = [existing.get(t.get("team_id")) for t in teams]
+        tracked = [e for e in entries if e is not None]
+        per_season = _matches_per_season(tracked)
+        cost = sum(team_cost(e, per_season, now) for e in entries)
+        if any(update_planner.decide(e, now)[0] for e in entries):
+            cost += league_crawl_cost(len(entries) > len(tracked))
+        costs.append({
+            "index": index,
+            "country": league["country"],
+            "league_name": league["league_name"],
+            "teams": len(teams),
+            "untracked": len(entries) - len(tracked),
+            "cost": round(cost, 1),
+        })
+    return costs
+
+
+# ===============================================================
+# RÉPARTITION
+# ===============================================================
+
+def plan_shards(costs, n_shards):
+    """LPT : ligues triées par coût décroissant, chacune dans le shard le moins chargé."""
+    n_shards = max(1, min(n_shards, len(costs) or 1))
+    shards = [{"shard": i + 1, "cost": 0.0, "leagues": []} for i in range(n_shards)]
+    for league in sorted(costs, key=lambda c: c["cost"], reverse=True):
+        target = min(shards, key=lambda s: s["cost"])
+        target["leagues"].append(league)
+        target["cost"] += league["cost"]
+    for shard in shards:
+        shard["leagues"].sort(key=lambda lg: lg["index"])
+        shard["league_indexes"] = ",".join(str(lg["index"]) for lg in shard["leagues"])
+        shard["cost"] = round(shard["cost"], 1)
+    return [s for s in shards if s["leagues"]]
+
+
+def write_plan(shards, path=PLAN_FILE):
+    jsonio.dump(path, {"generated_at": datetime.now().isoformat(), "shards": shards})
+
+    # Matrice pour un job GitHub Actions (strategy.matrix.include)
+    matrix = {"include": [{"shard": s["shard"], "league_indexes": s["league_indexes"]} for s in shards]}
+    github_output = os.environ.get("GITHUB_OUTPUT")
+    if github_output:
+        with open(github_output, "a", encoding="utf-8") as f:
+            f.write(f"matrix={jsonio.dumps(matrix, pretty=False).decode('utf-8')}\n")
+    return matrix
+
+
+def print_plan(shards):
+    total = sum(s["cost"] for s in shards)
+    print(f"\n🧮 {len(shards)} shard(s), coût total estimé {total / 60:.0f} min")
+    for s in shards:
+        print(f"   [shard {s['shard']}] {s['cost'] / 60:6.1f} min — {len(s['leagues'])} ligue(s) : {s['league_indexes']}")
+        for lg in s["leagues"]:
+            print(f"      [{lg['index']}] {lg['country']} — {lg['league_name']} "
+                  f"({lg['teams']} équipes, {lg['untracked']} non trackées, {lg['cost'] / 60:.1f} min)")
+    if shards:
+        print(f"   ⏱️ plus long shard : {max(s['cost'] for s in shards) / 60:.1f} min "
+              f"(idéal {total / len(shards) / 60:.1f} min)")
+
+
+# ===============================================================
+# FUSION
+# ===============================================================
+
+def merge(shard_paths, output_path=Teams_tracker.OUTPUT_JSON_PATH):
+    """Applique les équipes des shards sur data_teams.json (par team_id)."""
+    teams_by_id = Teams_tracker.load_existing_data()
+    source_by_id = {}
+
+    for path in shard_paths:
+        shard = jsonio.load(path)
+        print(f"📥 {path} ({shard.get('selection')}) : {len(shard.get('teams', []))} équipe(s)")
+        for team in shard.get("teams", []):
+            tid = team.get("team_id")
+            if not tid:
+                continue
+            if tid in source_by_id:
+                previous = teams_by_id[tid]
+                print(f"   ⚠️ {team.get('team_name')} (id={tid}) présente dans {source_by_id[tid]} et {path} "
+                      f"— la plus récente est gardée")
+                if (team.get("scraped_at") or "") < (previous.get("scraped_at") or ""):
+                    continue
+            teams_by_id[tid] = team
+            source_by_id[tid] = path
+
+    updated = len(source_by_id)
+
+    output_data = list(teams_by_id.values())
+    jsonio.dump(output_path, {
+        "leagues_processed": Teams_tracker.build_leagues_processed_from_output(output_data),
+        "nb_teams": len(output_data),
+        "scraped_at": datetime.now().isoformat(),
+        "teams": output_data,
+    })
+    print(f"💾 {output_path} : {updated} équipe(s) mise(s) à jour, {len(output_data)} au total")
+    views.write_views(output_data, source_by_id)
+    return updated
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "plan"
+    if command == "plan":
+        n = int(sys.argv[2]) if len(sys.argv) > 2 else int(os.environ.get("SHARDS", "4"))
+        shards = plan_shards(league_costs(), n)
+        print_plan(shards)
+        write_plan(shards, sys.argv[3] if len(sys.argv) > 3 else PLAN_FILE)
+    elif command == "merge":
+        if len(sys.argv) < 3:
+            print("Usage : python scripts/shard_planner.py merge shard1.json [shard2.json ...]")
+            sys.exit(1)
+        merge(sys.argv[2:])
+    else:
+        print("Usage : python scripts/shard_planner.py plan N | merge fichiers...")
+        sys.exit(1)
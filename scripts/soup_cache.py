@@ -0,0 +1,124 @@
+"""
+Cache LRU borné (en mémoire, le temps d'un run) des documents HTML parsés
+et des champs extraits de chaque document.
+
+Clé = page_key(gameId, état) : un document par état de la page ("today" :
+page du match du jour, "away" : onglet away des derniers matchs, "past" :
+page d'un match terminé). Deux états d'une même page ne partagent ni
+document ni champs.
+
+  - soup(key, html)              → BeautifulSoup parsé une seule fois par clé
+  - field(key, name, fn, *args)  → fn(*args) calculé une seule fois par (clé, champ)
+  - forget(game_id)              → oublie documents et champs de tous les états
+                                   du gameId (page rechargée)
+
+Bornes (variables d'environnement) :
+  - SOUP_CACHE_ENTRIES : nombre max de documents parsés gardés (défaut 32)
+  - SOUP_CACHE_MB      : mémoire estimée max des documents parsés (défaut 256)
+  - FIELD_CACHE_ENTRIES: nombre max de champs extraits gardés (défaut 20000)
+
+Un arbre BeautifulSoup pèse environ SOUP_SIZE_FACTOR fois la taille du HTML
+source : c'est cette estimation qui est comparée à SOUP_CACHE_MB.
+"""
+
+import os
+from collections import OrderedDict
+
+import html_parser
+import instrumentation
+
+SOUP_CACHE_ENTRIES  = int(os.environ.get("SOUP_CACHE_ENTRIES", "32"))
+SOUP_CACHE_MB       = float(os.environ.get("SOUP_CACHE_MB", "256"))
+FIELD_CACHE_ENTRIES = int(os.environ.get("FIELD_CACHE_ENTRIES", "20000"))
+SOUP_SIZE_FACTOR    = 10
+
+_soups  = OrderedDict()   # key → (soup, octets estimés)
+_fields = OrderedDict()   # (key, name, args) → valeur
+_state  = {"bytes": 0}
+
+
+# ===============================================================
+# DOCUMENTS PARSÉS
+# ===============================================================
+
+def page_key(game_id, state):
+    """Clé d'un état de page : "123:today", "123:away", "123:past"."""
+    return f"{game_id}:{state}"
+
+
+def _of_game(key, game_id):
+    return str(key).split(":", 1)[0] == str(game_id)
+
+
+def _evict_soups():
+    max_bytes = SOUP_CACHE_MB * 1024 * 1024
+    while _soups and (len(_soups) > SOUP_CACHE_ENTRIES or _state["bytes"] > max_bytes):
+        _, (_, size) = _soups.popitem(last=False)
+        _state["bytes"] -= size
+        instrumentation.incr("soup_cache_evictions")
+
+
+def soup(key, html):
+    """
+    Retourne le document parsé pour `key`. `html` (str ou callable sans
+    argument, ex. lambda: driver.page_source) n'est lu qu'en cas d'absence.
+    """
+    if key in _soups:
+        _soups.move_to_end(key)
+        instrumentation.incr("cache_hits")
+        return _soups[key][0]
+
+    instrumentation.incr("cache_misses")
+    if callable(html):
+        html = html()
+    parsed = html_parser.parse(html)
+
+    size = len(html) * SOUP_SIZE_FACTOR
+    _soups[key] = (parsed, size)
+    _state["bytes"] += size
+    _evict_soups()
+    return parsed
+
+
+def forget(game_id):
+    """
+    Retire documents et champs extraits de tous les états de `game_id`
+    (la page a été rechargée : rien de l'ancien état ne doit être servi).
+    """
+    for key in [k for k in _soups if _of_game(k, game_id)]:
+        _state["bytes"] -= _soups.pop(key)[1]
+    for cache_key in [k for k in _fields if _of_game(k[0], game_id)]:
+        del _fields[cache_key]
+
+
+# ===============================================================
+# CHAMPS EXTRAITS
+# ===============================================================
+
+def field(key, name, fn, *args):
+    """
+    Retourne fn(*args), calculé une seule fois par (key, name, args scalaires).
+    Les objets (soup, driver) ne font pas partie de la clé. Les champs
+    survivent à l'éviction du document dont ils sont extraits.
+    """
+    cache_key = (key, name, tuple(a for a in args if a is None or isinstance(a, (str, int, float))))
+    if cache_key in _fields:
+        _fields.move_to_end(cache_key)
+        instrumentation.incr("cache_hits")
+        return _fields[cache_key]
+
+    instrumentation.incr("cache_misses")
+    value = fn(*args)
+    _fields[cache_key] = value
+    while len(_fields) > FIELD_CACHE_ENTRIES:
+        _fields.popitem(last=False)
+    return value
+
+
+def stats():
+    """Taille courante du cache (pour le rapport de run)."""
+    return {
+        "soups":   len(_soups),
+        "soup_mb": round(_state["bytes"] / (1024 * 1024), 1),
+        "fields":  len(_fields),
+    }
@@ -1,14 +1,17 @@
-import json
 import os
-import time
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+import chrome_startup
+import fetch_backend
+import instrumentation
+import jsonio
+import lean_browser
 
 LEAGUES = {
     "England_Premier_League": "eng.1",
@@ -46,7 +49,7 @@ LEAGUES = {
 # Paramètres de scraping multi-saisons
 # ──────────────────────────────────────────────────────────────────────────────
 START_SEASON = 2023
-CURRENT_YEAR = datetime.now().year
+CURRENT_YEAR = fetch_backend.run_datetime().year
 
 
 def get_historical_seasons(active_season: int) -> list:
@@ -272,6 +275,15 @@ LEAGUE_ZONES = {
 BASE_DIR = "data/football/standings"
 os.makedirs(BASE_DIR, exist_ok=True)
 OUTPUT_FILE = os.path.join(BASE_DIR, "Standings.json")
+# Horodatage du dernier classement scrapé par ligue (+ dernier résultat vu)
+STATE_FILE = os.path.join(BASE_DIR, "standings_state.json")
+
+# ── Rafraîchissement : seulement les ligues avec des matchs joués depuis ──
+# STANDINGS_REFRESH=full   → toutes les ligues re-scrapées (comportement historique)
+# STANDINGS_MAX_AGE_DAYS=N → une ligue est re-scrapée au moins tous les N jours
+STANDINGS_REFRESH = os.environ.get("STANDINGS_REFRESH", "auto").strip().lower()
+STANDINGS_MAX_AGE_DAYS = int(os.environ.get("STANDINGS_MAX_AGE_DAYS", "7"))
+SCOREBOARD_URL = "https://site.api.espn.com/apis/site/v2/sports/soccer/{league_id}/scoreboard"
 
 
 def get_position_zone(league_name: str, position: int) -> dict | None:
@@ -285,7 +297,7 @@ def get_position_zone(league_name: str, position: int) -> dict | None:
     return None
 
 
-def setup_driver():
+def _start_chrome():
     chrome_options = Options()
     chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
@@ -302,18 +314,45 @@ def setup_driver():
         "Chrome/120.0.0.0 Safari/537.36"
     )
     chrome_options.add_argument(f"user-agent={user_agent}")
-    service = Service(ChromeDriverManager().install())
+    lean_browser.apply_options(chrome_options)
+    chrome_startup.apply_options(chrome_options, "standings")
+    service = chrome_startup.service(chrome_options)
     driver = webdriver.Chrome(service=service, options=chrome_options)
     return driver
 
 
+def setup_driver():
+    return fetch_backend.open_driver(_start_chrome)
+
+
+# Un seul Chrome pour tout le run (auparavant : un lancement par URL)
+_driver = {"instance": None}
+
+
+def shared_driver():
+    if _driver["instance"] is None:
+        with instrumentation.timer("driver_startup"):
+            _driver["instance"] = setup_driver()
+    return _driver["instance"]
+
+
+def close_driver():
+    """Ferme le driver partagé ; le prochain classement en relancera un."""
+    if _driver["instance"] is not None:
+        try:
+            _driver["instance"].quit()
+        except WebDriverException:
+            pass
+        _driver["instance"] = None
+
+
 def _is_subheader_row(row) -> bool:
     classes = row.get_attribute("class") or ""
     return "subgroup-headers" in classes or "Table__sub-header" in classes
 
 
 def fetch_standings_from_url(url: str) -> list:
-    driver = setup_driver()
+    driver = shared_driver()
     try:
         driver.get(url)
         wait = WebDriverWait(driver, 20)
@@ -357,15 +396,19 @@ def fetch_standings_from_url(url: str) -> list:
     except Exception as e:
         print(f"  Erreur Selenium ({url}) : {e}")
         slug = url.split("/league/")[-1].replace("/", "_")
-        with open(f"debug_{slug}.html", "w", encoding="utf-8") as fh:
-            fh.write(driver.page_source)
+        try:
+            with open(f"debug_{slug}.html", "w", encoding="utf-8") as fh:
+                fh.write(driver.page_source)
+        except WebDriverException:
+            pass
+        # Session Chrome perdue (crash, déconnexion) : relancée à l'URL suivante
+        if isinstance(e, WebDriverException) and not isinstance(e, TimeoutException):
+            close_driver()
         return []
-    finally:
-        driver.quit()
 
 
 def fetch_subgroup_standings(url: str) -> list:
-    driver = setup_driver()
+    driver = shared_driver()
     try:
         driver.get(url)
         wait = WebDriverWait(driver, 20)
@@ -427,11 +470,15 @@ def fetch_subgroup_standings(url: str) -> list:
     except Exception as e:
         print(f"  Erreur Selenium subgroups ({url}) : {e}")
         slug = url.split("/league/")[-1].replace("/", "_")
-        with open(f"debug_{slug}_subgroups.html", "w", encoding="utf-8") as fh:
-            fh.write(driver.page_source)
+        try:
+            with open(f"debug_{slug}_subgroups.html", "w", encoding="utf-8") as fh:
+                fh.write(driver.page_source)
+        except WebDriverException:
+            pass
+        # Session Chrome perdue (crash, déconnexion) : relancée à l'URL suivante
+        if isinstance(e, WebDriverException) and not isinstance(e, TimeoutException):
+            close_driver()
         return []
-    finally:
-        driver.quit()
 
 
 def fetch_standings_with_selenium(league_name: str, league_id: str, season: int) -> list:
@@ -445,13 +492,73 @@ def fetch_standings_with_selenium(league_name: str, league_id: str, season: int)
 def load_existing_data() -> dict:
     if os.path.exists(OUTPUT_FILE):
         try:
-            with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
+            return jsonio.load(OUTPUT_FILE)
+        except (ValueError, IOError) as e:
             print(f"⚠️  Impossible de lire l'ancien fichier : {e}")
     return {}
 
 
+# ===============================================================
+# DÉTECTION DES LIGUES À RAFRAÎCHIR
+# ===============================================================
+
+def _parse_dt(value) -> datetime | None:
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def latest_result(league_id: str, since: datetime, until: datetime) -> str | None:
+    """
+    Coup d'envoi (ISO UTC) du dernier match terminé de la ligue entre
+    `since` et `until`, via une requête scoreboard de l'API ESPN.
+    "" si aucun match terminé ; None si la sonde a échoué.
+    """
+    dates = f"{since:%Y%m%d}-{until:%Y%m%d}"
+    url = f"{SCOREBOARD_URL.format(league_id=league_id)}?dates={dates}&limit=500"
+    try:
+        resp = fetch_backend.http_get(url, timeout=20)
+        data = resp.json() if resp.status_code == 200 else None
+    except Exception as e:
+        print(f"  ⚠️  Sonde scoreboard {league_id} en échec : {e}")
+        return None
+    if not isinstance(data, dict):
+        return None
+    latest = ""
+    for event in data.get("events", []):
+        status = ((event.get("status") or {}).get("type") or {})
+        if status.get("completed") and (event.get("date") or "") > latest:
+            latest = event["date"]
+    return latest
+
+
+def refresh_decision(league_id: str, state: dict, has_data: bool) -> tuple[bool, str, str | None]:
+    """
+    (à_rafraîchir, raison, dernier_résultat) pour une ligue. Raisons :
+    full, never, stale, probe_failed, new_results, unchanged.
+    """
+    if STANDINGS_REFRESH == "full":
+        return True, "full", None
+    scraped_at = _parse_dt(state.get("scraped_at"))
+    if not has_data or scraped_at is None:
+        return True, "never", None
+    now = fetch_backend.run_datetime()
+    if now - scraped_at > timedelta(days=STANDINGS_MAX_AGE_DAYS):
+        return True, "stale", None
+
+    # Fenêtre élargie d'un jour : un match commencé avant le dernier
+    # scraping a pu se terminer après
+    latest = latest_result(league_id, scraped_at - timedelta(days=1), now)
+    if latest is None:
+        return True, "probe_failed", None
+    previous = state.get("last_result") or (scraped_at - timedelta(hours=3)).strftime("%Y-%m-%dT%H:%MZ")
+    if latest and latest > previous:
+        return True, "new_results", latest
+    return False, "unchanged", latest
+
+
 def build_zones_meta(league_name: str) -> list:
     return [
         {
@@ -521,7 +628,6 @@ def scrape_multi_phase_season(league_name: str, phase_config: dict, season: int)
     print(f"  📋 Phase 1 ({phase1_label}) - saison {season}...")
     url_phase1 = f"{phase_config['regular']}/season/{season}"
     phase1_standings = fetch_standings_from_url(url_phase1)
-    time.sleep(2)
 
     result[phase1_label] = {
         "partie": 1,
@@ -539,7 +645,6 @@ def scrape_multi_phase_season(league_name: str, phase_config: dict, season: int)
         phase2_standings = fetch_subgroup_standings(url_phase2)
     else:
         phase2_standings = fetch_standings_from_url(url_phase2)
-    time.sleep(2)
 
     result[phase2_label] = {
         "partie": 2,
@@ -589,7 +694,6 @@ def determine_active_season(
 
     print(f"  ⚠️  Saison {CURRENT_YEAR} vide côté ESPN — la saison active est probablement {CURRENT_YEAR - 1}.")
     fallback_season = CURRENT_YEAR - 1
-    time.sleep(2)
     print(f"  🔁 Re-scraping de la saison {fallback_season} (mise à jour à chaque run)...")
     entry_fallback = scrape_season_entry(league_name, league_id, fallback_season, is_multi_phase, phase_config)
 
@@ -607,19 +711,35 @@ def determine_active_season(
 
 def scrape_all_leagues():
     existing_data = load_existing_data()
+    state = jsonio.load(STATE_FILE, default={})
     all_data = {}
 
     for league_name, league_id in LEAGUES.items():
         try:
-            print(f"🔹 Scraping {league_name}...")
             existing_league_data = existing_data.get(league_name, {})
             is_multi_phase = league_name in MULTI_PHASE_LEAGUES
             phase_config = MULTI_PHASE_LEAGUES.get(league_name)
 
-            # ── Saison active : toujours scrapée en direct à chaque run ────────
-            active_season, active_entry = determine_active_season(
-                league_name, league_id, is_multi_phase, phase_config, existing_league_data
+            # ── Ligue sans match terminé depuis le dernier classement : conservée ─
+            refresh, reason, latest = refresh_decision(
+                league_id, state.get(league_name, {}), bool(existing_league_data)
             )
+            instrumentation.note("standings_refresh", league_name, reason)
+            if not refresh:
+                print(f"⏭️  {league_name} : aucun match terminé depuis le dernier classement — conservé")
+                instrumentation.incr("leagues_unchanged")
+                all_data[league_name] = existing_league_data
+                continue
+
+            print(f"🔹 Scraping {league_name} ({reason})...")
+            scraped_at = fetch_backend.run_datetime()
+
+            # ── Saison active : toujours scrapée en direct à chaque run ────────
+            with instrumentation.timer("active_season"):
+                active_season, active_entry = determine_active_season(
+                    league_name, league_id, is_multi_phase, phase_config, existing_league_data
+                )
+            instrumentation.incr("leagues_scraped")
 
             league_result = {str(active_season): active_entry}
 
@@ -636,11 +756,17 @@ def scrape_all_leagues():
                     continue
 
                 print(f" 📅 Saison historique manquante {season}, scraping...")
-                fresh_entry = scrape_season_entry(league_name, league_id, season, is_multi_phase, phase_config)
-                time.sleep(2)
+                with instrumentation.timer("historical_season"):
+                    fresh_entry = scrape_season_entry(league_name, league_id, season, is_multi_phase, phase_config)
                 league_result[season_key] = fresh_entry if _season_entry_has_standings(fresh_entry, is_multi_phase) else (existing_entry or fresh_entry)
 
             all_data[league_name] = league_result
+            if _season_entry_has_standings(active_entry, is_multi_phase):
+                state[league_name] = {
+                    "scraped_at": scraped_at.isoformat(),
+                    "season": active_season,
+                    "last_result": latest,
+                }
             print(f"✔ {league_name} terminé — saison active : {active_season}\n")
 
         except Exception as e:
@@ -649,10 +775,14 @@ def scrape_all_leagues():
                 print(f"⚠️  Exception — conservation des données précédentes pour {league_name}")
                 all_data[league_name] = existing_data[league_name]
 
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump(all_data, f, indent=4, ensure_ascii=False)
+    jsonio.dump(OUTPUT_FILE, all_data, indent=4)
+    jsonio.dump(STATE_FILE, state, indent=4)
     print(f"\n✅ Tous les classements enregistrés dans {OUTPUT_FILE}")
 
 
 if __name__ == "__main__":
-    scrape_all_leagues()
\ No newline at end of file
+    instrumentation.start_run()
+    try:
+        scrape_all_leagues()
+    finally:
+        close_driver()
\ No newline at end of file
@@ -0,0 +1,240 @@
+"""
+Chargement concurrent de pages dans plusieurs onglets d'un même Chrome.
+
+Un seul processus Chrome, K onglets : chaque onglet reçoit une navigation
+(window.location, non bloquante), puis les onglets sont interrogés à tour
+de rôle ; dès qu'un onglet est prêt (sélecteur attendu présent), la page
+est capturée, l'onglet repart sur l'URL suivante et la page capturée part
+dans la file de parsing (un thread dédié), pendant que les autres onglets
+continuent de charger.
+
+    fetcher = tab_fetcher.TabFetcher(driver)
+    for url, result in fetcher.fetch(urls, ready_selector="div.Gamestrip__Container",
+                                     capture=lambda d, url: d.page_source,
+                                     parse=lambda url, html: ...):
+        ...
+
+Les résultats arrivent dans l'ordre de fin de chargement (pas celui de
+`urls`). `capture(driver, url)` est appelé avec le focus sur l'onglet prêt
+(lectures Selenium, clics…) ; `parse(url, page)`, optionnel, dans le
+thread de parsing (jamais pour une page en échec, qui donne (url, None)).
+
+Les navigations passent par rate_limiter (réservation non bloquante : un
+onglet en attente de jeton n'empêche pas de lire les autres). En
+FETCH_MODE=record / replay, ou avec TABS=1, les pages sont chargées en série
+par le driver (DriverProxy / ReplayDriver) : l'archive reste identique.
+
+Variables d'environnement :
+  - TABS : nombre d'onglets (défaut 4 ; 1 = chargement en série)
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+import fetch_backend
+import instrumentation
+import lean_browser
+import rate_limiter
+
+TABS = max(1, int(os.environ.get("TABS", "4")))
+POLL_INTERVAL = 0.1
+
+# L'ancien document est marqué avant de naviguer : tant que la marque est
+# visible, l'onglet affiche encore la page précédente.
+_NAVIGATE_SCRIPT = "window.__tabFetcherStale = true; window.location.href = arguments[0];"
+_READY_SCRIPT = """
+if (window.__tabFetcherStale || document.readyState === 'loading') return false;
+return !arguments[0] || document.querySelector(arguments[0]) !== null;
+"""
+_LOADED_SCRIPT = "return !window.__tabFetcherStale && document.readyState !== 'loading';"
+
+
+def apply_options(options):
+    """Options Chrome : les onglets en arrière-plan ne sont pas ralentis."""
+    options.add_argument("--disable-background-timer-throttling")
+    options.add_argument("--disable-backgrounding-occluded-windows")
+    options.add_argument("--disable-renderer-backgrounding")
+    return options
+
+
+def _page_source(driver, url):
+    return driver.page_source
+
+
+class _Tab:
+    def __init__(self, handle):
+        self.handle = handle
+        self.url = None
+        self.not_before = 0.0     # jeton du limiteur disponible à cet instant
+        self.started = None       # None : navigation pas encore lancée
+
+
+class TabFetcher:
+    def __init__(self, driver, tabs=None):
+        self.driver = driver
+        self.tabs = TABS if tabs is None else max(1, tabs)
+
+    @property
+    def concurrent(self):
+        return self.tabs > 1 and not fetch_backend.is_replay() and not fetch_backend.is_record()
+
+    def fetch(self, urls, ready_selector=None, timeout=20, capture=None, parse=None):
+        """Génère (url, résultat) pour chaque URL, dans l'ordre de fin de chargement."""
+        urls = list(dict.fromkeys(urls))
+        capture = capture or _page_source
+        if self.concurrent and len(urls) > 1:
+            pages = self._fetch_tabs(urls, ready_selector, timeout, capture)
+        else:
+            pages = self._fetch_serial(urls, ready_selector, timeout, capture)
+
+        if parse is None:
+            yield from pages
+            return
+
+        # File de parsing : un thread parse pendant que les onglets chargent
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pending = deque()
+            for url, page in pages:
+                pending.append((url, pool.submit(_safe_parse, parse, url, page)))
+                while pending and pending[0][1].done():
+                    done_url, future = pending.popleft()
+                    yield done_url, future.result()
+            while pending:
+                done_url, future = pending.popleft()
+                yield done_url, future.result()
+
+    # ---------------------------------------------------------------
+    # SÉRIE (TABS=1, record, replay)
+    # ---------------------------------------------------------------
+
+    def _fetch_serial(self, urls, ready_selector, timeout, capture):
+        for url in urls:
+            try:
+                self.driver.get(url)
+                if ready_selector:
+                    try:
+                        WebDriverWait(self.driver, timeout).until(
+                            EC.presence_of_element_located((By.CSS_SELECTOR, ready_selector))
+                        )
+                    except TimeoutException:
+                        pass
+                yield url, capture(self.driver, url)
+            except WebDriverException as e:
+                print(f"    ⚠️  WebDriver ({url}) : {e}")
+                yield url, None
+
+    # ---------------------------------------------------------------
+    # ONGLETS CONCURRENTS
+    # ---------------------------------------------------------------
+
+    def _open_tabs(self, driver, count):
+        tabs = [_Tab(driver.current_window_handle)]
+        for _ in range(count - 1):
+            driver.switch_to.new_window("tab")
+            tabs.append(_Tab(driver.current_window_handle))
+        return tabs
+
+    def _schedule(self, tab, url):
+        tab.url = url
+        tab.started = None
+        tab.not_before = time.monotonic() + rate_limiter.reserve(url)
+
+    def _navigate(self, driver, tab):
+        driver.switch_to.window(tab.handle)
+        driver.execute_script(_NAVIGATE_SCRIPT, tab.url)
+        tab.started = time.monotonic()
+        instrumentation.incr("pages")
+
+    def _finish(self, driver, tab, loaded, capture):
+        """Page prête (ou délai dépassé) : mesure, retour au limiteur, capture."""
+        latency = time.monotonic() - tab.started
+        instrumentation.add_time("page_load", latency)
+        if not loaded:
+            instrumentation.incr("tab_timeouts")
+            rate_limiter.report(tab.url, error=True)
+            print(f"    ⚠️  Délai dépassé, page non chargée : {tab.url}")
+            return None
+        try:
+            blocked = rate_limiter.looks_blocked(driver.title)
+        except WebDriverException:
+            blocked = False
+        rate_limiter.report(tab.url, latency=latency, blocked=blocked)
+        lean_browser.measure(driver)
+        if hasattr(self.driver, "page_loaded"):
+            self.driver.page_loaded()
+        return capture(driver, tab.url)
+
+    def _fetch_tabs(self, urls, ready_selector, timeout, capture):
+        driver = getattr(self.driver, "raw_driver", self.driver)
+        home = driver.current_window_handle
+        queue = deque(urls)
+        tabs = self._open_tabs(driver, min(self.tabs, len(urls)))
+        for tab in tabs:
+            self._schedule(tab, queue.popleft())
+        active = list(tabs)
+
+        try:
+            while active:
+                progressed = False
+                for tab in list(active):
+                    now = time.monotonic()
+                    if tab.started is None:
+                        if now < tab.not_before:
+                            continue
+                        try:
+                            self._navigate(driver, tab)
+                        except WebDriverException as e:
+                            print(f"    ⚠️  WebDriver ({tab.url}) : {e}")
+                            rate_limiter.report(tab.url, error=True)
+                            result = (tab.url, None)
+                        else:
+                            progressed = True
+                            continue
+                    else:
+                        try:
+                            driver.switch_to.window(tab.handle)
+                            ready = driver.execute_script(_READY_SCRIPT, ready_selector)
+                            if not ready and now - tab.started < timeout:
+                                continue
+                            loaded = ready or driver.execute_script(_LOADED_SCRIPT)
+                            result = (tab.url, self._finish(driver, tab, loaded, capture))
+                        except WebDriverException as e:
+                            print(f"    ⚠️  WebDriver ({tab.url}) : {e}")
+                            rate_limiter.report(tab.url, error=True)
+                            result = (tab.url, None)
+
+                    progressed = True
+                    if queue:
+                        self._schedule(tab, queue.popleft())
+                    else:
+                        active.remove(tab)
+                    yield result
+
+                if not progressed:
+                    time.sleep(POLL_INTERVAL)
+        finally:
+            for tab in tabs:
+                if tab.handle != home:
+                    try:
+                        driver.switch_to.window(tab.handle)
+                        driver.close()
+                    except WebDriverException:
+                        pass
+            driver.switch_to.window(home)
+
+
+def _safe_parse(parse, url, page):
+    if page is None:
+        return None
+    try:
+        return parse(url, page)
+    except Exception as e:
+        print(f"    ⚠️  Erreur de parsing ({url}) : {e}")
+        return None
@@ -0,0 +1,143 @@
+"""
+Registre des équipes de football (football_teams.json), chargé une seule fois
+par processus avec des index en mémoire :
+
+    leagues()                          → ligues dans l'ordre d'apparition du fichier
+    teams_for_league(league, country)  → équipes d'une ligue          (O(1))
+    teams_for_country(country)         → équipes d'un pays            (O(1))
+    team(team_id)                      → entrée d'une équipe          (O(1))
+
+Source (variable d'environnement TEAMS_SOURCE) :
+  - local (défaut) : data/football/teams/football_teams.json du checkout
+  - remote         : téléchargement conditionnel (If-None-Match / ETag) depuis
+                     GitHub ; la copie et son ETag sont gardés dans .cache/.
+                     Un 304 réutilise la copie, une erreur réseau retombe sur
+                     la copie puis sur le fichier local.
+"""
+
+import os
+
+import fetch_backend
+import jsonio
+
+TEAMS_FILE = os.path.join("data", "football", "teams", "football_teams.json")
+TEAMS_JSON_URL = "https://raw.githubusercontent.com/PariALLIANCE/Data-Sports/main/data/football/teams/football_teams.json"
+TEAMS_SOURCE = os.environ.get("TEAMS_SOURCE", "local").strip().lower()
+CACHE_DIR = ".cache"
+CACHE_FILE = os.path.join(CACHE_DIR, "football_teams.json")
+CACHE_ETAG_FILE = os.path.join(CACHE_DIR, "football_teams.etag")
+
+_registry = {
+    "data": None,
+    "leagues": [],
+    "by_league": {},      # league_name → [team, ...]
+    "league_country": {}, # league_name → country
+    "by_country": {},     # country → [team, ...]
+    "by_id": {},          # team_id → team
+}
+
+
+# ===============================================================
+# CHARGEMENT
+# ===============================================================
+
+def _fetch_remote():
+    """Téléchargement conditionnel ; retourne le JSON (copie en cache si 304)."""
+    headers = {"User-Agent": "Mozilla/5.0"}
+    etag = None
+    if os.path.exists(CACHE_FILE) and os.path.exists(CACHE_ETAG_FILE):
+        with open(CACHE_ETAG_FILE, "r", encoding="utf-8") as f:
+            etag = f.read().strip() or None
+    if etag:
+        headers["If-None-Match"] = etag
+
+    print(f"🌐 Téléchargement conditionnel de {TEAMS_JSON_URL}")
+    try:
+        resp = fetch_backend.http_get(TEAMS_JSON_URL, headers=headers, timeout=30)
+    except Exception as e:
+        print(f"⚠️ Téléchargement impossible ({e}) — copie locale utilisée")
+        return None
+
+    if resp.status_code == 304:
+        print("✅ football_teams.json inchangé (304) — copie en cache")
+        return jsonio.load(CACHE_FILE)
+    if resp.status_code != 200:
+        print(f"⚠️ HTTP {resp.status_code} — copie locale utilisée")
+        return None
+
+    data = resp.json()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    jsonio.write_bytes(CACHE_FILE, resp.content)
+    new_etag = resp.headers.get("ETag") or resp.headers.get("etag")
+    if new_etag:
+        with open(CACHE_ETAG_FILE, "w", encoding="utf-8") as f:
+            f.write(new_etag)
+    return data
+
+
+def _build_indexes(data):
+    leagues, by_league, league_country, by_country, by_id = [], {}, {}, {}, {}
+    for country, teams_list in data.items():
+        for t in teams_list:
+            league_name = t.get("league_name")
+            if league_name and league_name not in by_league:
+                leagues.append({"country": country, "league_name": league_name})
+                league_country[league_name] = country
+            by_league.setdefault(league_name, []).append(t)
+            by_country.setdefault(country, []).append(t)
+            if t.get("team_id"):
+                by_id[t["team_id"]] = dict(t, country=country)
+    _registry.update(data=data, leagues=leagues, by_league=by_league,
+                     league_country=league_country, by_country=by_country, by_id=by_id)
+
+
+def load(force=False):
+    """Charge le registre (une seule fois par processus) et retourne le JSON brut."""
+    if _registry["data"] is not None and not force:
+        return _registry["data"]
+
+    data = None
+    if TEAMS_SOURCE == "remote":
+        data = _fetch_remote()
+        if data is None and os.path.exists(CACHE_FILE):
+            data = jsonio.load(CACHE_FILE)
+    if data is None:
+        print(f"📂 Registre des équipes : {TEAMS_FILE}")
+        data = jsonio.load(TEAMS_FILE)
+
+    _build_indexes(data)
+    print(f"📚 {len(_registry['by_id'])} équipe(s), {len(_registry['leagues'])} ligue(s), "
+          f"{len(_registry['by_country'])} pays")
+    return data
+
+
+# ===============================================================
+# REQUÊTES
+# ===============================================================
+
+def leagues():
+    """
+    Liste ordonnée et dédupliquée des ligues, dans l'ordre d'apparition du
+    fichier (pays par pays, puis équipe par équipe) : [{"country", "league_name"}].
+    """
+    load()
+    return list(_registry["leagues"])
+
+
+def teams_for_league(league_name, country=None):
+    """Équipes d'une ligue (filtrées sur le pays si `country` est fourni)."""
+    load()
+    if country is not None and _registry["league_country"].get(league_name) != country:
+        return []
+    return list(_registry["by_league"].get(league_name, []))
+
+
+def teams_for_country(country):
+    load()
+    return list(_registry["by_country"].get(country, []))
+
+
+def team(team_id):
+    """Entrée d'une équipe (avec son pays), ou None."""
+    load()
+    return _registry["by_id"].get(str(team_id))
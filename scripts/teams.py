@@ -1,14 +1,17 @@
 import os
-import json
 import re
-import time
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+import chrome_startup
+import fetch_backend
+import instrumentation
+import jsonio
+import lean_browser
+
 # -------------------- CONFIG --------------------
 FOOTBALL_BASE_URL = "https://www.espn.com/soccer/teams/_/league/"
 FOOTBALL_LOGO_URL = "https://a.espncdn.com/i/teamlogos/soccer/500/{team_id}.png"
@@ -63,7 +66,7 @@ NHL_OUTPUT_FILE = "data/hockey/teams/hockey_NHL_teams.json"
 
 
 # -------------------- DRIVER --------------------
-def create_driver():
+def _start_chrome():
     options = Options()
     options.add_argument("--headless")
     options.add_argument("--no-sandbox")
@@ -79,12 +82,19 @@ def create_driver():
 
     # Chromium sur GitHub Actions
     options.binary_location = "/usr/bin/chromium-browser"
-    service = Service("/usr/bin/chromedriver")
+    service = chrome_startup.service(options)
 
+    lean_browser.apply_options(options)
+    chrome_startup.apply_options(options, "teams")
     driver = webdriver.Chrome(service=service, options=options)
     return driver
 
 
+def create_driver():
+    """Driver Chrome enveloppé par fetch_backend (limiteur de débit, record / replay)."""
+    return fetch_backend.open_driver(_start_chrome)
+
+
 # -------------------- FONCTIONS --------------------
 def get_football_teams_for_league(driver, league_id, league_name):
     url = FOOTBALL_BASE_URL + league_id
@@ -98,7 +108,7 @@ def get_football_teams_for_league(driver, league_id, league_name):
         print(f"   ⚠️ Timeout ou aucune section trouvée pour {league_id}")
         return []
 
-    time.sleep(2)
+    fetch_backend.settle(driver, 2, selector="section.TeamLinks a[href*='/soccer/team/_/id/']")
 
     teams = []
     sections = driver.find_elements(By.CSS_SELECTOR, "section.TeamLinks")
@@ -145,7 +155,7 @@ def get_nhl_teams(driver):
         print("   ⚠️ Timeout ou aucune section NHL trouvée")
         return []
 
-    time.sleep(2)
+    fetch_backend.settle(driver, 2, selector="section.TeamLinks a[href*='/nhl/team/_/name/']")
 
     teams = []
     sections = driver.find_elements(By.CSS_SELECTOR, "section.TeamLinks")
@@ -200,8 +210,7 @@ def scrape_football_teams(driver):
     output_path = os.path.join(FOOTBALL_OUTPUT_DIR, FOOTBALL_OUTPUT_FILE)
 
     if os.path.exists(output_path):
-        with open(output_path, "r", encoding="utf-8") as f:
-            existing_data = json.load(f)
+        existing_data = jsonio.load(output_path)
         print(f"📂 Fichier existant chargé : {output_path}")
     else:
         existing_data = {}
@@ -221,11 +230,8 @@ def scrape_football_teams(driver):
             print(f"❌ Erreur pour {league_name} : {e}")
             if country not in existing_data:
                 existing_data[country] = []
-        time.sleep(2)
 
-    os.makedirs(FOOTBALL_OUTPUT_DIR, exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(existing_data, f, indent=2, ensure_ascii=False)
+    jsonio.dump(output_path, existing_data)
     print(f"\n✅ Fichier football mis à jour : {output_path}")
 
 
@@ -233,8 +239,7 @@ def scrape_nhl_teams(driver):
     print("🏒 Scraping équipes NHL...")
 
     if os.path.exists(NHL_OUTPUT_FILE):
-        with open(NHL_OUTPUT_FILE, "r", encoding="utf-8") as f:
-            existing_data = json.load(f)
+        existing_data = jsonio.load(NHL_OUTPUT_FILE)
         existing_teams = existing_data.get("NHL", [])
         print(f"📂 Fichier NHL existant chargé.")
     else:
@@ -244,14 +249,13 @@ def scrape_nhl_teams(driver):
     new_teams = get_nhl_teams(driver)
     merged = merge_teams(existing_teams, new_teams)
 
-    os.makedirs(os.path.dirname(NHL_OUTPUT_FILE), exist_ok=True)
-    with open(NHL_OUTPUT_FILE, "w", encoding="utf-8") as f:
-        json.dump({"NHL": merged}, f, indent=2, ensure_ascii=False)
+    jsonio.dump(NHL_OUTPUT_FILE, {"NHL": merged})
     print(f"✅ {len(merged)} équipes NHL sauvegardées dans {NHL_OUTPUT_FILE}")
 
 
 # -------------------- MAIN --------------------
 if __name__ == "__main__":
+    instrumentation.start_run()
     driver = create_driver()
     try:
         print("=== DÉBUT DU SCRAPING FOOTBALL ===")
@@ -0,0 +1,162 @@
+"""
+Planification des mises à jour de Teams_tracker.py à partir des calendriers.
+
+Une équipe déjà trackée n'a de nouveaux résultats que si elle a joué depuis
+le dernier scraping : le next_game de son match le plus récent donne la date
+de son prochain match. Elle n'est remise en file que si :
+
+  - due       : ce prochain match est passé (date < jour du run) ;
+  - stale     : son scraping date de plus de FIXTURE_STALE_DAYS jours
+                (calendrier inconnu, trêve, match reporté ou ajouté) ;
+  - untracked : équipe jamais trackée (scraping complet) ;
+  - full      : UPDATE_PLAN=full (rafraîchissement complet forcé).
+
+Sinon elle est ignorée (waiting : prochain match à venir) et son entrée de
+data_teams.json est conservée telle quelle. Le coût d'un run quotidien suit
+ainsi le nombre de matchs joués, pas le nombre d'équipes trackées.
+
+    due, reason = update_planner.decide(existing_entry)
+
+Un match joué le jour même n'est repris qu'au run suivant : son résultat
+n'est pas forcément final au moment du run.
+
+CLI (aperçu du plan sur le data_teams.json courant) :
+    python scripts/update_planner.py
+
+Variables d'environnement :
+  - UPDATE_PLAN        : auto (défaut) | full
+  - FIXTURE_STALE_DAYS : âge max d'un scraping avant rafraîchissement (défaut 7)
+"""
+
+import os
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+
+import fetch_backend
+import instrumentation
+import jsonio
+
+UPDATE_PLAN = os.environ.get("UPDATE_PLAN", "auto").strip().lower()
+FIXTURE_STALE_DAYS = int(os.environ.get("FIXTURE_STALE_DAYS", "7"))
+
+DATA_TEAMS_FILE = os.path.join("data", "football", "leagues", "data_teams.json")
+
+# Dates de la page fixtures ESPN : "Sat, Oct 25" (sans année)
+_FIXTURE_DATE = re.compile(r"([A-Z][a-z]{2})[a-z]*\.?\s+(\d{1,2})")
+
+
+# ===============================================================
+# DATES
+# ===============================================================
+
+def _naive(dt):
+    return dt.replace(tzinfo=None) if dt is not None else None
+
+
+def _parse_dt(value):
+    try:
+        return _naive(datetime.fromisoformat(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def fixture_date(text, reference):
+    """
+    Date d'un next_game : ISO (match chaîné) ou "Sat, Oct 25" (page
+    fixtures, année déduite de `reference`, date du scraping). None si
+    inexploitable (TBD…).
+    """
+    if not text:
+        return None
+    try:
+        return datetime.strptime(text[:10], "%Y-%m-%d").date()
+    except ValueError:
+        pass
+    m = _FIXTURE_DATE.search(text)
+    if not m or reference is None:
+        return None
+    for year in (reference.year, reference.year + 1):
+        try:
+            candidate = datetime.strptime(f"{m.group(1)} {m.group(2)} {year}", "%b %d %Y").date()
+        except ValueError:
+            return None
+        # Un prochain match est postérieur au scraping (marge : reports)
+        if candidate >= reference.date() - timedelta(days=30):
+            return candidate
+    return None
+
+
+def next_fixture(team_entry):
+    """Prochain match connu de l'équipe (next_game de son match le plus récent)."""
+    latest = None
+    for season_matches in (team_entry.get("matches_by_season") or {}).values():
+        for m in season_matches:
+            if latest is None or (m.get("date") or "") > (latest.get("date") or ""):
+                latest = m
+    return (latest or {}).get("next_game")
+
+
+# ===============================================================
+# DÉCISION
+# ===============================================================
+
+def decide(team_entry, now=None):
+    """
+    (à_traiter, raison) pour une équipe ; team_entry=None si jamais
+    trackée. Raisons : full, untracked, stale, due, waiting.
+    """
+    if UPDATE_PLAN == "full":
+        return True, "full"
+    if team_entry is None:
+        return True, "untracked"
+
+    now = _naive(now or fetch_backend.run_datetime())
+    scraped_at = _parse_dt(team_entry.get("scraped_at"))
+    if scraped_at is None or now - scraped_at > timedelta(days=FIXTURE_STALE_DAYS):
+        return True, "stale"
+
+    next_game = next_fixture(team_entry)
+    next_date = fixture_date((next_game or {}).get("date"), scraped_at)
+    if next_date is None:
+        # Pas de prochain match connu (trêve, calendrier non publié) :
+        # rafraîchi seulement quand le scraping devient trop ancien
+        return False, "waiting"
+    if next_date < now.date():
+        return True, "due"
+    return False, "waiting"
+
+
+def record(reason):
+    """Compte la décision dans le run_report (compteur update_<raison>)."""
+    instrumentation.incr(f"update_{reason}")
+
+
+# ===============================================================
+# CLI
+# ===============================================================
+
+def preview(path=DATA_TEAMS_FILE):
+    data = jsonio.load(path, default=None)
+    if data is None:
+        print(f"ℹ️ {path} introuvable — toutes les équipes seraient scrapées")
+        return Counter()
+    reasons = Counter()
+    due = []
+    for team in data.get("teams", []):
+        to_update, reason = decide(team)
+        reasons[reason] += 1
+        if to_update:
+            due.append((reason, team.get("league_name"), team.get("team_name")))
+
+    print(f"📅 Plan de mise à jour ({UPDATE_PLAN}, stale > {FIXTURE_STALE_DAYS} j) — "
+          f"{len(due)}/{sum(reasons.values())} équipe(s) à traiter")
+    for reason, count in sorted(reasons.items()):
+        print(f"   {reason:<10} {count}")
+    for reason, league, team in sorted(due, key=lambda x: (x[1] or "", x[2] or "")):
+        print(f"   - [{reason}] {league} — {team}")
+    return reasons
+
+
+if __name__ == "__main__":
+    preview()
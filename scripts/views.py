@@ -0,0 +1,110 @@
+"""
+Vues matérialisées « derniers matchs », écrites avec data_teams.json.
+
+Les consommateurs (paquet npm, dashboards) ne veulent que les derniers
+matchs d'une ligue ou d'une équipe : plutôt que de télécharger et parser
+tout l'historique, ils lisent un petit fichier de taille constante :
+
+    data/football/views/league/<Ligue>/last15.json   15 derniers matchs de championnat
+    data/football/views/team/<team_id>/last10.json   10 derniers matchs de l'équipe
+
+Matchs du plus récent au plus ancien, au format de data_teams.json (vue
+ligue : sans les champs propres à une équipe, team_result / next_game ;
+un match de championnat est un match avec une journée, matchday).
+
+    views.write_views(teams, changed_team_ids)
+
+Seules les vues des équipes traitées dans le run, et des ligues qui les
+contiennent, sont recalculées ; un fichier n'est réécrit que si son contenu
+change (pas de commit sans nouveau match).
+
+Reconstruction complète depuis data_teams.json :
+    python scripts/views.py
+"""
+
+import os
+
+import instrumentation
+import jsonio
+import match_store
+
+VIEWS_DIR = os.path.join("data", "football", "views")
+LEAGUE_VIEW_SIZE = 15
+TEAM_VIEW_SIZE = 10
+
+
+def _team_matches(team_entry):
+    matches = [m for season in (team_entry.get("matches_by_season") or {}).values() for m in season]
+    matches.sort(key=lambda m: (m.get("date") or "", m.get("match_id") or ""), reverse=True)
+    return matches
+
+
+def team_view(team_entry):
+    return {
+        "team_id": team_entry.get("team_id"),
+        "team_name": team_entry.get("team_name"),
+        "league_name": team_entry.get("league_name"),
+        "matches": _team_matches(team_entry)[:TEAM_VIEW_SIZE],
+    }
+
+
+def league_view(league_name, team_entries):
+    """Derniers matchs de championnat d'une ligue, chacun une seule fois."""
+    by_id = {}
+    for entry in team_entries:
+        for m in _team_matches(entry):
+            if m.get("matchday") is not None and m.get("match_id") not in by_id:
+                by_id[m.get("match_id")] = {k: v for k, v in m.items() if k not in match_store.TEAM_FIELDS}
+    matches = sorted(by_id.values(), key=lambda m: (m.get("date") or "", m.get("match_id") or ""), reverse=True)
+    return {
+        "league_name": league_name,
+        "matches": matches[:LEAGUE_VIEW_SIZE],
+    }
+
+
+def _write_if_changed(path, view):
+    data = jsonio.dumps(view)
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    jsonio.write_bytes(path, data)
+    return True
+
+
+def write_views(teams, changed_team_ids=None):
+    """
+    Écrit les vues des équipes `changed_team_ids` (toutes si None) et des
+    ligues qui les contiennent. `teams` : toutes les équipes de data_teams.json.
+    Retourne le nombre de fichiers réécrits.
+    """
+    with instrumentation.timer("views"):
+        changed = {t.get("team_id") for t in teams} if changed_team_ids is None else set(changed_team_ids)
+        by_league = {}
+        for t in teams:
+            by_league.setdefault(t.get("league_name"), []).append(t)
+
+        written = 0
+        for t in teams:
+            if t.get("team_id") in changed:
+                path = os.path.join(VIEWS_DIR, "team", str(t["team_id"]), f"last{TEAM_VIEW_SIZE}.json")
+                written += _write_if_changed(path, team_view(t))
+        for league_name, entries in by_league.items():
+            if league_name and any(t.get("team_id") in changed for t in entries):
+                path = os.path.join(VIEWS_DIR, "league", league_name, f"last{LEAGUE_VIEW_SIZE}.json")
+                written += _write_if_changed(path, league_view(league_name, entries))
+
+    instrumentation.incr("views_written", written)
+    print(f"🪟 Vues : {written} fichier(s) réécrit(s) ({len(changed)} équipe(s) modifiée(s))")
+    return written
+
+
+if __name__ == "__main__":
+    data = jsonio.load(match_store.DATA_TEAMS_FILE, default=None)
+    if data is None:
+        print(f"ℹ️ {match_store.DATA_TEAMS_FILE} introuvable — aucune vue")
+    else:
+        write_views(data.get("teams", []))